@@ -0,0 +1,5 @@
+# pixbots_enhanced/benchmarks/__init__.py
+# Headless benchmark suite: `python -m benchmarks --help`.
+
+from benchmarks.scenario import build_component, list_scenarios, load_layout, load_scenario
+from benchmarks.suite import compare, run_scenario, run_suite
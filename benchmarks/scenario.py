@@ -0,0 +1,124 @@
+# pixbots_enhanced/benchmarks/scenario.py
+# Declarative benchmark scenarios (benchmarks/scenarios/*.json) and hex layouts (benchmarks/layouts/*.json).
+
+import copy
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+
+# Every key a scenario may set. Missing keys take these values; unknown keys are an error.
+DEFAULTS = {
+    "name": None, # File name without .json
+    "description": "",
+    "seed": 1, # Game RNG streams and harness placement
+    "dt": 1.0 / constants.FPS,
+    "map": {"width": 100, "height": 100, "seed": 7, "repeat": 3}, # repeat: timed map generations
+    "player": "idle", # idle, patrol or duelist (see headless.py)
+    "invulnerable": True, # A player death restarts the game, which would empty the arena
+    "enemies": [], # [{"class": "grunt", "count": 50}]
+    "spawn_ring": [300, 900], # Enemy distance from the player
+    "projectiles": [], # [{"count": 100, "synergy": "fire", "owner": "player", "speed": 400, "damage": 5, "effects": {}}]
+    "sustain_projectiles": True, # Top the projectile count back up every tick
+    "warmup": 60, # Untimed ticks first
+    "ticks": 600,
+    "memory_ticks": 60, # Ticks run under tracemalloc for the memory peak (0 skips it)
+    "layouts": [], # Names in benchmarks/layouts/ (or paths)
+    "flow_calls": 2000, # simulate_flow calls per layout (a tenth as many uncached)
+}
+
+PLAYER_SCRIPTS = ("idle", "patrol", "duelist")
+
+
+def _resolve(name_or_path: str, directory: str) -> str:
+    if os.path.exists(name_or_path):
+        return name_or_path
+    path = os.path.join(directory, name_or_path if name_or_path.endswith(".json") else name_or_path + ".json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No such benchmark file: {name_or_path}")
+    return path
+
+
+def list_scenarios() -> List[str]:
+    return sorted(f[:-5] for f in os.listdir(SCENARIO_DIR) if f.endswith(".json"))
+
+
+def load_scenario(name_or_path: str) -> Dict:
+    """Reads a scenario file and fills in DEFAULTS. Raises ValueError on unknown keys or bad values."""
+    path = _resolve(name_or_path, SCENARIO_DIR)
+    with open(path) as f:
+        data = json.load(f)
+    unknown = set(data) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"{path}: unknown scenario keys {sorted(unknown)}")
+
+    scenario = copy.deepcopy(DEFAULTS)
+    scenario.update(data)
+    scenario["map"] = {**DEFAULTS["map"], **data.get("map", {})}
+    scenario["name"] = scenario["name"] or os.path.splitext(os.path.basename(path))[0]
+    if scenario["player"] not in PLAYER_SCRIPTS:
+        raise ValueError(f"{path}: player must be one of {PLAYER_SCRIPTS}")
+    for group in scenario["enemies"]:
+        if "class" not in group or "count" not in group:
+            raise ValueError(f"{path}: enemy groups need a class and a count")
+    for group in scenario["projectiles"]:
+        if "count" not in group:
+            raise ValueError(f"{path}: projectile groups need a count")
+    return scenario
+
+
+def load_layout(name_or_path: str) -> Dict:
+    path = _resolve(name_or_path, LAYOUT_DIR)
+    with open(path) as f:
+        layout = json.load(f)
+    layout.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return layout
+
+
+def build_component(layout: Dict) -> Tuple[object, Optional[object], Optional[int]]:
+    """
+    Builds the ComponentEquipment a layout describes. Returns
+    (component, input_context, input_direction) ready for simulate_flow().
+
+    Layout keys: slot, quality, optional coords ([[q, r], ...] instead of the
+    quality's rectangle), optional core (EnergyCore.to_dict() fields plus
+    "focus": direction), optional input ({"synergies": {name: magnitude},
+    "direction": side}) and tiles: [{"at": [[q, r], ...], <HexTile.to_dict() fields>}].
+    """
+    from equipment.component import ComponentEquipment
+    from hex_system.energy_packet import EnergyCore, ProjectileContext, SynergyType
+    from hex_system.hex_coord import HexCoord
+    from hex_system.hex_tile import HexTile
+
+    coords = {HexCoord(q, r) for q, r in layout.get("coords", [])}
+    component = ComponentEquipment(name=layout["name"], slot=layout.get("slot", "torso"),
+                                   quality=layout.get("quality", "Legendary"), valid_coords=coords)
+
+    for group in layout.get("tiles", []):
+        tile_data = {k: v for k, v in group.items() if k != "at"}
+        for q, r in group["at"]:
+            component.place_tile(HexCoord(q, r), HexTile.from_dict(tile_data))
+
+    core_data = layout.get("core")
+    if core_data:
+        core = EnergyCore.from_dict(core_data)
+        if "focus" in core_data:
+            core.configure_focused(core_data["focus"])
+        elif "directional_outputs" not in core_data:
+            core.configure_omnidirectional() # from_dict leaves the pre-override split in place
+        component.core = core
+        component.invalidate_flow_cache()
+
+    input_context = input_direction = None
+    if "input" in layout:
+        mix = {SynergyType(k): v for k, v in layout["input"].get("synergies", {"raw": 100.0}).items()}
+        input_context = ProjectileContext(synergies=mix)
+        input_direction = layout["input"].get("direction", 0)
+    return component, input_context, input_direction
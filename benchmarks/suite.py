@@ -0,0 +1,323 @@
+# pixbots_enhanced/benchmarks/suite.py
+# Runs benchmark scenarios headless and checks the results against per-machine JSON baselines.
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import re
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.scenario import build_component, list_scenarios, load_layout, load_scenario
+from headless import HeadlessRunner, duelist_script, patrol_script
+
+logger = logging.getLogger(__name__)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_THRESHOLD = 0.10 # Fractional change that counts as a regression
+
+# Metric -> True if higher is better
+METRICS = {
+    "ticks_per_sec": True,
+    "frame_ms_p50": False,
+    "frame_ms_p95": False,
+    "flow_calls_per_sec": True,
+    "flow_uncached_calls_per_sec": True,
+    "mapgen_ms": False,
+    "memory_peak_mb": False,
+}
+
+
+def machine_id() -> str:
+    """Baseline file name for this machine (its host name, filesystem-safe)."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", platform.node() or "unknown")
+
+
+def machine_info() -> Dict:
+    import pygame
+    return {
+        "node": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+    }
+
+
+def measure_mapgen(scenario: Dict) -> Dict:
+    """Median GameMap construction time over map["repeat"] runs."""
+    import constants
+    from core.asset_manager import ProceduralAssetManager
+    from world.game_map import GameMap
+
+    spec = scenario["map"]
+    if not spec["repeat"]:
+        return {}
+    asset_manager = ProceduralAssetManager()
+    times = []
+    for _ in range(spec["repeat"]):
+        start = time.perf_counter()
+        GameMap(spec["width"], spec["height"], constants.TILE_SIZE, asset_manager, seed=spec["seed"])
+        times.append(time.perf_counter() - start)
+    return {"mapgen_ms": float(np.median(times)) * 1000.0}
+
+
+def start_arena(scenario: Dict):
+    """A HeadlessRunner on the scenario's map with its enemies spawned and projectiles in flight."""
+    runner = HeadlessRunner(dt=scenario["dt"], profile=f"bench_{scenario['name']}")
+    if scenario["player"] == "patrol":
+        runner.input.script = patrol_script(scenario["dt"])
+    elif scenario["player"] == "duelist":
+        runner.input.script = duelist_script(runner)
+    spec = scenario["map"]
+    runner.start(spec["seed"], seed=scenario["seed"], map_size=(spec["width"], spec["height"]))
+    if scenario["invulnerable"]:
+        runner.game.player.max_hp = runner.game.player.hp = 1e9
+
+    min_dist, max_dist = scenario["spawn_ring"]
+    for group in scenario["enemies"]:
+        runner.spawn_wave(group["count"], (group["class"],), min_dist, max_dist)
+    spawn_projectiles(runner, scenario)
+    return runner
+
+
+def spawn_projectiles(runner, scenario: Dict):
+    """Spawns projectiles until the scenario's groups are all in flight (cycling groups to fill a deficit)."""
+    groups = scenario["projectiles"]
+    if not groups:
+        return
+    combat_system = runner.game.combat_system
+    target = sum(group["count"] for group in groups)
+    missing = target - len(combat_system.projectiles) - combat_system.projectile_pool.count
+    if missing <= 0:
+        return
+    player = runner.game.player
+    rng = runner.rng
+    min_dist, max_dist = scenario["spawn_ring"]
+    counts = [group["count"] * missing // target for group in groups]
+    counts[0] += missing - sum(counts)
+    for group, count in zip(groups, counts):
+        effects = dict(group.get("effects", {}))
+        if group.get("synergy"):
+            effects["synergy_name"] = group["synergy"]
+        for _ in range(count):
+            angle = rng.uniform(0, math.pi * 2)
+            dist = rng.uniform(0, max_dist)
+            combat_system.spawn_projectile(
+                player.x + math.cos(angle) * dist, player.y + math.sin(angle) * dist,
+                rng.uniform(0, math.pi * 2), group.get("speed", 400), group.get("damage", 5),
+                "energy", group.get("owner", "player"), effects=dict(effects) if effects else None)
+
+
+def measure_ticks(scenario: Dict) -> Dict:
+    """Ticks/sec and frame time percentiles over scenario["ticks"] ticks, after the warmup."""
+    if not scenario["ticks"]:
+        return {}
+    runner = start_arena(scenario)
+    frames = np.zeros(scenario["ticks"])
+    try:
+        for i in range(scenario["warmup"] + scenario["ticks"]):
+            if scenario["sustain_projectiles"]:
+                spawn_projectiles(runner, scenario)
+            runner.input.advance(runner.tick)
+            runner.clock.advance(runner.dt)
+            frame = runner.step(runner.dt)
+            if i >= scenario["warmup"]:
+                frames[i - scenario["warmup"]] = frame
+        game = runner.game
+        enemies = sum(1 for b in game.all_bots if b is not game.player)
+        projectiles = len(game.combat_system.projectiles) + game.combat_system.projectile_pool.count
+    finally:
+        runner.close()
+    return {
+        "ticks_per_sec": len(frames) / frames.sum(),
+        "frame_ms_p50": float(np.percentile(frames, 50)) * 1000.0,
+        "frame_ms_p95": float(np.percentile(frames, 95)) * 1000.0,
+        "end_enemies": enemies,
+        "end_projectiles": projectiles,
+        "player_deaths": runner.player_deaths,
+    }
+
+
+def measure_memory(scenario: Dict) -> Dict:
+    """
+    tracemalloc peak over arena setup plus scenario["memory_ticks"] ticks.
+    Python and numpy allocations only: pygame surface pixels are not traced.
+    """
+    if not scenario["memory_ticks"]:
+        return {}
+    tracemalloc.start()
+    try:
+        runner = start_arena(scenario)
+        try:
+            runner.run(ticks=scenario["memory_ticks"])
+        finally:
+            runner.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"memory_peak_mb": peak / (1024 * 1024)}
+
+
+def measure_flow(scenario: Dict) -> Dict:
+    """
+    simulate_flow calls/sec over the scenario's layouts, from the plan cache
+    (what weapons and loadouts pay per call) and with the cache invalidated
+    before every call (what an edit pays).
+    """
+    if not scenario["layouts"]:
+        return {}
+    calls = scenario["flow_calls"]
+    uncached_calls = max(1, calls // 10)
+    cached_time = uncached_time = 0.0
+    layouts = {}
+    for name in scenario["layouts"]:
+        layout = load_layout(name)
+        component, context, direction = build_component(layout)
+        start = time.perf_counter()
+        for _ in range(uncached_calls):
+            component.invalidate_flow_cache()
+            _, stats, _ = component.simulate_flow(context, direction)
+        uncached_time += time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(calls):
+            component.simulate_flow(context, direction)
+        cached_time += time.perf_counter() - start
+        layouts[layout["name"]] = {"active_tiles": stats["active_tiles"],
+                                   "weapon_damage": round(stats["weapon_damage"], 3)}
+    count = len(scenario["layouts"])
+    return {
+        "flow_calls_per_sec": calls * count / cached_time,
+        "flow_uncached_calls_per_sec": uncached_calls * count / uncached_time,
+        "layouts": layouts,
+    }
+
+
+def run_scenario(scenario: Dict) -> Dict:
+    result = {}
+    for measure in (measure_mapgen, measure_ticks, measure_flow, measure_memory):
+        result.update(measure(scenario))
+    return result
+
+
+def run_suite(names: List[str], repeat: int = 1) -> Dict[str, Dict]:
+    """Runs each scenario `repeat` times and keeps the best value of every metric."""
+    results = {}
+    for name in names:
+        scenario = load_scenario(name)
+        best = {}
+        for _ in range(repeat):
+            result = run_scenario(scenario)
+            for key, value in result.items():
+                if key in METRICS and key in best:
+                    value = max(value, best[key]) if METRICS[key] else min(value, best[key])
+                best[key] = value
+        results[scenario["name"]] = best
+        logger.info(f"Benchmark {scenario['name']}: " +
+                    ", ".join(f"{k}={v:.2f}" for k, v in best.items() if k in METRICS))
+    return results
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, Dict]):
+    """Writes results into the baseline at `path`, replacing only the scenarios that were run."""
+    baseline = load_baseline(path) or {"scenarios": {}}
+    baseline["machine"] = machine_info()
+    baseline["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    baseline["scenarios"].update(results)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    logger.info(f"Saved baseline for {len(results)} scenarios to {path}")
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    One row per (scenario, metric) present in both. `change` is the fractional
+    difference from the baseline; `regression` is set when it is worse than `threshold`.
+    """
+    rows = []
+    for name, metrics in results.items():
+        reference = baseline["scenarios"].get(name, {})
+        for metric, higher_is_better in METRICS.items():
+            if metric not in metrics or not reference.get(metric):
+                continue
+            change = (metrics[metric] - reference[metric]) / reference[metric]
+            worse = -change if higher_is_better else change
+            rows.append({"scenario": name, "metric": metric, "baseline": reference[metric],
+                         "current": metrics[metric], "change": change, "regression": worse > threshold})
+    return rows
+
+
+def format_table(results: Dict[str, Dict], rows: Optional[List[Dict]] = None) -> str:
+    compared = {(row["scenario"], row["metric"]): row for row in rows or []}
+    lines = [f"{'scenario':<24}{'metric':<30}{'current':>12}{'baseline':>12}{'change':>9}"]
+    for name, metrics in results.items():
+        for metric in METRICS:
+            if metric not in metrics:
+                continue
+            row = compared.get((name, metric))
+            if row:
+                flag = "  REGRESSION" if row["regression"] else ""
+                lines.append(f"{name:<24}{metric:<30}{metrics[metric]:>12.2f}{row['baseline']:>12.2f}"
+                             f"{row['change'] * 100:>8.1f}%{flag}")
+            else:
+                lines.append(f"{name:<24}{metric:<30}{metrics[metric]:>12.2f}{'-':>12}{'-':>9}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Run pixbots benchmark scenarios and check them against a baseline.")
+    parser.add_argument("scenarios", nargs="*", help="Scenario names or paths (default: all in benchmarks/scenarios)")
+    parser.add_argument("--list", action="store_true", help="List the bundled scenarios and exit")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the best value of each metric is kept")
+    parser.add_argument("--machine", default=None, help="Baseline name (default: this host's name)")
+    parser.add_argument("--baseline", default=None, help="Baseline file (default: benchmarks/baselines/<machine>.json)")
+    parser.add_argument("--save", action="store_true", help="Record these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Fractional slowdown (or growth) flagged as a regression")
+    parser.add_argument("--json", metavar="PATH", default=None, help="Also write the raw results here")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    if args.list:
+        for name in list_scenarios():
+            print(f"{name:<24}{load_scenario(name)['description']}")
+        return 0
+
+    results = run_suite(args.scenarios or list_scenarios(), args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"machine": machine_info(), "scenarios": results}, f, indent=2, sort_keys=True)
+
+    path = args.baseline or os.path.join(BASELINE_DIR, f"{args.machine or machine_id()}.json")
+    baseline = load_baseline(path)
+    rows = compare(results, baseline, args.threshold) if baseline else []
+    print(format_table(results, rows))
+    if args.save:
+        save_baseline(path, results)
+        return 0
+    if baseline is None:
+        print(f"No baseline at {path}; run with --save to record one.")
+        return 0
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%} against {path}.")
+        return 1
+    return 0
@@ -0,0 +1,44 @@
+import unittest
+import sys
+import os
+import logging
+
+# Add root to path
+sys.path.append(os.getcwd())
+
+from systems.ai_behavior_system import BehaviorSystem
+
+
+class TestBehaviorClasses(unittest.TestCase):
+    """Every Enemy.ai_class spelling the game spawns must reach its behavior library."""
+    # main.py spawns "Grunt"/"Sniper"/"Ambusher"/"Boss" (spawn_enemy, debug menu) and lowercase names (waves)
+    SPAWNED = {"Grunt": "grunt", "grunt": "grunt", "Sniper": "sniper", "sniper": "sniper",
+               "Ambusher": "ambush", "ambusher": "ambush", "Boss": "boss", "boss": "boss"}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.system = BehaviorSystem()
+
+    def test_classes_resolve_to_libraries(self):
+        for ai_class, expected in self.SPAWNED.items():
+            self.assertEqual(self.system.behavior_class(ai_class), expected, ai_class)
+            self.assertTrue(self.system.behaviors.get(expected), f"no {expected} behaviors loaded")
+
+    def test_capitalized_classes_draw_behaviors(self):
+        for ai_class, expected in self.SPAWNED.items():
+            drawn = self.system.get_weighted_behaviors(ai_class, 5)
+            self.assertEqual(len(drawn), 5, ai_class)
+            self.assertTrue(all(self.system.entry_classes[id(b)] == expected for b in drawn), ai_class)
+            self.assertIsNotNone(self.system.get_weighted_behavior(ai_class), ai_class)
+
+    def test_memories_use_library_class(self):
+        behavior = self.system.behaviors["ambush"][0]
+        self.system.record_behavior("check-ambusher", "Ambusher", behavior.id)
+        self.assertIn(behavior.id, self.system.enemy_memories["check-ambusher"].get_recent_behaviors())
+        self.system.evict_memories(["check-ambusher"])
+        print("PASS: capitalized enemy classes resolve to behavior libraries")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    unittest.main()
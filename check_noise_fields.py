@@ -0,0 +1,67 @@
+import unittest
+import random
+import sys
+import os
+import logging
+
+import numpy as np
+
+# Add root to path
+sys.path.append(os.getcwd())
+
+from world.biome import BiomeManager, HAVE_NOISE, WATER, pnoise2, pnoise2_grid
+
+
+class TestNoiseFields(unittest.TestCase):
+    """
+    generate_fields / pnoise2_grid must match the per-cell pnoise2 path exactly,
+    including the cells whose PERM lookups overrun the table and go to pnoise2.
+    """
+    # seed % 255 spans low and high noise bases (the base decides how far lookups overrun)
+    SEEDS = [0, 1, 42, 200, 244, 253, 254, 509, 123456, 999999] + random.Random(8).sample(range(1000000), 4)
+    WIDTH, HEIGHT = 72, 56
+
+    def test_generate_fields_matches_per_cell(self):
+        manager = BiomeManager(0)
+        biomes = [None] + sorted(manager.biome_data)
+        for seed in self.SEEDS:
+            for forced in biomes:
+                manager = BiomeManager(seed)
+                manager.forced_biome = forced
+                fields = manager.generate_fields(self.WIDTH, self.HEIGHT)
+                grid = fields.biome_grid()
+                obstacles = []
+                for y in range(self.HEIGHT):
+                    for x in range(self.WIDTH):
+                        biome = manager.get_biome_type(x, y)
+                        terrain = manager.get_terrain_type(x, y, biome)
+                        self.assertEqual(grid[y][x], biome, f"seed {seed}, biome {forced}: biome at {(x, y)}")
+                        self.assertEqual(fields.terrain[y, x], terrain, f"seed {seed}, biome {forced}: terrain at {(x, y)}")
+                        if terrain != WATER and manager.should_spawn_obstacle(x, y):
+                            obstacles.append((x, y, manager.get_obstacle_type(x, y)))
+                placed = [(x, y, fields.obstacle_names[code])
+                          for (x, y), code in zip(fields.obstacle_cells.tolist(), fields.obstacle_types.tolist())]
+                self.assertEqual(placed, obstacles, f"seed {seed}, biome {forced}: obstacles")
+
+    def test_pnoise2_grid_matches_pnoise2(self):
+        # Far coordinates and every octave setting generate_fields uses, across the base range
+        rng = np.random.default_rng(5)
+        xs = rng.uniform(0, 1000, (40, 40))
+        ys = rng.uniform(0, 1000, (40, 40))
+        settings = [dict(octaves=3, persistence=0.5, lacunarity=2.0),
+                    dict(octaves=4, persistence=0.7, lacunarity=2.0),
+                    dict(octaves=1)]
+        for base in [0, 17, 128, 200, 230, 254]:
+            for kwargs in settings:
+                grid = pnoise2_grid(xs, ys, base=base, **kwargs)
+                cells = np.array([[pnoise2(x, y, base=base, **kwargs) for x, y in zip(row_x, row_y)]
+                                  for row_x, row_y in zip(xs.tolist(), ys.tolist())])
+                mismatches = np.count_nonzero(grid != cells)
+                self.assertEqual(mismatches, 0, f"base {base}, {kwargs}: {mismatches} cells differ")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    if not HAVE_NOISE:
+        print("'noise' is not installed: pnoise2_grid is the per-cell fallback, checking it anyway.")
+    unittest.main()
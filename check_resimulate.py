@@ -0,0 +1,130 @@
+import unittest
+import random
+import sys
+import os
+import logging
+from collections.abc import Mapping
+
+# Add root to path
+sys.path.append(os.getcwd())
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from equipment.component import create_random_component
+from hex_system.energy_packet import ProjectileContext, SynergyType
+from hex_system.hex_coord import HexCoord
+from hex_system.hex_tile import (AmplifierTile, BasicConduitTile, DetonationTriggerTile, OrbitalModulatorTile,
+                                 ReactorTile, ReflectorTile, ResonatorTile, ShieldGenTile, SplitterTile, WeaponMountTile)
+
+SLOTS = ["torso", "right_arm", "left_arm", "head", "back", "left_leg"]
+CONTEXT_FIELDS = ("damage_multiplier", "speed_multiplier", "projectile_count", "synergies", "path",
+                  "current_position", "current_direction", "is_active", "custom_effects")
+SYNERGIES = ["fire", "ice", "lightning", "vortex", "poison", "explosion", "kinetic", "pierce", "vampiric"]
+
+
+def canonical(value):
+    """Comparable form of a (flows, stats, exit_contexts) result: rounded floats, plain keys."""
+    if isinstance(value, Mapping):
+        return sorted((str(canonical(k)), canonical(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, set):
+        return sorted(str(canonical(v)) for v in value)
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, SynergyType):
+        return value.value
+    if isinstance(value, HexCoord):
+        return (value.q, value.r)
+    if isinstance(value, ProjectileContext):
+        return canonical({name: getattr(value, name) for name in CONTEXT_FIELDS}) + \
+            [type(modifier).__name__ for modifier in value.modifiers]
+    return value
+
+
+def random_tile(rng: random.Random):
+    roll = rng.random()
+    if roll < 0.25:
+        tile = SplitterTile()
+        tile.exit_directions = sorted(rng.sample(range(6), rng.randint(1, 4)))
+        return tile
+    if roll < 0.4:
+        tile = ReflectorTile()
+        tile.reflection_offset = rng.randint(1, 5)
+        tile.target_synergy = rng.choice(SYNERGIES)
+        return tile
+    if roll < 0.7:
+        return rng.choice([AmplifierTile, ResonatorTile, ShieldGenTile, OrbitalModulatorTile,
+                           DetonationTriggerTile, WeaponMountTile])()
+    tile = BasicConduitTile()
+    tile.set_exit_direction(rng.randint(0, 5))
+    return tile
+
+
+def apply_edit(component, coord: HexCoord, rng: random.Random) -> str:
+    """One hex editor action on coord (ui/hex_editor.py handle_input), made in place."""
+    grid = component.tile_slots
+    tile = grid.get(coord)
+    action = rng.choice(["place", "place", "rotate", "delete", "toggle", "synergy"])
+    if tile is None or action == "place":
+        grid[coord] = random_tile(rng)
+        return "place"
+    if action == "delete":
+        del grid[coord]
+    elif action == "toggle" and isinstance(tile, SplitterTile):
+        tile.toggle_exit_direction(rng.randint(0, 5))
+    elif action == "synergy" and isinstance(tile, ReflectorTile):
+        tile.target_synergy = SYNERGIES[(SYNERGIES.index(tile.target_synergy) + 1) % len(SYNERGIES)] \
+            if tile.target_synergy in SYNERGIES else SYNERGIES[0]
+    elif isinstance(tile, BasicConduitTile):
+        tile.set_exit_direction(tile.exit_direction + 1)
+    elif isinstance(tile, SplitterTile):
+        tile.exit_directions = sorted((d + 1) % 6 for d in tile.exit_directions)
+    elif isinstance(tile, ReflectorTile):
+        tile.reflection_offset = (tile.reflection_offset % 5) + 1
+    else:
+        del grid[coord] # Not rotatable: the editor deletes it
+        return "delete"
+    return action
+
+
+class TestResimulateFlow(unittest.TestCase):
+    """resimulate_flow after random edits must match a fresh simulate_flow of the edited layout."""
+    SEQUENCES = 300
+    EDITS = 10
+
+    def test_matches_full_simulation(self):
+        rng = random.Random(20260)
+        checked = resumed = 0
+        for sequence in range(self.SEQUENCES):
+            slot = SLOTS[sequence % len(SLOTS)]
+            random.seed(sequence)
+            component = create_random_component(rng.choice(["Rare", "Epic", "Legendary"]), slot)
+            coords = sorted(component.valid_coords, key=lambda h: (h.q, h.r))
+            editable = [h for h in coords if not isinstance(component.tile_slots.get(h), ReactorTile)]
+            for coord in editable:
+                if rng.random() < 0.7:
+                    component.tile_slots[coord] = random_tile(rng)
+            component.invalidate_flow_cache()
+
+            context = None if slot == "torso" else ProjectileContext(
+                synergies={SynergyType.FIRE: 40.0, SynergyType.ICE: 25.0, SynergyType.RAW: 10.0})
+            direction = rng.randint(0, 5)
+            trace = component.simulate_flow_traced(context, direction)
+
+            for edit in range(self.EDITS):
+                edited = {rng.choice(editable) for _ in range(rng.randint(1, 2))}
+                actions = [apply_edit(component, coord, rng) for coord in edited]
+                component.invalidate_flow_cache()
+
+                trace = component.resimulate_flow(trace, edited)
+                expected = component.simulate_flow(context, direction)
+                resumed += trace.resumed_from_step is not None
+                checked += 1
+                self.assertEqual(canonical(trace.result), canonical(expected),
+                                 f"sequence {sequence} ({slot}), edit {edit}: {actions} at {list(edited)}")
+        print(f"PASS: {checked} edits match full simulation ({resumed} resumed from a checkpoint)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    unittest.main()
@@ -16,10 +16,10 @@ class ProceduralAssetManager:
 
     def get_image(self, name: str, alpha: bool = True) -> pygame.Surface:
         if name in self.images:
-            logger.debug(f"Retrieved cached image '{name}'")
+            logger.debug("Retrieved cached image '%s'", name)
             return self.images[name]
 
-        logger.info(f"Loading image '{name}' from disk...")
+        logger.info("Loading image '%s' from disk...", name)
         image_path = os.path.join(constants.SPRITES_DIR, name)
         try:
             image = pygame.image.load(image_path)
@@ -30,7 +30,7 @@ class ProceduralAssetManager:
             self.images[name] = image
             return image
         except (pygame.error, FileNotFoundError):
-            logger.warning(f"Sprite '{name}' not found. Generating placeholder.")
+            logger.warning("Sprite '%s' not found. Generating placeholder.", name)
             placeholder = self._create_placeholder(name)
             self.images[name] = placeholder
             return placeholder
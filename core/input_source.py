@@ -0,0 +1,110 @@
+# pixbots_enhanced/core/input_source.py
+# Where the play loop gets input and time: pygame live, or scripted for headless runs.
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+
+class PressedKeys(frozenset):
+    """Held keys, indexable like pygame.key.get_pressed(): keys[pygame.K_d] -> bool."""
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self
+
+
+class PygameInput:
+    """Live keyboard, mouse and event queue."""
+
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+    def get_mouse_pos(self) -> Tuple[int, int]:
+        return pygame.mouse.get_pos()
+
+    def get_events(self) -> List:
+        return pygame.event.get()
+
+
+class ScriptedInput:
+    """
+    Input played back from a script. The script is a callable tick -> frame or a
+    list of frames (ticks past the end are idle). A frame is a dict:
+      {"keys": pygame key codes held, "mouse": (x, y) screen pos, "events": [pygame.event.Event]}
+    Missing entries mean no keys held, mouse unchanged, no events.
+    """
+
+    def __init__(self, script: Union[Callable[[int], Optional[Dict]], Sequence[Dict], None] = None):
+        self.script = script
+        self.tick = -1
+        self.keys = PressedKeys()
+        self.mouse = (0, 0)
+        self.events: List = []
+
+    def advance(self, tick: int):
+        """Loads the frame for `tick`. Called once per simulated frame, before the game steps."""
+        self.tick = tick
+        if callable(self.script):
+            frame = self.script(tick)
+        elif self.script is not None and tick < len(self.script):
+            frame = self.script[tick]
+        else:
+            frame = None
+        self.load(frame)
+
+    def load(self, frame: Optional[Dict]):
+        """Makes `frame` the current input (advance() does this from the script)."""
+        frame = frame or {}
+        self.keys = PressedKeys(frame.get("keys", ()))
+        self.mouse = tuple(frame.get("mouse", self.mouse))
+        self.events = list(frame.get("events", ()))
+
+    def get_pressed(self) -> PressedKeys:
+        return self.keys
+
+    def get_mouse_pos(self) -> Tuple[int, int]:
+        return self.mouse
+
+    def get_events(self) -> List:
+        events, self.events = self.events, []
+        return events
+
+
+class PygameClock:
+    """Game time in seconds since pygame.init()."""
+
+    def now(self) -> float:
+        return pygame.time.get_ticks() / 1000.0
+
+
+class SimulatedClock:
+    """Game time that only moves when advanced, so runs can go faster than real time."""
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def advance(self, dt: float):
+        self.time += dt
+
+    def now(self) -> float:
+        return self.time
+
+
+def key_frame(keys: Iterable[int] = (), mouse: Optional[Tuple[int, int]] = None, events: Iterable = ()) -> Dict:
+    """Builds a ScriptedInput frame."""
+    frame = {"keys": list(keys), "events": list(events)}
+    if mouse is not None:
+        frame["mouse"] = mouse
+    return frame
+
+
+def click_event(pos: Tuple[int, int], button: int = 1):
+    """A scripted mouse click at screen position `pos`."""
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=pos)
+
+
+PYGAME_INPUT = PygameInput()
+PYGAME_CLOCK = PygameClock()
@@ -0,0 +1,84 @@
+# pixbots_enhanced/core/log_utils.py
+# Cheap logging for hot paths: per-call-site rate limiting, time gates and lazy arguments.
+
+import logging
+import time
+from typing import Callable, Dict, Tuple
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (source file and line). A site may emit `burst`
+    records at once, then `rate` per second; the rest are dropped before they
+    reach the queue, and the next record that gets through says how many were.
+    Records above `max_level` (errors by default) always pass.
+    """
+    RATE = 5.0
+    BURST = 20
+
+    def __init__(self, rate: float = RATE, burst: int = BURST, max_level: int = logging.WARNING,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.clock = clock
+        self.sites: Dict[Tuple[str, int], list] = {} # site -> [tokens, last refill, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        now = self.clock()
+        site = self.sites.get((record.pathname, record.lineno))
+        if site is None:
+            self.sites[(record.pathname, record.lineno)] = [self.burst - 1.0, now, 0]
+            return True
+        tokens = min(self.burst, site[0] + (now - site[1]) * self.rate)
+        site[1] = now
+        if tokens < 1.0:
+            site[0] = tokens
+            site[2] += 1
+            return False
+        site[0] = tokens - 1.0
+        if site[2]:
+            record.msg = f"{record.getMessage()} [{site[2]} similar suppressed]"
+            record.args = None
+            site[2] = 0
+        return True
+
+    def suppressed(self) -> int:
+        """Records currently held back across all sites (not yet reported)."""
+        return sum(site[2] for site in self.sites.values())
+
+
+class Throttle:
+    """At most once per `interval` seconds (monotonic): `if _throttle.ready(): logger.debug(...)`."""
+    __slots__ = ("interval", "next_time", "clock")
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.next_time = 0.0
+        self.clock = clock
+
+    def ready(self) -> bool:
+        now = self.clock()
+        if now < self.next_time:
+            return False
+        self.next_time = now + self.interval
+        return True
+
+
+class Lazy:
+    """
+    Log argument computed only if the record is actually formatted:
+    logger.debug("stats: %s", Lazy(lambda: expensive_summary())).
+    """
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], object]):
+        self.fn = fn
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+    __repr__ = __str__
@@ -0,0 +1,193 @@
+# pixbots_enhanced/core/profiler.py
+# Scoped frame timers: rolling percentiles, an in-game overlay and Chrome trace export.
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+perf_counter = time.perf_counter
+
+
+class _NullSection:
+    """What section() hands out while profiling is off: enter and exit do nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Section:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler: 'FrameProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.begin(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.end()
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class FrameProfiler:
+    """
+    Named timers around the parts of a frame. Each section keeps its last
+    WINDOW samples (ms) in a ring buffer for rolling p50/p95/p99, and every
+    span is also kept as a Chrome trace_event ("ph": "X") for dump_trace(),
+    up to MAX_TRACE_EVENTS (oldest dropped first).
+
+    Sections nest: begin(name) ... end(), or `with profiler.section(name)`.
+    While disabled, begin() returns at once and section() hands out a shared
+    no-op, so the instrumented code pays one attribute check per call site.
+    Hot loops can check `enabled` themselves and call record() directly.
+    """
+    WINDOW = 600
+    MAX_TRACE_EVENTS = 500_000
+    OVERLAY_REFRESH = 15 # Frames between overlay redraws (percentiles aren't free)
+
+    def __init__(self, window: int = WINDOW, max_trace_events: int = MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.window = window
+        self.rings: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, int] = {}
+        self.trace = deque(maxlen=max_trace_events)
+        self.stack: List = []
+        self.frame = 0
+        self.origin = perf_counter()
+        self.pid = os.getpid()
+        self._pending: Optional[bool] = None
+        self._font = None
+        self._overlay = None
+        self._overlay_frame = -1
+
+    def set_enabled(self, enabled: bool):
+        """Turning profiling on starts from empty buffers."""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+        logger.info(f"Frame profiler {'enabled' if enabled else 'disabled'}.")
+
+    def toggle(self):
+        """Flips profiling at the end of the current frame, so no section is left half-open."""
+        self._pending = not self.enabled if self._pending is None else not self._pending
+
+    def reset(self):
+        self.rings.clear()
+        self.counts.clear()
+        self.trace.clear()
+        self.stack.clear()
+        self.frame = 0
+        self._overlay = None
+        self._overlay_frame = -1
+
+    def section(self, name: str):
+        if not self.enabled:
+            return NULL_SECTION
+        return _Section(self, name)
+
+    def begin(self, name: str):
+        if not self.enabled:
+            return
+        self.stack.append((name, perf_counter()))
+
+    def end(self):
+        """Closes the innermost open section (a no-op if none is open, e.g. just after enabling)."""
+        if not self.stack:
+            return
+        name, start = self.stack.pop()
+        self.record(name, start, perf_counter())
+
+    def record(self, name: str, start: float, end: float):
+        """Adds one span from perf_counter() readings `start` to `end`."""
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = np.zeros(self.window)
+            self.counts[name] = 0
+        count = self.counts[name]
+        ring[count % self.window] = (end - start) * 1000.0
+        self.counts[name] = count + 1
+        self.trace.append((name, start, end))
+
+    def end_frame(self):
+        """Marks a frame boundary and applies a pending toggle()."""
+        if self.enabled:
+            self.frame += 1
+        self.stack.clear()
+        if self._pending is not None:
+            self.set_enabled(self._pending)
+            self._pending = None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per section over its window: n (total samples), mean, p50, p95, p99 and max, in ms."""
+        stats = {}
+        for name, ring in self.rings.items():
+            count = self.counts[name]
+            samples = ring[:min(count, self.window)]
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            stats[name] = {"n": count, "mean": float(samples.mean()), "p50": float(p50),
+                           "p95": float(p95), "p99": float(p99), "max": float(samples.max())}
+        return stats
+
+    def trace_events(self) -> List[Dict]:
+        origin = self.origin
+        pid = self.pid
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "pixbots"}}]
+        for name, start, end in self.trace:
+            events.append({"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid, "tid": 0,
+                           "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6})
+        return events
+
+    def dump_trace(self, path: str) -> str:
+        """Writes the recorded spans as Chrome trace_event JSON (chrome://tracing, Perfetto)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        logger.info(f"Wrote {len(self.trace)} trace events to {path}")
+        return path
+
+    def overlay_lines(self) -> List[str]:
+        lines = [f"{'section':<22}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>7}  ms"]
+        for name, s in sorted(self.stats().items()):
+            lines.append(f"{name:<22}{s['p50']:7.2f}{s['p95']:7.2f}{s['p99']:7.2f}{s['max']:7.2f}")
+        return lines
+
+    def draw_overlay(self, screen, extra: Optional[List[str]] = None):
+        """Blits the percentile table (top right), re-rendering it every OVERLAY_REFRESH frames."""
+        import pygame
+
+        if self._font is None:
+            self._font = pygame.font.SysFont("monospace", 14)
+        font = self._font
+        if self._overlay is None or self.frame - self._overlay_frame >= self.OVERLAY_REFRESH:
+            lines = self.overlay_lines() + (extra or [])
+            rendered = [font.render(line, True, (220, 255, 220)) for line in lines]
+            line_height = font.get_linesize()
+            width = max(s.get_width() for s in rendered) + 12
+            surface = pygame.Surface((width, line_height * len(rendered) + 12), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 170))
+            for i, s in enumerate(rendered):
+                surface.blit(s, (6, 6 + i * line_height))
+            self._overlay = surface
+            self._overlay_frame = self.frame
+        screen.blit(self._overlay, (screen.get_width() - self._overlay.get_width() - 10, 10))
+
+
+profiler = FrameProfiler()
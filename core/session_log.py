@@ -0,0 +1,373 @@
+# pixbots_enhanced/core/session_log.py
+# Compact binary logs of play sessions (per-tick input, spawns, scheduling) for exact replay.
+
+import hashlib
+import json
+import logging
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import pygame
+
+import constants
+from core.input_source import PressedKeys
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PXRP"
+VERSION = 1
+
+# Held keys the play loop actually reads; a tick stores them as one bitmask
+WATCHED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+                pygame.K_LSHIFT, pygame.K_RSHIFT, pygame.K_LCTRL, pygame.K_RCTRL,
+                pygame.K_z, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4)
+
+DIGEST_EVERY = 60 # Ticks between state digests
+
+# Tick record: a flags byte, then one section per set flag, in flag order.
+# Anything not flagged is unchanged from the previous tick (time advances by dt).
+FLAG_KEYS = 0x01 # uint16 mask over WATCHED_KEYS
+FLAG_MOUSE = 0x02 # int16 x, y
+FLAG_EVENTS = 0x04 # uint16 count, then events
+FLAG_SPAWNS = 0x08 # uint16 count, then (class, level, x, y)
+FLAG_FAR_QUOTA = 0x10 # uint16 far-tier AI updates this tick
+FLAG_TIME = 0x20 # float64 dt, now
+FLAG_DIGEST = 0x40 # uint64 state digest after the tick
+FLAG_END = 0x80 # uint32 tick count, uint64 final digest; nothing follows
+
+_HEADER = struct.Struct("<4sHqqdQ") # magic, version, seed, map_seed, nominal dt, behaviors fingerprint
+_KEYS = struct.Struct("<H")
+_MOUSE = struct.Struct("<hh")
+_COUNT = struct.Struct("<H")
+_KEY_EVENT = struct.Struct("<BiI") # kind, key, unicode code point
+_BUTTON_EVENT = struct.Struct("<BBhh") # kind, button, x, y
+_SPAWN = struct.Struct("<Hdd") # level, x, y (class name precedes it)
+_QUOTA = struct.Struct("<H")
+_TIME = struct.Struct("<dd")
+_DIGEST = struct.Struct("<Q")
+_END = struct.Struct("<IQ")
+
+# Event kinds worth replaying (hover/motion only drives menus)
+_EVENT_KINDS = {pygame.QUIT: 0, pygame.KEYDOWN: 1, pygame.KEYUP: 2,
+                pygame.MOUSEBUTTONDOWN: 3, pygame.MOUSEBUTTONUP: 4}
+_EVENT_TYPES = {kind: event_type for event_type, kind in _EVENT_KINDS.items()}
+
+
+def state_digest(game) -> int:
+    """64-bit hash of every bot's position and hp, in update order."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(struct.pack("<I", len(game.all_bots)))
+    for bot in game.all_bots:
+        h.update(struct.pack("<ddd", bot.x, bot.y, bot.hp))
+    return int.from_bytes(h.digest(), "little")
+
+
+def behavior_fingerprint(behavior_system) -> int:
+    """64-bit hash of the loaded behavior library (graduations persist between runs)."""
+    library = {cls: [entry.to_dict() for entry in entries]
+               for cls, entries in behavior_system.behaviors.items()}
+    blob = json.dumps(library, sort_keys=True, default=str).encode()
+    return int.from_bytes(hashlib.blake2b(blob, digest_size=8).digest(), "little")
+
+
+class RecordingInput:
+    """
+    Wraps an input source and snapshots it once per tick (capture()), so the
+    game reads exactly what gets logged. Only WATCHED_KEYS read as held.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.keys = PressedKeys()
+        self.mouse = (0, 0)
+        self.events: List = []
+        self.captured_events: List = []
+
+    def capture(self):
+        pressed = self.inner.get_pressed()
+        self.keys = PressedKeys(key for key in WATCHED_KEYS if pressed[key])
+        self.mouse = tuple(self.inner.get_mouse_pos())
+        self.events = list(self.inner.get_events())
+        self.captured_events = list(self.events)
+
+    def get_pressed(self) -> PressedKeys:
+        return self.keys
+
+    def get_mouse_pos(self):
+        return self.mouse
+
+    def get_events(self) -> List:
+        events, self.events = self.events, []
+        return events
+
+
+class FrozenClock:
+    """Wraps a time source and holds its reading for the whole tick."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.time = inner.now()
+
+    def capture(self):
+        self.time = self.inner.now()
+
+    def now(self) -> float:
+        return self.time
+
+
+class SessionRecorder:
+    """
+    Writes a session log. attach() wraps the game's input and time sources;
+    the log opens at the next Game.initialize_game() (which reseeds the RNG
+    streams and records the seed), and the game calls begin_tick()/end_tick()
+    around every frame. Enemies spawned from outside the play loop (test
+    harnesses) must be reported with log_spawn() to replay.
+    """
+
+    def __init__(self, path: str, digest_every: int = DIGEST_EVERY):
+        self.path = path
+        self.digest_every = digest_every
+        self.file = None
+        self.compressor = None
+        self.seed: Optional[int] = None
+        self.input: Optional[RecordingInput] = None
+        self.clock: Optional[FrozenClock] = None
+        self.tick = 0
+        self.dt = 0.0
+        self.nominal_dt = 1.0 / constants.FPS # Ticks of exactly this dt store no time
+        self.in_tick = False
+        self.drop_events = False
+        self.pending_spawns: List = []
+        self.last_mask = 0
+        self.last_mouse = None
+        self.last_now = None
+        self.last_quota = None
+        self.last_scheduler_frame = None
+        self.bytes_raw = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.file is not None
+
+    def attach(self, game):
+        self.input = RecordingInput(game.input_source)
+        self.clock = FrozenClock(game.time_source)
+        game.input_source = self.input
+        game.time_source = self.clock
+        if game.player:
+            game.player.input_source = self.input
+            game.player.time_source = self.clock
+        game.recorder = self
+
+    def open(self, game, seed: int):
+        """Starts the log for the game just initialized from `seed`."""
+        self.seed = seed
+        self.file = open(self.path, "wb")
+        self.file.write(_HEADER.pack(MAGIC, VERSION, seed, game.game_map.seed, self.nominal_dt,
+                                     behavior_fingerprint(game.behavior_system)))
+        self.compressor = zlib.compressobj(9)
+        self.tick = 0
+        # Opened mid-tick (new game from the menu): this tick's events were the menu's
+        self.drop_events = self.in_tick
+        logger.info(f"Recording session to {self.path} (seed {seed}, map {game.game_map.seed})")
+
+    def begin_tick(self, dt: float):
+        self.input.capture()
+        self.clock.capture()
+        self.dt = dt
+        self.in_tick = True
+
+    def log_spawn(self, enemy_class: str, level: int, x: float, y: float):
+        """Records an enemy spawned by the caller; replays respawn it before the next tick."""
+        if self.is_open:
+            self.pending_spawns.append((enemy_class, level, x, y))
+
+    def end_tick(self, game):
+        self.in_tick = False
+        if not self.is_open:
+            return
+        flags = 0
+        body = bytearray()
+
+        mask = 0
+        for bit, key in enumerate(WATCHED_KEYS):
+            if key in self.input.keys:
+                mask |= 1 << bit
+        if mask != self.last_mask:
+            flags |= FLAG_KEYS
+            body += _KEYS.pack(mask)
+            self.last_mask = mask
+
+        if self.input.mouse != self.last_mouse:
+            flags |= FLAG_MOUSE
+            body += _MOUSE.pack(*self.input.mouse)
+            self.last_mouse = self.input.mouse
+
+        events = [] if self.drop_events else self._encode_events(self.input.captured_events)
+        self.drop_events = False
+        if events:
+            flags |= FLAG_EVENTS
+            body += _COUNT.pack(len(events))
+            for event in events:
+                body += event
+
+        if self.pending_spawns:
+            flags |= FLAG_SPAWNS
+            body += _COUNT.pack(len(self.pending_spawns))
+            for enemy_class, level, x, y in self.pending_spawns:
+                name = enemy_class.encode()
+                body += bytes((len(name),)) + name + _SPAWN.pack(level, x, y)
+            self.pending_spawns = []
+
+        scheduler = game.ai_scheduler
+        if scheduler.frame != self.last_scheduler_frame:
+            self.last_scheduler_frame = scheduler.frame
+            quota = scheduler.stats["far_updated"]
+            if quota != self.last_quota:
+                flags |= FLAG_FAR_QUOTA
+                body += _QUOTA.pack(quota)
+                self.last_quota = quota
+
+        now = self.clock.time
+        if self.last_now is None or self.dt != self.nominal_dt or now != self.last_now + self.dt:
+            flags |= FLAG_TIME
+            body += _TIME.pack(self.dt, now)
+        self.last_now = now
+
+        self.tick += 1
+        if self.tick % self.digest_every == 0:
+            flags |= FLAG_DIGEST
+            body += _DIGEST.pack(state_digest(game))
+
+        self._write(bytes((flags,)) + body)
+
+    def close(self, game=None):
+        """Writes the end marker (with a final digest when `game` is given) and closes the file."""
+        if not self.is_open:
+            return
+        self._write(bytes((FLAG_END,)) + _END.pack(self.tick, state_digest(game) if game else 0))
+        self.file.write(self.compressor.flush())
+        size = self.file.tell()
+        self.file.close()
+        self.file = None
+        logger.info(f"Recorded {self.tick} ticks to {self.path} ({size} bytes, {self.bytes_raw} raw)")
+
+    def _write(self, record: bytes):
+        self.bytes_raw += len(record)
+        self.file.write(self.compressor.compress(record))
+
+    @staticmethod
+    def _encode_events(events) -> List[bytes]:
+        encoded = []
+        for event in events:
+            kind = _EVENT_KINDS.get(event.type)
+            if kind is None:
+                continue
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                text = getattr(event, "unicode", "")
+                encoded.append(_KEY_EVENT.pack(kind, event.key, ord(text) if len(text) == 1 else 0))
+            elif event.type == pygame.QUIT:
+                encoded.append(bytes((kind,)))
+            else:
+                encoded.append(_BUTTON_EVENT.pack(kind, event.button, *event.pos))
+        return encoded
+
+
+class SessionReader:
+    """
+    Reads a session log. Iterating yields one dict per tick:
+      {"tick", "dt", "now", "frame" (a ScriptedInput frame), "spawns", "far_quota", "digest"}
+    digest is None on ticks without a checkpoint. After iteration, `ticks`
+    and `final_digest` hold the end marker (None if the log was cut short).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            payload = f.read()
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path}: not a session log (too short)")
+        magic, version, self.seed, self.map_seed, self.dt, self.behaviors = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a session log")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported session log version {version}")
+        self.data = zlib.decompressobj().decompress(payload) # Tolerates a truncated stream
+        self.ticks: Optional[int] = None
+        self.final_digest: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        data = self.data
+        pos = 0
+        keys = PressedKeys()
+        far_quota = None
+        now = 0.0
+        dt = self.dt
+        tick = 0
+        try:
+            while pos < len(data):
+                flags = data[pos]
+                pos += 1
+                if flags & FLAG_END:
+                    self.ticks, self.final_digest = _END.unpack_from(data, pos)
+                    return
+                frame = {}
+                spawns = []
+                digest = None
+                if flags & FLAG_KEYS:
+                    (mask,) = _KEYS.unpack_from(data, pos)
+                    pos += _KEYS.size
+                    keys = PressedKeys(key for bit, key in enumerate(WATCHED_KEYS) if mask >> bit & 1)
+                if flags & FLAG_MOUSE:
+                    frame["mouse"] = _MOUSE.unpack_from(data, pos)
+                    pos += _MOUSE.size
+                if flags & FLAG_EVENTS:
+                    (count,) = _COUNT.unpack_from(data, pos)
+                    pos += _COUNT.size
+                    events = []
+                    for _ in range(count):
+                        event, pos = self._decode_event(data, pos)
+                        events.append(event)
+                    frame["events"] = events
+                if flags & FLAG_SPAWNS:
+                    (count,) = _COUNT.unpack_from(data, pos)
+                    pos += _COUNT.size
+                    for _ in range(count):
+                        length = data[pos]
+                        name = data[pos + 1:pos + 1 + length].decode()
+                        pos += 1 + length
+                        level, x, y = _SPAWN.unpack_from(data, pos)
+                        pos += _SPAWN.size
+                        spawns.append((name, level, x, y))
+                if flags & FLAG_FAR_QUOTA:
+                    (far_quota,) = _QUOTA.unpack_from(data, pos)
+                    pos += _QUOTA.size
+                if flags & FLAG_TIME:
+                    dt, now = _TIME.unpack_from(data, pos)
+                    pos += _TIME.size
+                else:
+                    dt = self.dt
+                    now += dt
+                if flags & FLAG_DIGEST:
+                    (digest,) = _DIGEST.unpack_from(data, pos)
+                    pos += _DIGEST.size
+                frame["keys"] = keys
+                yield {"tick": tick, "dt": dt, "now": now, "frame": frame, "spawns": spawns,
+                       "far_quota": far_quota, "digest": digest}
+                tick += 1
+        except (struct.error, IndexError):
+            logger.warning(f"{self.path}: log cut short after {tick} ticks")
+
+    @staticmethod
+    def _decode_event(data: bytes, pos: int):
+        kind = data[pos]
+        event_type = _EVENT_TYPES[kind]
+        if event_type == pygame.QUIT:
+            return pygame.event.Event(event_type), pos + 1
+        if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+            _, key, code = _KEY_EVENT.unpack_from(data, pos)
+            return pygame.event.Event(event_type, key=key, unicode=chr(code) if code else "", mod=0), pos + _KEY_EVENT.size
+        _, button, x, y = _BUTTON_EVENT.unpack_from(data, pos)
+        return pygame.event.Event(event_type, button=button, pos=(x, y)), pos + _BUTTON_EVENT.size
@@ -4,13 +4,23 @@ import logging
 import math
 from typing import Dict, Optional
 
+import constants
 from core.asset_manager import ProceduralAssetManager
+from core.log_utils import Throttle
 from equipment.component import ComponentEquipment
 
 logger = logging.getLogger(__name__)
 
+# Player render diagnostics, once a second at most
+_missing_sprite_log = Throttle(1.0)
+_render_pos_log = Throttle(1.0)
+_render_alpha_log = Throttle(1.0)
+
+MAX_STEP_DISTANCE = constants.TILE_SIZE / 2 # Longest single collision-tested move, in pixels
+
 class Bot:
     """Unified bot class for all characters."""
+    movement_batch = None # Open MovementSystem batch; update_movement queues into it
 
     def __init__(self, name: str, x: float, y: float, **kwargs):
         self.name = name
@@ -45,7 +55,7 @@ class Bot:
         self.status_effects = {} # name -> {duration, power, tick_timer}
         
         self.recalculate_stats()
-        logger.debug(f"Initialized bot '{self.name}'.")
+        logger.debug("Initialized bot '%s'.", self.name)
 
     def update(self, dt: float):
         self.update_status_effects(dt)
@@ -87,7 +97,7 @@ class Bot:
         for name in expired:
             del self.status_effects[name]
             if name == "freeze":
-                logger.debug(f"{self.name} is no longer frozen.")
+                logger.debug("%s is no longer frozen.", self.name)
 
     def apply_status_effect(self, name: str, duration: float, power: float):
         if name in self.status_effects:
@@ -96,9 +106,13 @@ class Bot:
             self.status_effects[name]["power"] = max(self.status_effects[name]["power"], power)
         else:
             self.status_effects[name] = {"duration": duration, "power": power, "tick_timer": 1.0}
-            logger.debug(f"{self.name} applied status: {name}")
+            logger.debug("%s applied status: %s", self.name, name)
 
     def update_movement(self, input_x: float, input_y: float, dt: float, game_map=None):
+        batch = Bot.movement_batch
+        if batch is not None and batch.queue(self, input_x, input_y, dt, game_map):
+            return # Integrated later with the rest of the batch
+        
         # Apply Status Effects to Movement
         accel = self.acceleration
         max_spd = self.max_speed
@@ -131,13 +145,19 @@ class Bot:
                 self.velocity_x *= scale
                 self.velocity_y *= scale
 
+        # Collision only tests the destination tile, so a long step (a coarse far-tier AI
+        # update) is marched in sub-steps that can't carry the bot over a whole tile
+        steps = max(1, math.ceil(math.hypot(self.velocity_x, self.velocity_y) * dt / MAX_STEP_DISTANCE))
+        for _ in range(steps):
+            self._move_and_collide(dt / steps, game_map)
+
+    def _move_and_collide(self, dt: float, game_map=None):
         # Predict next position
         next_x = self.x + self.velocity_x * dt
         next_y = self.y + self.velocity_y * dt
         
         # Collision Detection (if game_map provided)
         if game_map:
-            import constants
             tile_size = constants.TILE_SIZE
             
             # Check X collision
@@ -155,7 +175,7 @@ class Bot:
                 if abs(self.velocity_x) > 300: # Threshold for impact damage
                     dmg = abs(self.velocity_x) * 0.1
                     self.take_damage(dmg)
-                    logger.debug(f"{self.name} hit wall X with speed {self.velocity_x}, took {dmg} damage")
+                    logger.debug("%s hit wall X with speed %s, took %s damage", self.name, self.velocity_x, dmg)
                 
                 self.velocity_x = 0
                 next_x = self.x # Cancel X movement
@@ -175,7 +195,7 @@ class Bot:
                 if abs(self.velocity_y) > 300:
                     dmg = abs(self.velocity_y) * 0.1
                     self.take_damage(dmg)
-                    logger.debug(f"{self.name} hit wall Y with speed {self.velocity_y}, took {dmg} damage")
+                    logger.debug("%s hit wall Y with speed %s, took %s damage", self.name, self.velocity_y, dmg)
                 
                 self.velocity_y = 0
                 next_y = self.y # Cancel Y movement
@@ -218,10 +238,10 @@ class Bot:
     def take_damage(self, amount: float):
         actual_damage = max(1, amount - self.total_armor)
         self.hp -= actual_damage
-        logger.debug(f"'{self.name}' took {actual_damage:.1f} damage ({self.hp:.1f}/{self.max_hp:.1f} HP)")
+        logger.debug("'%s' took %.1f damage (%.1f/%.1f HP)", self.name, actual_damage, self.hp, self.max_hp)
         if self.hp <= 0:
             self.hp = 0
-            logger.info(f"'{self.name}' has been destroyed!")
+            logger.info("'%s' has been destroyed!", self.name)
 
     def heal(self, amount: float):
         """Restores health to the bot."""
@@ -229,7 +249,7 @@ class Bot:
         self.hp = min(self.hp + amount, self.max_hp)
         healed = self.hp - old_hp
         if healed > 0:
-            logger.debug(f"'{self.name}' healed for {healed:.1f} ({self.hp:.1f}/{self.max_hp:.1f} HP)")
+            logger.debug("'%s' healed for %.1f (%.1f/%.1f HP)", self.name, healed, self.hp, self.max_hp)
 
     def render(self, screen: pygame.Surface, offset_x: int, offset_y: int):
         if self.sprite is None and self.asset_manager:
@@ -238,18 +258,18 @@ class Bot:
                 self.mask = pygame.mask.from_surface(self.sprite)
         
         # Debug: Check for missing sprite
-        if self.sprite is None and self.name == "Player" and (pygame.time.get_ticks() % 1000) < 20:
-             logger.warning(f"Player Sprite is MISSING! AssetManager: {self.asset_manager is not None}, SpriteName: {self.sprite_name}")
+        if self.sprite is None and self.name == "Player" and _missing_sprite_log.ready():
+             logger.warning("Player Sprite is MISSING! AssetManager: %s, SpriteName: %s", self.asset_manager is not None, self.sprite_name)
              if self.asset_manager:
-                 logger.warning(f"Attempting to load: {self.sprite_name}")
+                 logger.warning("Attempting to load: %s", self.sprite_name)
 
         if self.sprite:
             sx = int(self.x + offset_x - self.sprite.get_width() / 2)
             sy = int(self.y + offset_y - self.sprite.get_height() / 2)
             
             # Debug render pos
-            if self.name == "Player" and (pygame.time.get_ticks() % 2000) < 20:
-                 logger.debug(f"Rendering Player at Screen: ({sx}, {sy}), World: ({self.x}, {self.y})")
+            if self.name == "Player" and logger.isEnabledFor(logging.DEBUG) and _render_pos_log.ready():
+                 logger.debug("Rendering Player at Screen: (%d, %d), World: (%s, %s)", sx, sy, self.x, self.y)
 
         else:
             # Fallback Rendering (Fix for Invisible Player)
@@ -270,8 +290,8 @@ class Bot:
             # Support Transparency (Cloak)
             current_alpha = getattr(self, 'alpha', 255)
             # Log once every ~1 second (1000ms)
-            if self.name == "Player" and (pygame.time.get_ticks() % 1000) < 20: 
-                 logger.debug(f"Rendering Player: Alpha={current_alpha}, Pos=({self.x:.1f},{self.y:.1f})")
+            if self.name == "Player" and logger.isEnabledFor(logging.DEBUG) and _render_alpha_log.ready():
+                 logger.debug("Rendering Player: Alpha=%s, Pos=(%.1f,%.1f)", current_alpha, self.x, self.y)
 
             if current_alpha < 255:
                 self.sprite.set_alpha(current_alpha)
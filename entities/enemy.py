@@ -1,10 +1,12 @@
 from .bot import Bot
 import math
-import random
+from core.rng import stream
 import pygame
 import logging
 from .sprite_generator import ProceduralBotGenerator
 
+rng = stream("enemy") # Spawn variety, wander, tactics and aim spread
+
 class Enemy(Bot):
     # Static generator instance to share across enemies (optional, but good for caching if we add it)
     _generator = ProceduralBotGenerator()
@@ -15,7 +17,7 @@ class Enemy(Bot):
         # Generate unique seed for this enemy based on position and random factor
         # This ensures if we reload the game with same seed, enemies might look similar if we used map seed,
         # but here we want variety.
-        seed = random.randint(0, 999999)
+        seed = rng.randint(0, 999999)
         
         if ai_class == "sniper":
             sprite, metadata = self._generator.generate_sniper(seed)
@@ -92,12 +94,12 @@ class Enemy(Bot):
         # Random Synergy
         # 20% chance per level to have a synergy (Level 1 = 20%, Level 5 = 100%)
         self.synergy = None
-        if random.random() < (level * 0.2):
+        if rng.random() < (level * 0.2):
             synergies = ["fire", "ice", "vortex", "explosion", "kinetic", "vampiric"]
-            self.synergy = random.choice(synergies)
+            self.synergy = rng.choice(synergies)
             # Boss always has a synergy
         if self.ai_class == "Boss":
-                self.synergy = random.choice(["vortex", "explosion", "fire"]) # Bosses get the cool ones
+                self.synergy = rng.choice(["vortex", "explosion", "fire"]) # Bosses get the cool ones
         
         # Squad Affiliation
         self.squad_id = None
@@ -144,8 +146,8 @@ class Enemy(Bot):
                 # Random movement
                 self.move_timer -= dt
                 if self.move_timer <= 0:
-                    self.move_timer = random.uniform(1.0, 3.0)
-                    angle = random.uniform(0, math.pi * 2)
+                    self.move_timer = rng.uniform(1.0, 3.0)
+                    angle = rng.uniform(0, math.pi * 2)
                     self.move_dir = (math.cos(angle), math.sin(angle))
                 self.update_movement(self.move_dir[0], self.move_dir[1], dt, game_map)
                 
@@ -161,8 +163,7 @@ class Enemy(Bot):
                     self.state = "idle" 
                 else:
                     # Move to range
-                    dx = self.target_pos[0] - self.x
-                    dy = self.target_pos[1] - self.y
+                    dx, dy = self._steer_toward(self.target_pos, game_map)
                     self.update_movement(dx, dy, dt, game_map)
             else: # Grunt / Ambusher
                 if dist < self.attack_range:
@@ -171,8 +172,7 @@ class Enemy(Bot):
                     self.state = "idle"
                 else:
                     # Move towards target
-                    dx = self.target_pos[0] - self.x
-                    dy = self.target_pos[1] - self.y
+                    dx, dy = self._steer_toward(self.target_pos, game_map)
                     self.update_movement(dx, dy, dt, game_map)
 
         elif self.state == "flee":
@@ -180,8 +180,7 @@ class Enemy(Bot):
                  self.state = "attack"
              else:
                  # Run away!
-                 dx = self.x - self.target_pos[0]
-                 dy = self.y - self.target_pos[1]
+                 dx, dy = self._steer_away(self.target_pos, game_map)
                  self.update_movement(dx, dy, dt, game_map)
                 
         elif self.state == "attack":
@@ -193,8 +192,7 @@ class Enemy(Bot):
                 # Stop and shoot (or keep moving if ambusher?)
                 if self.ai_class == "ambusher":
                      # Circle strafe? For now just chase/attack
-                     dx = self.target_pos[0] - self.x
-                     dy = self.target_pos[1] - self.y
+                     dx, dy = self._steer_toward(self.target_pos, game_map)
                      self.update_movement(dx, dy, dt, game_map)
                 else:
                     self.update_movement(0, 0, dt, game_map)
@@ -205,6 +203,20 @@ class Enemy(Bot):
                 # Shoot at perceived position
                 self.shoot(self.target_pos[0], self.target_pos[1], combat_system, current_time)
 
+    def _steer_toward(self, target_pos, game_map=None):
+        """Movement input toward target_pos, routed around terrain by the map's flow field."""
+        flow_field = getattr(game_map, "flow_field", None)
+        if flow_field:
+            return flow_field.steer(self.x, self.y, target_pos[0], target_pos[1])
+        return target_pos[0] - self.x, target_pos[1] - self.y
+
+    def _steer_away(self, target_pos, game_map=None):
+        """Movement input away from target_pos (flow field gradient ascent when available)."""
+        flow_field = getattr(game_map, "flow_field", None)
+        if flow_field:
+            return flow_field.flee(self.x, self.y, target_pos[0], target_pos[1])
+        return self.x - target_pos[0], self.y - target_pos[1]
+
     def try_tactics(self, dt):
         if self.shield_cooldown > 0: self.shield_cooldown -= dt
         if self.buff_cooldown > 0: self.buff_cooldown -= dt
@@ -262,12 +274,12 @@ class Enemy(Bot):
                 logging.getLogger(__name__).info(f"{self.name} activated SHIELD!")
 
         if "buff" in self.tactics and not self.buff_active and self.buff_cooldown <= 0:
-            if random.random() < 0.01: 
+            if rng.random() < 0.01: 
                 self.buff_active = True
                 if self.weapons:
                     self.weapons[0]["damage"] *= 1.5
                 self.buff_cooldown = 15.0
-                logging.getLogger(__name__).info(f"{self.name} activated BUFF!")
+                logging.getLogger(__name__).info("%s activated BUFF!", self.name)
 
     def take_damage(self, amount):
         import constants
@@ -292,7 +304,7 @@ class Enemy(Bot):
             angle = math.atan2(target_y - self.y, target_x - self.x)
             
             # Add some inaccuracy
-            angle += random.uniform(-0.1, 0.1)
+            angle += rng.uniform(-0.1, 0.1)
             
             effects = {}
             # Use weapon specific synergy if available, else fallback to bot synergy
@@ -1,12 +1,28 @@
 
 from .bot import Bot
 import pygame
+import logging
 import constants
+from core.input_source import PYGAME_CLOCK, PYGAME_INPUT
 from hex_system.hex_tile import SecondaryOutputTile, TargetSystem
 
+logger = logging.getLogger(__name__)
+
+# Torso exit direction -> entry side of the connected component
+TORSO_CONNECTIONS = {
+    "right_arm": {"from": 0, "to": 3}, # Torso E -> Arm W
+    "left_arm":  {"from": 3, "to": 0}, # Torso W -> Arm E
+    "head":      {"from": 1, "to": 4}, # Torso NE -> Head SW
+    "back":      {"from": 2, "to": 5}, # Torso NW -> Back SE
+    "right_leg": {"from": 5, "to": 2}, # Torso SE -> R.Leg NW
+    "left_leg":  {"from": 4, "to": 1}, # Torso SW -> L.Leg NE
+    "legs":      {"from": 5, "to": 2}  # Legacy/Fallback
+}
+
 class Player(Bot):
     """Player-specific bot class."""
     def __init__(self, name: str, x: float, y: float, use_components: bool = True):
+        self.loadout_plan = None # Built by rebuild_loadout_plan() on equip/stat changes
         super().__init__(name, x, y)
         self.is_player = True
         self.inventory = []
@@ -44,6 +60,10 @@ class Player(Bot):
         self.orbital_mode = False 
         self.orbital_mode_prev = False
         self.active_orbitals = [] # Track active orbital projectiles
+        
+        # Input and clock; the Game swaps in its own (scripted ones when headless)
+        self.input_source = PYGAME_INPUT
+        self.time_source = PYGAME_CLOCK
 
     def take_damage(self, amount: float):
         # Intercept damage for Shield
@@ -67,79 +87,26 @@ class Player(Bot):
         angle = math.atan2(target_y - self.y, target_x - self.x)
         self.angle = angle
         
-        import logging
-        logger = logging.getLogger(__name__)
+        # R2: Multi-Weapon Firing from the precomputed loadout plan (no flow simulation here)
+        if self.loadout_plan is None:
+            self.rebuild_loadout_plan()
         
-        # R2: Body Simulation & Multi-Weapon Firing
-        torso = self.components.get("torso")
-        torso_exits = {}
-        processed_components = [] # List of (comp, stats)
-        
-        # 1. Simulate Torso
-        if torso:
-             _, t_stats, torso_exits = torso.simulate_flow()
-             if t_stats.get("weapon_damage", 0) > 0:
-                 processed_components.append((torso, t_stats))
-        
-        # 2. Simulate Connected Components
-        connection_map = {
-            "right_arm": {"from": 0, "to": 3}, # Torso E -> Arm W
-            "left_arm":  {"from": 3, "to": 0}, # Torso W -> Arm E
-            "head":      {"from": 1, "to": 4}, # Torso NE -> Head SW
-            "back":      {"from": 2, "to": 5}, # Torso NW -> Back SE
-            "right_leg": {"from": 5, "to": 2}, # Torso SE -> R.Leg NW
-            "left_leg":  {"from": 4, "to": 1}, # Torso SW -> L.Leg NE
-            "legs":      {"from": 5, "to": 2}  # Legacy/Fallback
-        }
-        
-        for slot, comp in self.components.items():
-            if not comp or slot == "torso": continue
-            
-            context = None
-            input_dir = 0
-            
-            if slot in connection_map:
-                conn = connection_map[slot]
-                context = torso_exits.get(conn["from"])
-                input_dir = conn["to"]
-                
-                if context:
-                     logger.info(f"DEBUG: Torso Output to {slot}: {context.magnitude} (Synergies: {context.synergies})")
-            
-            _, stats, _ = comp.simulate_flow(context, input_dir)
-            
-            if stats.get("weapon_damage", 0) > 0:
-                processed_components.append((comp, stats))
-
-        # 3. Fire Weapons (Wave-based Staggered)
+        # Fire Weapons (Wave-based Staggered)
         fired_any = False
         pending_groups = [] # List of {'damage': float, 'actions': []}
         
-        for comp, stats in processed_components:
+        for weapon in self.loadout_plan:
             fired_any = True
-            damage = stats["weapon_damage"]
+            damage = weapon["damage"]
             
             # Create a group for this component's wave
             current_group = {'damage': damage, 'actions': []}
             
-            effects = stats.get("active_synergy_effects", {})
-            if "active_synergy" in stats:
-                effects["synergy_name"] = str(stats["active_synergy"]).lower().split('.')[-1]
-            effects["rarity"] = comp.quality
-            
-            # R3: Kinetic Synergy Spread
-            synergy_mags = stats.get("synergy_magnitudes", {})
-            kinetic_rate = synergy_mags.get("kinetic", 0.0)
-            # Lower threshold to 40.0 to allow complex builds (with splitters/loss) to achieve perfect accuracy
-            spread_factor = max(0.0, 1.0 - (kinetic_rate / 40.0))
-            logger.info(f"DEBUG: Kinetic Rate: {kinetic_rate}, Spread Factor: {spread_factor}")
+            # Fresh copy per trigger pull: projectiles mutate their effects (e.g. detonation_time)
+            effects = dict(weapon["effects"])
             
-            weapon_inputs = stats.get("weapon_inputs", [])
-            spread_count = len(weapon_inputs) if weapon_inputs else 1
-            spread_count = max(1, spread_count)
-            
-            base_spread = 0.15
-            current_spread_step = base_spread * spread_factor
+            spread_count = weapon["spread_count"]
+            current_spread_step = weapon["spread_step"]
             
             # Center the spread
             start_angle = angle - (spread_count - 1) * current_spread_step / 2
@@ -181,11 +148,6 @@ class Player(Bot):
             # Add the finished group to pending lists
             if current_group['actions']:
                 pending_groups.append(current_group)
-        
-        # DEBUG: Check wave count
-        if len(pending_groups) > 0:
-            logger.info(f"Player.shoot: Created {len(pending_groups)} weapon groups (waves).")
-
 
         if pending_groups:
             # Sort Groups by Damage (Descending) - Most powerful WEAPON fires first
@@ -205,6 +167,73 @@ class Player(Bot):
         if fired_any:
             self.weapon["last_shot"] = current_time
 
+    def rebuild_loadout_plan(self):
+        """
+        Resolves torso -> arm/head/back/leg routing once and stores per-weapon
+        damage, effects and spread. Runs on equip/recalculate_stats; shoot() only reads it.
+        """
+        plan = []
+        
+        # R2: Body Simulation
+        torso = self.components.get("torso")
+        torso_exits = {}
+        
+        # 1. Simulate Torso
+        if torso:
+             _, t_stats, torso_exits = torso.simulate_flow()
+             if t_stats.get("weapon_damage", 0) > 0:
+                 plan.append(self._compile_weapon(torso, t_stats))
+        
+        # 2. Simulate Connected Components
+        for slot, comp in self.components.items():
+            if not comp or slot == "torso": continue
+            
+            context = None
+            input_dir = 0
+            
+            if slot in TORSO_CONNECTIONS:
+                conn = TORSO_CONNECTIONS[slot]
+                context = torso_exits.get(conn["from"])
+                input_dir = conn["to"]
+                
+                if context:
+                     logger.debug("Loadout: Torso Output to %s: %s (Synergies: %s)", slot, context.magnitude, context.synergies)
+            
+            _, stats, _ = comp.simulate_flow(context, input_dir)
+            
+            if stats.get("weapon_damage", 0) > 0:
+                plan.append(self._compile_weapon(comp, stats))
+        
+        logger.debug("Loadout plan rebuilt: %d weapon groups.", len(plan))
+        self.loadout_plan = plan
+        return plan
+
+    def _compile_weapon(self, comp, stats: dict) -> dict:
+        """Freezes the per-shot values Player.shoot needs for one weapon component."""
+        effects = dict(stats.get("active_synergy_effects", {}))
+        if "active_synergy" in stats:
+            effects["synergy_name"] = str(stats["active_synergy"]).lower().split('.')[-1]
+        effects["rarity"] = comp.quality
+        
+        # R3: Kinetic Synergy Spread
+        synergy_mags = stats.get("synergy_magnitudes", {})
+        kinetic_rate = synergy_mags.get("kinetic", 0.0)
+        # Lower threshold to 40.0 to allow complex builds (with splitters/loss) to achieve perfect accuracy
+        spread_factor = max(0.0, 1.0 - (kinetic_rate / 40.0))
+        logger.debug("Loadout: %s Kinetic Rate: %s, Spread Factor: %s", comp.slot, kinetic_rate, spread_factor)
+        
+        weapon_inputs = stats.get("weapon_inputs", [])
+        spread_count = len(weapon_inputs) if weapon_inputs else 1
+        
+        base_spread = 0.15
+        return {
+            "component": comp,
+            "damage": stats["weapon_damage"],
+            "effects": effects,
+            "spread_count": max(1, spread_count),
+            "spread_step": base_spread * spread_factor,
+        }
+
     # Helper to capture arguments for delayed execution
     def _queue_shot(self, combat_system, x, y, angle, speed, damage, p_type, owner, effects):
         def action():
@@ -288,7 +317,7 @@ class Player(Bot):
                  self.shield = min(self.max_shield, self.shield + regen_rate * dt)
         
         # Process Fire Queue (Staggered Shots)
-        current_time = pygame.time.get_ticks() / 1000.0
+        current_time = self.time_source.now()
         remaining_queue = []
         for fire_time, action_func in self.fire_queue:
             if current_time >= fire_time:
@@ -307,7 +336,7 @@ class Player(Bot):
         self.active_orbitals = [orb for orb in self.active_orbitals if orb.active and getattr(orb, "active_orbit", False)]
 
         # Input Handling (Secondary Actions & Modes)
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
         
         # Helper to find specific system action
         def activate_system(target_sys_list):
@@ -358,6 +387,9 @@ class Player(Bot):
     def recalculate_stats(self):
         super().recalculate_stats()
         
+        # Equip/edit changes re-route the body once here instead of on every shot
+        self.rebuild_loadout_plan()
+        
         # S2: Scan for Secondary Outputs
         self.secondary_actions = []
         self.has_shield = False
@@ -34,57 +34,61 @@ class Projectile:
         
         screen_x = int(self.x + camera_x)
         screen_y = int(self.y + camera_y)
-        
-        # Determine active synergies
-        active_synergies = self.effects.get("active_synergies", [])
-        if not active_synergies and self.effects.get("synergy_name"):
-            active_synergies = [self.effects.get("synergy_name")]
-            
-        # Default if no synergy
-        if not active_synergies:
-            pygame.draw.circle(screen, (255, 255, 0), (screen_x, screen_y), 4)
-            return
+        render_projectile(screen, screen_x, screen_y, self.damage, self.owner, self.effects)
 
-        # Color Mapping
-        colors = {
-            "vortex": (180, 50, 255),    # Bright Purple
-            "fire": (255, 80, 0),        # Orange-Red
-            "ice": (100, 220, 255),      # Cyan
-            "lightning": (200, 200, 255),# White-Blue
-            "explosion": (255, 50, 50),  # Red
-            "kinetic": (200, 200, 200),  # Grey
-            "poison": (50, 255, 50),     # Green
-            "pierce": (255, 255, 200),   # Pale Yellow
-            "vampiric": (150, 0, 0)      # Blood Red
-        }
 
-        # Render Concentric Rings
-        base_radius = 6 if "vortex" in active_synergies else 4
-        if "explosion" in active_synergies: base_radius = 5
+def render_projectile(screen, screen_x, screen_y, damage, owner, effects):
+    """Draws one projectile; shared by Projectile and the ProjectilePool."""
+    # Determine active synergies
+    active_synergies = effects.get("active_synergies", [])
+    if not active_synergies and effects.get("synergy_name"):
+        active_synergies = [effects.get("synergy_name")]
         
-        # Ensure minimum visibility (Fix for invisible projectiles)
-        # Use damage to scale, but clamp to min 4 and max 15 to avoid huge particles
-        damage_radius = max(4, min(15, int(self.damage / 10)))
-        base_radius = max(base_radius, damage_radius)
+    # Default if no synergy
+    if not active_synergies:
+        pygame.draw.circle(screen, (255, 255, 0), (screen_x, screen_y), 4)
+        return
+
+    # Color Mapping
+    colors = {
+        "vortex": (180, 50, 255),    # Bright Purple
+        "fire": (255, 80, 0),        # Orange-Red
+        "ice": (100, 220, 255),      # Cyan
+        "lightning": (200, 200, 255),# White-Blue
+        "explosion": (255, 50, 50),  # Red
+        "kinetic": (200, 200, 200),  # Grey
+        "poison": (50, 255, 50),     # Green
+        "pierce": (255, 255, 200),   # Pale Yellow
+        "vampiric": (150, 0, 0)      # Blood Red
+    }
+
+    # Render Concentric Rings
+    base_radius = 6 if "vortex" in active_synergies else 4
+    if "explosion" in active_synergies: base_radius = 5
+    
+    # Ensure minimum visibility (Fix for invisible projectiles)
+    # Use damage to scale, but clamp to min 4 and max 15 to avoid huge particles
+    damage_radius = max(4, min(15, int(damage / 10)))
+    base_radius = max(base_radius, damage_radius)
+    
+    num_synergies = len(active_synergies)
+    step = base_radius / num_synergies
+    
+    for i, synergy in enumerate(active_synergies):
+        color = colors.get(synergy, (255, 255, 255))
+        if owner == "enemy":
+            # Tint towards red for enemies
+            color = (min(255, color[0] + 50), max(0, color[1] - 50), max(0, color[2] - 50))
+            
+        radius = base_radius - (i * step * 0.5) # Overlap slightly
+        if radius < 1: radius = 1
         
-        num_synergies = len(active_synergies)
-        step = base_radius / num_synergies
+        pygame.draw.circle(screen, color, (screen_x, screen_y), int(radius))
         
-        for i, synergy in enumerate(active_synergies):
-            color = colors.get(synergy, (255, 255, 255))
-            if self.owner == "enemy":
-                # Tint towards red for enemies
-                color = (min(255, color[0] + 50), max(0, color[1] - 50), max(0, color[2] - 50))
-                
-            radius = base_radius - (i * step * 0.5) # Overlap slightly
-            if radius < 1: radius = 1
-            
-            pygame.draw.circle(screen, color, (screen_x, screen_y), int(radius))
-            
-            # Special effects for specific synergies (only on the outer layer or specific ones)
-            if synergy == "vortex" and i == 0:
-                 pygame.draw.circle(screen, (100, 0, 150), (screen_x, screen_y), int(radius) + 2, 1)
+        # Special effects for specific synergies (only on the outer layer or specific ones)
+        if synergy == "vortex" and i == 0:
+             pygame.draw.circle(screen, (100, 0, 150), (screen_x, screen_y), int(radius) + 2, 1)
 
-        # Debug/Fallback for enemy owner if no synergies
-        if self.owner == "enemy" and not active_synergies:
-             pygame.draw.circle(screen, (255, 0, 0), (screen_x, screen_y), 4)
+    # Debug/Fallback for enemy owner if no synergies
+    if owner == "enemy" and not active_synergies:
+         pygame.draw.circle(screen, (255, 0, 0), (screen_x, screen_y), 4)
@@ -0,0 +1,268 @@
+# pixbots_enhanced/entities/projectile_pool.py
+# Struct-of-arrays storage for plain projectiles (no per-bullet Python objects).
+
+import math
+from typing import List, Optional
+
+import numpy as np
+
+import constants
+from entities.projectile import render_projectile
+
+FLAG_ACTIVE = 1
+_CLEAR_ACTIVE = np.uint8(0xFF ^ FLAG_ACTIVE)
+
+# Bots per block when building the projectile x bot distance matrix
+_BOT_BLOCK = 256
+
+
+class PooledProjectile:
+    """
+    Projectile-shaped view of one pool slot, so hit/zone logic written against
+    Projectile works unchanged. Only valid until the pool is next compacted.
+    """
+    __slots__ = ("pool", "index")
+
+    def __init__(self, pool: 'ProjectilePool', index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return float(self.pool.x[self.index])
+
+    @property
+    def y(self) -> float:
+        return float(self.pool.y[self.index])
+
+    @property
+    def angle(self) -> float:
+        return float(self.pool.angle[self.index])
+
+    @property
+    def damage(self) -> float:
+        return float(self.pool.damage[self.index])
+
+    @property
+    def owner(self) -> str:
+        return self.pool.owner_names[self.pool.owner[self.index]]
+
+    @property
+    def effects(self) -> dict:
+        return self.pool.effects[self.index]
+
+    @property
+    def damage_type(self):
+        return self.pool.damage_types[self.index]
+
+    @property
+    def hit_list(self) -> list:
+        return self.pool.hit_lists[self.index]
+
+    @property
+    def pierce_count(self) -> int:
+        return int(self.pool.pierce[self.index])
+
+    @pierce_count.setter
+    def pierce_count(self, value: int):
+        self.pool.pierce[self.index] = value
+
+    @property
+    def lifetime(self) -> float:
+        return float(self.pool.lifetime[self.index])
+
+    @lifetime.setter
+    def lifetime(self, value: float):
+        self.pool.lifetime[self.index] = value
+
+    @property
+    def active(self) -> bool:
+        return bool(self.pool.flags[self.index] & FLAG_ACTIVE)
+
+    @active.setter
+    def active(self, value: bool):
+        if value:
+            self.pool.flags[self.index] |= FLAG_ACTIVE
+        else:
+            self.pool.flags[self.index] &= _CLEAR_ACTIVE
+
+
+class ProjectilePool:
+    """
+    Plain projectiles stored as parallel NumPy arrays. Integration, lifetime
+    expiry and wall culling are whole-array ops; dead slots are removed by
+    swap-remove compaction, so slot order is not spawn order.
+    """
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.count = 0
+        self.capacity = 0
+        self.owner_names: List[str] = ["player", "enemy"]
+        self.owner_codes = {name: code for code, name in enumerate(self.owner_names)}
+        # Object columns (kept exactly `count` long)
+        self.effects: List[dict] = []
+        self.damage_types: List = []
+        self.hit_lists: List[list] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        def grow(old, dtype):
+            arr = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                arr[:self.count] = old[:self.count]
+            return arr
+
+        self.x = grow(getattr(self, "x", None), np.float64)
+        self.y = grow(getattr(self, "y", None), np.float64)
+        self.vx = grow(getattr(self, "vx", None), np.float64)
+        self.vy = grow(getattr(self, "vy", None), np.float64)
+        self.angle = grow(getattr(self, "angle", None), np.float64)
+        self.lifetime = grow(getattr(self, "lifetime", None), np.float64)
+        self.damage = grow(getattr(self, "damage", None), np.float64)
+        self.owner = grow(getattr(self, "owner", None), np.int8)
+        self.pierce = grow(getattr(self, "pierce", None), np.int32)
+        self.flags = grow(getattr(self, "flags", None), np.uint8)
+        self.capacity = capacity
+
+    def _columns(self):
+        return (self.x, self.y, self.vx, self.vy, self.angle, self.lifetime,
+                self.damage, self.owner, self.pierce, self.flags)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def owner_code(self, owner: str) -> int:
+        code = self.owner_codes.get(owner)
+        if code is None:
+            code = len(self.owner_names)
+            self.owner_names.append(owner)
+            self.owner_codes[owner] = code
+        return code
+
+    def spawn(self, x, y, angle, speed, damage, damage_type, owner, effects=None) -> int:
+        """Adds one projectile (same arguments as Projectile) and returns its slot."""
+        if self.count >= self.capacity:
+            self._allocate(self.capacity * 2)
+        effects = effects if effects else {}
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = math.cos(angle) * speed
+        self.vy[i] = math.sin(angle) * speed
+        self.angle[i] = angle
+        self.lifetime[i] = constants.PROJECTILE_LIFETIME
+        self.damage[i] = damage
+        self.owner[i] = self.owner_code(owner)
+        self.pierce[i] = effects.get("pierce", 0)
+        self.flags[i] = FLAG_ACTIVE
+        self.effects.append(effects)
+        self.damage_types.append(damage_type)
+        self.hit_lists.append([])
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+        self.effects.clear()
+        self.damage_types.clear()
+        self.hit_lists.clear()
+
+    # --- Vectorized per-tick work ---
+    def integrate(self, dt: float):
+        """Moves every projectile and expires those out of lifetime."""
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.lifetime[:n] -= dt
+        self.flags[:n][self.lifetime[:n] <= 0] &= _CLEAR_ACTIVE
+
+    def cull_walls(self, wall_mask: np.ndarray, tile_size: float):
+        """Deactivates projectiles outside the map or over non-walkable terrain (one gather)."""
+        n = self.count
+        if not n:
+            return
+        height, width = wall_mask.shape
+        # astype truncates toward zero, matching int(p.x / TILE_SIZE)
+        tx = (self.x[:n] / tile_size).astype(np.int64)
+        ty = (self.y[:n] / tile_size).astype(np.int64)
+        inside = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+        blocked = ~inside
+        blocked[inside] = wall_mask[ty[inside], tx[inside]]
+        self.flags[:n][blocked] &= _CLEAR_ACTIVE
+
+    def compact(self):
+        """Swap-removes inactive slots: survivors past the new end fill the holes."""
+        n = self.count
+        active = (self.flags[:n] & FLAG_ACTIVE) != 0
+        alive = int(np.count_nonzero(active))
+        if alive == n:
+            return
+        holes = np.flatnonzero(~active[:alive])
+        movers = np.flatnonzero(active[alive:]) + alive
+        if len(holes):
+            for column in self._columns():
+                column[holes] = column[movers]
+            for values in (self.effects, self.damage_types, self.hit_lists):
+                for h, m in zip(holes.tolist(), movers.tolist()):
+                    values[h] = values[m]
+        for values in (self.effects, self.damage_types, self.hit_lists):
+            del values[alive:]
+        self.count = alive
+
+    # --- Queries ---
+    def alive_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.flags[:self.count] & FLAG_ACTIVE)
+
+    def view(self, index: int) -> PooledProjectile:
+        return PooledProjectile(self, index)
+
+    def within(self, x: float, y: float, radius: float) -> List[PooledProjectile]:
+        """Active projectiles strictly inside the circle, in slot order."""
+        n = self.count
+        if not n:
+            return []
+        dist_sq = (self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2
+        hits = np.flatnonzero((dist_sq < radius * radius) & ((self.flags[:n] & FLAG_ACTIVE) != 0))
+        return [PooledProjectile(self, i) for i in hits.tolist()]
+
+    def hit_candidates(self, owner_code: Optional[int], bot_x: np.ndarray, bot_y: np.ndarray, bot_r: np.ndarray) -> np.ndarray:
+        """
+        Slots (ascending) of active projectiles owned by owner_code (None = any)
+        that lie inside at least one of the given bot collision circles.
+        """
+        n = self.count
+        if not n or not len(bot_x):
+            return np.empty(0, dtype=np.int64)
+        mask = (self.flags[:n] & FLAG_ACTIVE) != 0
+        if owner_code is not None:
+            mask &= self.owner[:n] == owner_code
+        slots = np.flatnonzero(mask)
+        if not len(slots):
+            return slots
+        px = self.x[slots]
+        py = self.y[slots]
+        near = np.zeros(len(slots), dtype=bool)
+        r_sq = bot_r * bot_r
+        for start in range(0, len(bot_x), _BOT_BLOCK):
+            stop = start + _BOT_BLOCK
+            dx = px[None, :] - bot_x[start:stop, None]
+            dy = py[None, :] - bot_y[start:stop, None]
+            near |= ((dx * dx + dy * dy) < r_sq[start:stop, None]).any(axis=0)
+        return slots[near]
+
+    def render(self, screen, camera_x: float, camera_y: float, margin: int = 20):
+        """Draws only the projectiles that are on screen."""
+        n = self.count
+        if not n:
+            return
+        sx = self.x[:n] + camera_x
+        sy = self.y[:n] + camera_y
+        visible = ((self.flags[:n] & FLAG_ACTIVE) != 0) & \
+                  (sx > -margin) & (sx < screen.get_width() + margin) & \
+                  (sy > -margin) & (sy < screen.get_height() + margin)
+        for i in np.flatnonzero(visible).tolist():
+            render_projectile(screen, int(sx[i]), int(sy[i]), float(self.damage[i]),
+                              self.owner_names[self.owner[i]], self.effects[i])
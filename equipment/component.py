@@ -1,6 +1,7 @@
 # pixbots_enhanced/equipment/component.py
 # UPDATED to fix the TypeError on WeaponMountTile creation.
 
+import logging
 from dataclasses import dataclass, field
 from typing import Dict, Optional
 from hex_system.hex_coord import HexCoord
@@ -8,8 +9,12 @@ from hex_system.hex_coord import HexCoord
 from hex_system.hex_tile import HexTile, AmplifierTile, ResonatorTile, SplitterTile, WeaponMountTile, TileCategory, SecondaryOutputTile, HipsTile, KneesTile, AnklesTile
 from hex_system.energy_packet import SynergyType, EnergyCore
 from systems.synergy_manager import SynergyManager
+from equipment.flow_cache import FlowPlanCache, FlowState, FlowTrace
 
 from systems.graphics_engine import ProceduralGenerator
+from core.log_utils import Lazy
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class ComponentEquipment:
@@ -35,6 +40,10 @@ class ComponentEquipment:
     stored_energy: float = 0.0
     accumulation_rate: float = 0.0 # Calculated per frame/update from flow 
 
+    # Compiled flow plans (see equipment/flow_cache.py). Not part of equality or saves.
+    flow_cache: FlowPlanCache = field(default_factory=FlowPlanCache, init=False, repr=False, compare=False)
+    structure_version: int = field(default=0, init=False, repr=False, compare=False) # Bumped on every layout change
+
     def __post_init__(self):
         # If valid_coords is empty, default to rectangular grid based on quality
         if not self.valid_coords:
@@ -115,9 +124,15 @@ class ComponentEquipment:
     def place_tile(self, coord: HexCoord, tile: HexTile) -> bool:
         if coord in self.valid_coords:
             self.tile_slots[coord] = tile
+            self.invalidate_flow_cache()
             return True
         return False
 
+    def invalidate_flow_cache(self):
+        """Call after mutating tiles or the core in place, or swapping tile_slots, so simulate_flow recompiles."""
+        self.structure_version += 1
+        self.flow_cache.invalidate()
+
     def get_entry_exit_hexes(self):
         """Returns ONE specific entry hex and ONE specific exit hex."""
         if not self.valid_coords: return None, None
@@ -178,6 +193,77 @@ class ComponentEquipment:
         return HexCoord(coord.q + dq, coord.r + dr)
 
     def simulate_flow(self, input_context: Optional['ProjectileContext'] = None, input_direction: int = None):
+        """
+        Returns (flows, stats, exit_contexts) for the given input, served from the
+        compiled FlowPlan cache when the layout and input signature are unchanged.
+        The caller's input_context is never mutated.
+        """
+        # Resolve the core position before keying so the first call doesn't miss twice
+        if self.slot == "torso" and self.core and not self.core.position:
+            from hex_system.hex_tile import ReactorTile
+            for coord, tile in self.tile_slots.items():
+                if isinstance(tile, ReactorTile):
+                    self.core.position = coord
+                    break
+
+        key = self.flow_cache.make_key(self, input_context, input_direction)
+        plan = self.flow_cache.get(key)
+        if plan is not None:
+            flows, stats, exit_contexts = plan.materialize()
+            self.stats = stats
+            return flows, stats, exit_contexts
+
+        if input_context is not None:
+            input_context = input_context.clone()
+        flows, stats, exit_contexts = self._simulate_flow_uncached(input_context, input_direction)
+        self.flow_cache.store(key, flows, stats, exit_contexts)
+        return flows, stats, exit_contexts
+
+    def get_flow_cache_stats(self) -> dict:
+        """Hit/miss counters for the compiled flow plan cache."""
+        return self.flow_cache.get_stats()
+
+    def simulate_flow_traced(self, input_context: Optional['ProjectileContext'] = None, input_direction: int = None) -> FlowTrace:
+        """
+        Uncached simulation that also checkpoints the propagation state the first
+        time each hex is reached, for resimulate_flow(). Used by the hex editor.
+        """
+        # Tiles mutate the context they receive, so the trace keeps its own pristine copy
+        if input_context is not None:
+            input_context = input_context.clone()
+        state = self._begin_flow(input_context.clone() if input_context else None, input_direction)
+        trace = FlowTrace(input_context, input_direction, start_coords=state.start_coords)
+        self._run_flow(state, trace.checkpoints)
+        trace.result = self._finish_flow(state)
+        return trace
+
+    def resimulate_flow(self, trace: FlowTrace, edited_coords) -> FlowTrace:
+        """
+        Re-propagates only from the earliest edited hex downstream, resuming from
+        its checkpoint in trace. Edits to hexes the flow never reached leave the
+        result unchanged; edits to the reactor/entry hexes fall back to a full run.
+        """
+        edited = set(edited_coords)
+        if edited & trace.start_coords:
+            return self.simulate_flow_traced(trace.input_context, trace.input_direction)
+
+        reached = [trace.checkpoints[c] for c in edited if c in trace.checkpoints]
+        if not reached:
+            return trace
+
+        resume = min(reached, key=lambda checkpoint: checkpoint.steps)
+        new_trace = FlowTrace(
+            trace.input_context, trace.input_direction,
+            start_coords=trace.start_coords,
+            checkpoints={c: cp for c, cp in trace.checkpoints.items() if cp.steps < resume.steps},
+            resumed_from_step=resume.steps,
+        )
+        state = resume.snapshot()
+        self._run_flow(state, new_trace.checkpoints)
+        new_trace.result = self._finish_flow(state)
+        return new_trace
+
+    def _simulate_flow_uncached(self, input_context: Optional['ProjectileContext'] = None, input_direction: int = None):
         """
         Simulates energy flow through the component.
         Args:
@@ -188,12 +274,16 @@ class ComponentEquipment:
                              If moving East (0), we enter the West side (3).
                              So input_direction should be the side of the entry hex we enter.
         """
-        from hex_system.energy_packet import SynergyType, ProjectileContext
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        flows = []
-        stats = {
+        state = self._begin_flow(input_context, input_direction)
+        self._run_flow(state)
+        return self._finish_flow(state)
+
+    def _begin_flow(self, input_context: Optional['ProjectileContext'], input_direction: int) -> FlowState:
+        """Seeds the flow queue from the reactor (torso) or the interface edge hexes."""
+        state = FlowState(input_context, SynergyManager())
+        flows = state.flows
+        exit_contexts = state.exit_contexts
+        state.stats = {
             "damage_multiplier": 1.0,
             "synergies": set(),
             "active_synergy_result": None,
@@ -202,15 +292,13 @@ class ComponentEquipment:
             "transfer_rate": 0.0, # New stat for transfer output
             "active_tiles": 0
         }
-        exit_contexts = {} # For Transfer (Conduits, etc)
-        weapon_exit_contexts = {} # For Actual Weapon Output 
-        
-        synergy_manager = SynergyManager()
+        # exit_contexts: For Transfer (Conduits, etc)
+        # weapon_exit_contexts: For Actual Weapon Output 
         
         entry_hex, exit_hex = self.get_entry_exit_hexes()
         
         # Initial context setup
-        start_contexts = [] # (coord, entry_dir, context)
+        start_contexts = state.queue # (coord, entry_dir, context)
         entry_direction = 0 # Default initialization
         
         if self.slot == "torso":
@@ -221,9 +309,12 @@ class ComponentEquipment:
                     if isinstance(tile, ReactorTile):
                         self.core.position = coord
                         break
+            # Without a reactor any placed tile may become the source
+            state.start_coords = set(self.valid_coords)
             
             if self.core and self.core.position:
                 reactor_pos = self.core.position
+                state.start_coords = {reactor_pos}
                 for direction in range(6):
                     context = self.core.generate_context(direction)
                     if context is None or context.get_total_magnitude() <= 0: continue
@@ -270,7 +361,11 @@ class ComponentEquipment:
                                  or "conduit" in tile.tile_type.lower()
                                  or "conductor" in tile.tile_type.lower()):
                         entry_coords.append(c)
+                state.start_coords = set(candidates)
             
+            if entry_hex:
+                state.start_coords.add(entry_hex)
+
             # Fallback to legacy
             if not entry_coords and entry_hex:
                  entry_coords.append(entry_hex)
@@ -285,20 +380,30 @@ class ComponentEquipment:
                     
                     start_contexts.append((e_hex, input_direction, input_context))
 
-        # Process the flow queue
-        queue = start_contexts # Rename for clarity
-        processed_coords = set() 
+        return state
+
+    def _run_flow(self, state: FlowState, checkpoints: Optional[dict] = None):
+        """Processes the flow queue. With checkpoints, snapshots state before each hex's first visit."""
+        debug_flow = logger.isEnabledFor(logging.DEBUG) # Checked once; this loop runs per hex visit
+        
+        flows = state.flows
+        stats = state.stats
+        exit_contexts = state.exit_contexts
+        weapon_exit_contexts = state.weapon_exit_contexts
+        synergy_manager = state.synergy_manager
+        queue = state.queue
+        processed_coords = state.processed_coords
         
         # VISITED STATE: Track (coord, entry_dir) to prevent infinite loops
-        visited_states = set()
+        visited_states = state.visited_states
         
-        steps = 0
         max_steps = 1000 # Safety Break
         
-        max_damage_mult = 1.0
-        
-        while queue and steps < max_steps:
-            steps += 1
+        while queue and state.steps < max_steps:
+            if checkpoints is not None and queue[0][0] not in checkpoints:
+                # First time this hex is reached: resume point for edits to it
+                checkpoints[queue[0][0]] = state.snapshot()
+            state.steps += 1
             coord, entry_dir, context = queue.pop(0)
             
             # CYCLE DETECTION: If we've entered this tile from this direction before, stop.
@@ -318,8 +423,8 @@ class ComponentEquipment:
                 stats["active_tiles"] += 1
             
             # Track max damage multiplier seen in the flow
-            if context.damage_multiplier > max_damage_mult:
-                max_damage_mult = context.damage_multiplier
+            if context.damage_multiplier > state.max_damage_mult:
+                state.max_damage_mult = context.damage_multiplier
             
             # R1: Smart Splitter Logic (DISABLED - Reverted to Dumb for predictability)
             valid_exits = None
@@ -340,7 +445,8 @@ class ComponentEquipment:
                 # if not valid_exits:
                 #      valid_exits = tile.exit_directions
                 
-                logger.info(f"DEBUG: Splitter at {coord} Exits: {tile.exit_directions} Valid: {valid_exits}")
+                if debug_flow:
+                    logger.debug("Splitter at %s exits: %s", coord, tile.exit_directions)
 
             
             # --- PRE-EMPTIVE WEAPON CAPTURE ---
@@ -363,11 +469,9 @@ class ComponentEquipment:
                 target_dict = weapon_exit_contexts
                 if exit_dir in target_dict:
                      existing = target_dict[exit_dir]
-                     for s, m in context.synergies.items():
-                         existing.synergies[s] = existing.synergies.get(s, 0.0) + m
+                     existing.synergies.accumulate(context.synergies)
                      existing.damage_multiplier = max(existing.damage_multiplier, context.damage_multiplier)
-                     if hasattr(context, "custom_effects"):
-                         existing.custom_effects.update(context.custom_effects)
+                     existing.custom_effects.update(context.custom_effects)
                 else:
                     target_dict[exit_dir] = context
                     
@@ -438,8 +542,8 @@ class ComponentEquipment:
                 exit_dir = exit_dirs[i]
                 
                 # Check max multiplier on output too
-                if out_ctx.damage_multiplier > max_damage_mult:
-                    max_damage_mult = out_ctx.damage_multiplier
+                if out_ctx.damage_multiplier > state.max_damage_mult:
+                    state.max_damage_mult = out_ctx.damage_multiplier
                 
                 next_coord = self._get_neighbor_in_direction(coord, exit_dir)
                 
@@ -460,19 +564,13 @@ class ComponentEquipment:
                          existing = target_dict[exit_dir]
                          
                          # Sum synergies
-                         for s, m in out_ctx.synergies.items():
-                             existing.synergies[s] = existing.synergies.get(s, 0.0) + m
+                         existing.synergies.accumulate(out_ctx.synergies)
                              
                          # Maximize multipliers
                          existing.damage_multiplier = max(existing.damage_multiplier, out_ctx.damage_multiplier)
                          
                          # Merge custom effects
-                         if hasattr(out_ctx, "custom_effects"):
-                             if hasattr(existing, "custom_effects"):
-                                 existing.custom_effects.update(out_ctx.custom_effects)
-                             else:
-                                 # Upgrade legacy object on the fly
-                                 existing.custom_effects = out_ctx.custom_effects.copy()
+                         existing.custom_effects.update(out_ctx.custom_effects)
                     else:
                         target_dict[exit_dir] = out_ctx
 
@@ -481,11 +579,8 @@ class ComponentEquipment:
                 if context.synergies[syn] > 0:
                     stats["synergies"].add(syn)
             for out_ctx in out_contexts:
-                # Merge custom effects safely
-                if hasattr(out_ctx, "custom_effects"):
-                    stats["active_synergy_effects"].update(out_ctx.custom_effects)
-                elif hasattr(out_ctx, "synergies"): # Fallback for malformed contexts
-                     pass
+                # Merge custom effects
+                stats["active_synergy_effects"].update(out_ctx.custom_effects)
                     
                 for syn in out_ctx.synergies:
                     if out_ctx.synergies[syn] > 0:
@@ -493,18 +588,24 @@ class ComponentEquipment:
             
             # --- AGGREGATE SECONDARY CHARGES ---
             # Extract "system_X_charge" from contexts and sum into stats
-            if hasattr(context, "custom_effects"):
-                for key, val in context.custom_effects.items():
-                    if key.startswith("system_") and key.endswith("_charge"):
-                         # Add to stats (e.g. stats["system_SHIELD_charge"] += 50.0)
-                         stats[key] = stats.get(key, 0.0) + val
+            for key, val in context.custom_effects.items():
+                if key.startswith("system_") and key.endswith("_charge"):
+                     # Add to stats (e.g. stats["system_SHIELD_charge"] += 50.0)
+                     stats[key] = stats.get(key, 0.0) + val
             
             for out_ctx in out_contexts:
-                if hasattr(out_ctx, "custom_effects"):
-                    for key, val in out_ctx.custom_effects.items():
-                         if key.startswith("system_") and key.endswith("_charge"):
-                              stats[key] = stats.get(key, 0.0) + val
+                for key, val in out_ctx.custom_effects.items():
+                     if key.startswith("system_") and key.endswith("_charge"):
+                          stats[key] = stats.get(key, 0.0) + val
 
+    def _finish_flow(self, state: FlowState):
+        """Turns the drained queue state into (flows, stats, exit_contexts)."""
+        flows = state.flows
+        stats = state.stats
+        exit_contexts = state.exit_contexts
+        weapon_exit_contexts = state.weapon_exit_contexts
+        synergy_manager = state.synergy_manager
+        
         stats["synergies"] = list(stats["synergies"])
         
         # Populate weapon_inputs with ACTIVE WEAPON EXITS to trigger multishot in Player.shoot
@@ -516,7 +617,7 @@ class ComponentEquipment:
 
         # Convert set to count for easier use
         stats["spread_count"] = len(stats.get("weapon_inputs", []))
-        stats["damage_multiplier"] = max_damage_mult # Update stats with max seen
+        stats["damage_multiplier"] = state.max_damage_mult # Update stats with max seen
         
         # Calculate resulting active synergy from WEAPON contexts
         if weapon_exit_contexts:
@@ -582,10 +683,10 @@ class ComponentEquipment:
         else:
             stats["active_synergy"] = None
         
+        input_context = state.input_context
         if input_context:
-             import logging
-             logger = logging.getLogger(__name__)
-             logger.debug(f"Simulating {self.slot} with input context. Mag: {input_context.get_total_magnitude()}. Result Weapon Dmg: {stats['weapon_damage']}")
+             logger.debug("Simulating %s with input context. Mag: %s. Result Weapon Dmg: %s",
+                          self.slot, Lazy(input_context.get_total_magnitude), stats['weapon_damage'])
         
         # Persist stats for external access (e.g. by Player for secondary abilities)
         self.stats = stats
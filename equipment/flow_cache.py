@@ -0,0 +1,185 @@
+# pixbots_enhanced/equipment/flow_cache.py
+# Compiled flow plans and incremental flow traces for ComponentEquipment.simulate_flow.
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def _freeze(value: Any) -> Any:
+    """Converts nested dicts/lists/sets into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted(((_freeze(k), _freeze(v)) for k, v in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _copy_stats(stats: dict) -> dict:
+    """One-level copy so callers can annotate stats without touching the plan."""
+    copied = {}
+    for key, value in stats.items():
+        if isinstance(value, (dict, list, set)):
+            value = value.copy()
+        copied[key] = value
+    return copied
+
+
+@dataclass(frozen=True)
+class FlowPlan:
+    """Immutable result of one simulate_flow run. Never handed out directly."""
+    flows: tuple
+    stats: dict
+    exit_contexts: dict
+
+    def materialize(self):
+        """Returns a fresh (flows, stats, exit_contexts) triple safe for mutation."""
+        exits = {d: ctx.clone() for d, ctx in self.exit_contexts.items()}
+        return list(self.flows), _copy_stats(self.stats), exits
+
+
+class FlowPlanCache:
+    """
+    Per-component cache of FlowPlans.
+    Keyed by the component's structure_version (bumped by place_tile() and
+    invalidate_flow_cache()), the core config and the signature of the input
+    context, so a lookup never walks the tiles.
+    """
+    MAX_PLANS = 16
+
+    def __init__(self):
+        self.plans: Dict[Tuple, FlowPlan] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def invalidate(self):
+        """Drops every compiled plan."""
+        self.plans.clear()
+        self.invalidations += 1
+
+    @staticmethod
+    def structure_key(component) -> int:
+        # Swapping tile_slots/valid_coords or editing tiles in place must go
+        # through invalidate_flow_cache() so the version moves on
+        return component.structure_version
+
+    @staticmethod
+    def core_key(core) -> Optional[Tuple]:
+        if core is None:
+            return None
+        position = (core.position.q, core.position.r) if core.position else None
+        return (_freeze(core.core_type), position, _freeze(core.directional_outputs))
+
+    @staticmethod
+    def input_key(input_context, input_direction) -> Optional[Tuple]:
+        if input_context is None:
+            return (None, input_direction)
+        return (
+            input_context.synergies.signature(),
+            input_context.damage_multiplier,
+            input_context.speed_multiplier,
+            input_context.projectile_count,
+            _freeze(input_context.custom_effects),
+            input_direction,
+        )
+
+    def make_key(self, component, input_context, input_direction) -> Tuple:
+        return (
+            self.structure_key(component),
+            self.core_key(component.core),
+            self.input_key(input_context, input_direction),
+        )
+
+    def get(self, key: Tuple) -> Optional[FlowPlan]:
+        plan = self.plans.get(key)
+        if plan is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return plan
+
+    def store(self, key: Tuple, flows, stats, exit_contexts) -> FlowPlan:
+        if len(self.plans) >= self.MAX_PLANS:
+            # Evict the oldest plan (dicts keep insertion order)
+            self.plans.pop(next(iter(self.plans)))
+        plan = FlowPlan(
+            flows=tuple(flows),
+            stats=_copy_stats(stats),
+            exit_contexts={d: ctx.clone() for d, ctx in exit_contexts.items()},
+        )
+        self.plans[key] = plan
+        return plan
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "plans": len(self.plans),
+            "invalidations": self.invalidations,
+        }
+
+
+class FlowState:
+    """Mutable propagation state of one simulate_flow run (queue, visited, partial stats)."""
+
+    def __init__(self, input_context=None, synergy_manager=None):
+        self.input_context = input_context
+        self.synergy_manager = synergy_manager
+        self.flows: List[tuple] = []
+        self.stats: dict = {}
+        self.exit_contexts: dict = {}
+        self.weapon_exit_contexts: dict = {}
+        self.queue: List[tuple] = []
+        self.processed_coords: Set = set()
+        self.visited_states: Set = set()
+        self.steps = 0
+        self.max_damage_mult = 1.0
+        # Coords whose tiles decide the initial queue; editing them forces a full run
+        self.start_coords: Set = set()
+
+    def snapshot(self) -> 'FlowState':
+        """
+        Copy that a resumed run can mutate freely. Contexts are cloned once per
+        object so aliasing (one input context queued at several entries) survives.
+        """
+        memo = {}
+
+        def clone(ctx):
+            copy = memo.get(id(ctx))
+            if copy is None:
+                copy = memo[id(ctx)] = ctx.clone()
+            return copy
+
+        state = FlowState(self.input_context, self.synergy_manager)
+        state.flows = list(self.flows)
+        state.stats = _copy_stats(self.stats)
+        state.exit_contexts = {d: clone(ctx) for d, ctx in self.exit_contexts.items()}
+        state.weapon_exit_contexts = {d: clone(ctx) for d, ctx in self.weapon_exit_contexts.items()}
+        state.queue = [(coord, entry_dir, clone(ctx)) for coord, entry_dir, ctx in self.queue]
+        state.processed_coords = set(self.processed_coords)
+        state.visited_states = set(self.visited_states)
+        state.steps = self.steps
+        state.max_damage_mult = self.max_damage_mult
+        state.start_coords = self.start_coords
+        return state
+
+
+@dataclass
+class FlowTrace:
+    """
+    Result of a traced simulation plus a checkpoint taken the first time each
+    hex was reached, so an edit only re-propagates from that hex downstream.
+    """
+    input_context: Any
+    input_direction: Optional[int]
+    start_coords: Set = field(default_factory=set)
+    checkpoints: Dict[Any, FlowState] = field(default_factory=dict)
+    result: Optional[tuple] = None  # (flows, stats, exit_contexts)
+    resumed_from_step: Optional[int] = None  # None = full run
@@ -0,0 +1,247 @@
+# pixbots_enhanced/headless.py
+# Runs the play loop with no window, audio or rendering, for soak tests, AI training and benchmarks.
+
+import argparse
+import json
+import logging
+import math
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+import constants
+from core.input_source import ScriptedInput, SimulatedClock, click_event, key_frame
+from core.profiler import profiler
+from main import Game
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessRunner:
+    """
+    Drives Game.step() on a simulated clock with scripted input, as fast as the
+    CPU allows. Combat, behaviors, squads and entity updates run exactly as in
+    play; only events, rendering, audio and the frame cap are gone.
+    """
+
+    def __init__(self, script=None, dt: float = 1.0 / constants.FPS, profile: str = "headless",
+                 recorder=None):
+        self.input = ScriptedInput(script)
+        self.clock = SimulatedClock()
+        self.game = Game(headless=True, input_source=self.input, time_source=self.clock)
+        self.game.current_profile = profile
+        self.dt = dt
+        self.tick = 0
+        self.player_deaths = 0
+        self.rng = random.Random() # Harness-side draws (wave placement); never touches the game's streams
+        self.recorder = recorder # core.session_log.SessionRecorder
+        if recorder:
+            recorder.nominal_dt = dt
+            recorder.attach(self.game)
+
+    def start(self, map_seed: Optional[int] = None, seed: Optional[int] = None,
+              map_size: Optional[Tuple[int, int]] = None):
+        """
+        New game on a fresh map (map_size tiles; Game.map_size by default), straight
+        into play. `seed` seeds the game's RNG streams.
+        """
+        self.rng.seed(seed)
+        if map_size:
+            self.game.map_size = tuple(map_size)
+        self.game.initialize_game(map_seed, seed=seed)
+        self.game.state_manager.set_state(constants.STATE_PLAY)
+
+    def spawn_wave(self, count: int, classes: Sequence[str] = ("grunt", "sniper", "ambusher"),
+                   min_dist: float = 300, max_dist: float = 900) -> List:
+        """Spawns `count` enemies on walkable tiles in a ring around the player."""
+        game = self.game
+        rng = self.rng
+        spawned = []
+        for _ in range(count * 20):
+            if len(spawned) >= count:
+                break
+            point = self._ring_point(min_dist, max_dist)
+            if point:
+                x, y = point
+                enemy_class, level = rng.choice(classes), rng.randint(1, 10)
+                spawned.append(game.spawn_enemy(enemy_class, x, y, level))
+                if self.recorder:
+                    self.recorder.log_spawn(enemy_class, level, x, y)
+        if len(spawned) < count:
+            logger.warning(f"Only found room for {len(spawned)}/{count} enemies.")
+        return spawned
+
+    def spawn_squads(self, count: int, squad_types: Optional[Sequence[str]] = None,
+                     min_dist: float = 500, max_dist: float = 1000) -> List:
+        """
+        Spawns `count` squads (data/squads.json; all types by default) in a ring
+        around the player. Squad members are not captured by session recording.
+        """
+        manager = self.game.squad_manager
+        squad_types = list(squad_types or manager.squad_configs)
+        squads = []
+        for _ in range(count * 20):
+            if len(squads) >= count or not squad_types:
+                break
+            point = self._ring_point(min_dist, max_dist)
+            if point:
+                squad = manager.create_squad(self.rng.choice(squad_types), *point)
+                if squad:
+                    squads.append(squad)
+        if len(squads) < count:
+            logger.warning(f"Only found room for {len(squads)}/{count} squads.")
+        return squads
+
+    def _ring_point(self, min_dist: float, max_dist: float) -> Optional[Tuple[float, float]]:
+        """A random point between min_dist and max_dist from the player, or None if it isn't walkable."""
+        game = self.game
+        blocked = game.game_map.get_blocked_mask()
+        height, width = blocked.shape
+        angle = self.rng.uniform(0, math.pi * 2)
+        dist = self.rng.uniform(min_dist, max_dist)
+        x = game.player.x + math.cos(angle) * dist
+        y = game.player.y + math.sin(angle) * dist
+        tx, ty = int(x // constants.TILE_SIZE), int(y // constants.TILE_SIZE)
+        if 0 <= tx < width and 0 <= ty < height and not blocked[ty, tx]:
+            return x, y
+        return None
+
+    def run(self, ticks: Optional[int] = None, seconds: Optional[float] = None,
+            until: Optional[Callable[['HeadlessRunner'], bool]] = None) -> Dict:
+        """
+        Steps for `ticks` frames or `seconds` of game time (whichever is given),
+        or until `until(runner)` is true or the game quits. Returns run stats.
+        """
+        if ticks is None:
+            ticks = int(round(seconds / self.dt)) if seconds is not None else 0
+        game = self.game
+        frame_total = frame_max = 0.0
+        start_tick = self.tick
+        start = time.perf_counter()
+        for _ in range(ticks):
+            if not game.is_running or (until and until(self)):
+                break
+            self.input.advance(self.tick)
+            self.clock.advance(self.dt)
+            frame = self.step(self.dt)
+            frame_total += frame
+            frame_max = max(frame_max, frame)
+        wall = time.perf_counter() - start
+        return self.summary(self.tick - start_tick, self.dt * (self.tick - start_tick), wall, frame_total, frame_max)
+
+    def step(self, dt: float) -> float:
+        """One game frame on the current input and clock. Returns its wall time in seconds."""
+        game = self.game
+        player = game.player
+        frame_start = time.perf_counter()
+        game.step(dt)
+        frame = time.perf_counter() - frame_start
+        if game.player is not player and player is not None:
+            self.player_deaths += 1 # update() restarts the game when the player dies
+        self.tick += 1
+        return frame
+
+    def summary(self, steps: int, sim_seconds: float, wall: float, frame_total: float, frame_max: float) -> Dict:
+        game = self.game
+        return {
+            "ticks": steps,
+            "sim_seconds": sim_seconds,
+            "wall_seconds": wall,
+            "speedup": sim_seconds / wall if wall > 0 else 0.0,
+            "frame_ms_mean": frame_total / steps * 1000.0 if steps else 0.0,
+            "frame_ms_max": frame_max * 1000.0,
+            "enemies": sum(1 for b in game.all_bots if b is not game.player),
+            "player_hp": game.player.hp if game.player else 0,
+            "player_deaths": self.player_deaths,
+        }
+
+    def close(self):
+        if self.recorder:
+            self.recorder.close(self.game)
+        pygame.quit()
+
+
+def patrol_script(dt: float = 1.0 / constants.FPS, leg_seconds: float = 1.0, fire_every: float = 0.5):
+    """Walks the player in a square (D, S, A, W) and clicks to the right of it every `fire_every` s."""
+    legs = (pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w)
+    leg_ticks = max(1, int(leg_seconds / dt))
+    fire_ticks = max(1, int(fire_every / dt))
+    aim = (constants.SCREEN_WIDTH // 2 + 200, constants.SCREEN_HEIGHT // 2)
+
+    def script(tick: int) -> Dict:
+        events = [click_event(aim)] if tick % fire_ticks == 0 else []
+        return key_frame([legs[(tick // leg_ticks) % len(legs)]], mouse=aim, events=events)
+    return script
+
+
+def duelist_script(runner: HeadlessRunner, engage_range: float = 400, fire_every: float = 0.25,
+                   strafe_seconds: float = 2.0):
+    """
+    A player bot for `runner`: aims at the nearest enemy and fires every
+    `fire_every` s, closing in beyond `engage_range`, backing off inside half
+    of it and circle-strafing in between (switching direction every `strafe_seconds`).
+    """
+    fire_ticks = max(1, int(fire_every / runner.dt))
+    strafe_ticks = max(1, int(strafe_seconds / runner.dt))
+
+    def script(tick: int) -> Dict:
+        game = runner.game
+        player = game.player
+        enemies = [b for b in game.all_bots if b is not player]
+        if player is None or not enemies:
+            return key_frame()
+        target = min(enemies, key=lambda e: (e.x - player.x) ** 2 + (e.y - player.y) ** 2)
+        dx, dy = target.x - player.x, target.y - player.y
+        dist = math.hypot(dx, dy) or 1.0
+        dx, dy = dx / dist, dy / dist
+        if dist > engage_range:
+            move_x, move_y = dx, dy
+        elif dist < engage_range / 2:
+            move_x, move_y = -dx, -dy
+        else:
+            side = 1 if (tick // strafe_ticks) % 2 == 0 else -1
+            move_x, move_y = -dy * side, dx * side
+
+        keys = [] # 8-way: an axis counts once the heading is past sin(22.5 deg) along it
+        if move_x > 0.38: keys.append(pygame.K_d)
+        elif move_x < -0.38: keys.append(pygame.K_a)
+        if move_y > 0.38: keys.append(pygame.K_s)
+        elif move_y < -0.38: keys.append(pygame.K_w)
+        aim = (int(target.x + game.camera_x), int(target.y + game.camera_y))
+        events = [click_event(aim)] if tick % fire_ticks == 0 and dist < engage_range * 1.5 else []
+        return key_frame(keys, mouse=aim, events=events)
+    return script
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pixbots headless (no window, audio or rendering).")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Game time to simulate")
+    parser.add_argument("--enemies", type=int, default=30, help="Enemies spawned around the player at start")
+    parser.add_argument("--seed", type=int, default=None, help="Seeds the game's RNG streams and wave placement")
+    parser.add_argument("--dt", type=float, default=1.0 / constants.FPS, help="Fixed step in seconds")
+    parser.add_argument("--idle", action="store_true", help="No player input (default: patrol and shoot)")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="Profile the run and write a Chrome trace_event JSON file")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    runner = HeadlessRunner(None if args.idle else patrol_script(args.dt), dt=args.dt)
+    runner.start(seed=args.seed)
+    runner.spawn_wave(args.enemies)
+    if args.trace:
+        profiler.set_enabled(True)
+    stats = runner.run(seconds=args.seconds)
+    runner.close()
+    if args.trace:
+        stats["profile"] = profiler.stats()
+        profiler.dump_trace(args.trace)
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == '__main__':
+    main()
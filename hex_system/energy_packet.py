@@ -1,10 +1,10 @@
 # pixbots_enhanced/hex_system/energy_packet.py
 # REFACTORED VERSION - ProjectileContext for Advanced Hex Mechanics
 
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from enum import Enum
-import copy
 
 from .hex_coord import HexCoord
 
@@ -21,6 +21,129 @@ class SynergyType(Enum):
     PIERCE = "pierce"
     VAMPIRIC = "vampiric"
 
+# Fixed slot layout for SynergyVector
+SYNERGY_ORDER: Tuple[SynergyType, ...] = tuple(SynergyType)
+SYNERGY_INDEX: Dict[SynergyType, int] = {s: i for i, s in enumerate(SYNERGY_ORDER)}
+SYNERGY_COUNT = len(SYNERGY_ORDER)
+
+
+def _synergy_index(key) -> int:
+    index = SYNERGY_INDEX.get(key)
+    if index is None:
+        try:
+            index = SYNERGY_INDEX[SynergyType(key)]
+        except ValueError:
+            raise KeyError(key)
+    return index
+
+
+class SynergyVector(MutableMapping):
+    """
+    Fixed-length magnitude vector indexed by SynergyType.
+    Behaves like the old Dict[SynergyType, float]: a presence bitmask tracks
+    which keys exist, so zero-valued entries still show up in len()/iteration.
+    Iteration follows SynergyType declaration order.
+    """
+    __slots__ = ("values", "present")
+
+    def __init__(self, mix=None):
+        self.values: List[float] = [0.0] * SYNERGY_COUNT
+        self.present = 0
+        if mix:
+            for key, value in mix.items():
+                self[key] = value
+
+    # --- Mapping protocol ---
+    def __getitem__(self, key) -> float:
+        index = _synergy_index(key)
+        if not self.present & (1 << index):
+            raise KeyError(key)
+        return self.values[index]
+
+    def __setitem__(self, key, value: float):
+        index = _synergy_index(key)
+        self.values[index] = value
+        self.present |= 1 << index
+
+    def __delitem__(self, key):
+        index = _synergy_index(key)
+        if not self.present & (1 << index):
+            raise KeyError(key)
+        self.values[index] = 0.0
+        self.present &= ~(1 << index)
+
+    def __contains__(self, key) -> bool:
+        try:
+            index = _synergy_index(key)
+        except KeyError:
+            return False
+        return bool(self.present & (1 << index))
+
+    def __iter__(self) -> Iterator[SynergyType]:
+        present = self.present
+        for index, synergy in enumerate(SYNERGY_ORDER):
+            if present & (1 << index):
+                yield synergy
+
+    def __len__(self) -> int:
+        return self.present.bit_count()
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        try:
+            index = _synergy_index(key)
+        except KeyError:
+            return default
+        if not self.present & (1 << index):
+            return default
+        return self.values[index]
+
+    def copy(self) -> Dict[SynergyType, float]:
+        """Plain dict snapshot (flow visualization, stats)."""
+        return dict(self.items())
+
+    # --- Vector ops ---
+    def clone(self) -> 'SynergyVector':
+        vec = SynergyVector.__new__(SynergyVector)
+        vec.values = self.values[:]
+        vec.present = self.present
+        return vec
+
+    def scale(self, factor: float):
+        """Multiplies every magnitude in place."""
+        self.values = [v * factor for v in self.values]
+
+    def accumulate(self, other: 'SynergyVector'):
+        """Element-wise add (used when merging flows into one port)."""
+        self.values = [a + b for a, b in zip(self.values, other.values)]
+        self.present |= other.present
+
+    def masked(self, mask: int) -> 'SynergyVector':
+        """Returns a copy keeping only the slots whose bit is set in mask."""
+        vec = SynergyVector.__new__(SynergyVector)
+        keep = self.present & mask
+        vec.values = [v if keep & (1 << i) else 0.0 for i, v in enumerate(self.values)]
+        vec.present = keep
+        return vec
+
+    def total(self) -> float:
+        return sum(self.values)
+
+    def signature(self) -> Tuple[int, Tuple[float, ...]]:
+        """Hashable form for cache keys."""
+        return (self.present, tuple(self.values))
+
+    @staticmethod
+    def mask_for(synergy) -> int:
+        """Bitmask for a SynergyType or its string value, 0 if unknown."""
+        try:
+            return 1 << _synergy_index(synergy)
+        except KeyError:
+            return 0
+
+
 @dataclass
 class ProjectileModifier:
     """A modifier applied to the projectile context."""
@@ -28,44 +151,111 @@ class ProjectileModifier:
     value: float
     operation: str = "multiply"  # "multiply" or "add"
 
-@dataclass
+
 class ProjectileContext:
     """
     Represents the state of a projectile as it travels through the hex grid.
     Replaces the old EnergyPacket.
+
+    Cheap to clone: synergies are a SynergyVector, the path is a shared
+    linked history and modifiers a shared tuple, so clones only copy what
+    they later write. custom_effects is copied on first access after a clone.
     """
-    # Core Stats
-    damage_multiplier: float = 1.0
-    speed_multiplier: float = 1.0
-    projectile_count: int = 1
-    
-    # Synergies
-    synergies: Dict[SynergyType, float] = field(default_factory=dict)
-    
-    # Path History for Visuals
-    path: List[HexCoord] = field(default_factory=list)
-    path_colors: List[tuple] = field(default_factory=list) # Colors for each segment
-    
-    # State
-    current_position: Optional[HexCoord] = None
-    current_direction: int = 0
-    is_active: bool = True
-    
-    # Modifiers applied during traversal
-    # Modifiers applied during traversal
-    modifiers: List[ProjectileModifier] = field(default_factory=list)
+    __slots__ = (
+        "damage_multiplier", "speed_multiplier", "projectile_count",
+        "_synergies", "_path_tail", "_modifiers",
+        "current_position", "current_direction", "is_active",
+        "_custom_effects", "_effects_shared",
+    )
+
+    def __init__(self,
+                 damage_multiplier: float = 1.0,
+                 speed_multiplier: float = 1.0,
+                 projectile_count: int = 1,
+                 synergies: Optional[Dict[SynergyType, float]] = None,
+                 path: Optional[List[HexCoord]] = None,
+                 path_colors: Optional[List[tuple]] = None,
+                 current_position: Optional[HexCoord] = None,
+                 current_direction: int = 0,
+                 is_active: bool = True,
+                 modifiers: Optional[List[ProjectileModifier]] = None,
+                 custom_effects: Optional[Dict[str, Any]] = None):
+        # Core Stats
+        self.damage_multiplier = damage_multiplier
+        self.speed_multiplier = speed_multiplier
+        self.projectile_count = projectile_count
+
+        # Synergies
+        self.synergies = synergies if synergies else {SynergyType.RAW: 100.0}
+
+        # Path History for Visuals: (coord, color, parent) chain, newest first
+        self._path_tail = None
+        if path:
+            colors = path_colors or []
+            for i, coord in enumerate(path):
+                self.record_step(coord, colors[i] if i < len(colors) else None)
+
+        # State
+        self.current_position = current_position
+        self.current_direction = current_direction
+        self.is_active = is_active
+
+        # Modifiers applied during traversal
+        self._modifiers: Tuple[ProjectileModifier, ...] = tuple(modifiers) if modifiers else ()
+
+        # Custom Effects (metadata for secondary systems)
+        self._custom_effects = dict(custom_effects) if custom_effects else None
+        self._effects_shared = False
+
+    # --- Fields ---
+    @property
+    def synergies(self) -> SynergyVector:
+        return self._synergies
 
-    # Custom Effects (metadata for secondary systems)
-    custom_effects: Dict[str, Any] = field(default_factory=dict)
+    @synergies.setter
+    def synergies(self, mix):
+        self._synergies = mix.clone() if isinstance(mix, SynergyVector) else SynergyVector(mix)
 
-    def __post_init__(self):
-        if not self.synergies:
-            self.synergies = {SynergyType.RAW: 100.0}
+    @property
+    def custom_effects(self) -> Dict[str, Any]:
+        if self._custom_effects is None:
+            self._custom_effects = {}
+        elif self._effects_shared:
+            self._custom_effects = dict(self._custom_effects)
+            self._effects_shared = False
+        return self._custom_effects
+
+    @custom_effects.setter
+    def custom_effects(self, effects: Dict[str, Any]):
+        self._custom_effects = effects
+        self._effects_shared = False
+
+    @property
+    def modifiers(self) -> Tuple[ProjectileModifier, ...]:
+        return self._modifiers
 
+    @property
+    def path(self) -> List[HexCoord]:
+        return [node[0] for node in self._iter_path()]
+
+    @property
+    def path_colors(self) -> List[tuple]:
+        return [node[1] for node in self._iter_path()]
+
+    def _iter_path(self) -> List[tuple]:
+        nodes = []
+        node = self._path_tail
+        while node is not None:
+            nodes.append(node)
+            node = node[2]
+        nodes.reverse()
+        return nodes
+
+    # --- Mutation ---
     def add_modifier(self, modifier: ProjectileModifier):
         """Applies a modifier to the context."""
-        self.modifiers.append(modifier)
-        
+        self._modifiers = self._modifiers + (modifier,)
+
         if modifier.operation == "multiply":
             if modifier.stat == "damage":
                 self.damage_multiplier *= modifier.value
@@ -75,206 +265,80 @@ class ProjectileContext:
             if modifier.stat == "projectile_count":
                 self.projectile_count += int(modifier.value)
             elif modifier.stat == "damage":
-                pass 
+                pass
 
     def add_synergy(self, synergy_type: SynergyType, magnitude: float):
         """Adds a synergy to the context."""
         if synergy_type in self.synergies:
             self.synergies[synergy_type] += magnitude
         else:
-            self.synergies[synergy_type] = magnitude 
-
-    def clone(self) -> 'ProjectileContext':
-        """Creates a deep copy of the context (for splitters)."""
-        return copy.deepcopy(self)
-
-    def copy(self) -> 'ProjectileContext':
-        """Alias for clone(), providing standard naming."""
-        return self.clone()
+            self.synergies[synergy_type] = magnitude
 
-    def get_dominant_synergy(self) -> SynergyType:
-        """Returns the synergy type with the highest magnitude."""
-        if not self.synergies:
-            return SynergyType.RAW
-        return max(self.synergies.items(), key=lambda x: x[1])[0]
+    def scale(self, ratio: float):
+        """Scales every synergy magnitude in place (splitters, taps)."""
+        self._synergies.scale(ratio)
 
     def record_step(self, coord: HexCoord, color: tuple):
         """Records a step in the path."""
-        self.path.append(coord)
-        self.path_colors.append(color)
-    
-    # Compatibility methods for EnergyPacket interface
-    def get_total_magnitude(self) -> float:
-        return sum(self.synergies.values())
-        
-    @property
-    def magnitude(self) -> float:
-        return self.get_total_magnitude()
-
-@dataclass
-class EnergyCore:
-    """The source of energy (Projectiles) within a torso component."""
-    core_type: SynergyType
-    generation_rate: float = 10.0
-    position: Optional[HexCoord] = None
-    synergy_outputs: Dict[SynergyType, float] = field(default_factory=dict)
-    # Map of direction (0-5) to synergy mix. If empty, assumes omnidirectional.
-    # Format: {direction_index: {SynergyType: magnitude}}
-    directional_outputs: Dict[int, Dict[SynergyType, float]] = field(default_factory=dict)
-    
-    def __post_init__(self):
-        if not self.synergy_outputs:
-            self.synergy_outputs = {
-                SynergyType.RAW: self.generation_rate * 0.5
-            }
-            if self.core_type in self.synergy_outputs:
-                self.synergy_outputs[self.core_type] = self.generation_rate
-            else:
-                self.synergy_outputs[self.core_type] = self.generation_rate
-        
-        # Default to omnidirectional if not specified
-        if not self.directional_outputs:
-            self.configure_omnidirectional()
-
-    def configure_omnidirectional(self):
-        """Sets all 6 directions to output the base synergy mix."""
-        # Divide total generation rate by 6? Or is generation_rate per side?
-        # Usually generation_rate is total. So per side is rate/6.
-        # But for simplicity, let's say the synergy_outputs dict represents the TOTAL output.
-        # So we divide the values by 6 for each side.
-        per_side_mix = {k: v / 6.0 for k, v in self.synergy_outputs.items()}
-        for i in range(6):
-            self.directional_outputs[i] = per_side_mix.copy()
-
-    def configure_focused(self, direction: int):
-        """Sets output only to the specified direction (0-5)."""
-        self.directional_outputs.clear()
-        self.directional_outputs[direction] = self.synergy_outputs.copy()
-        
-    def configure_custom(self, direction: int, mix: Dict[SynergyType, float]):
-        """Sets a custom mix for a specific direction."""
-        self.directional_outputs[direction] = mix
+        self._path_tail = (coord, color, self._path_tail)
 
-    def generate_context(self, direction: int = None) -> Optional[ProjectileContext]:
-        """Creates a new ProjectileContext from this reactor for a specific direction."""
-        if direction is not None:
-            # If direction is specified, strictly use directional_outputs
-            if direction in self.directional_outputs:
-                mix = self.directional_outputs[direction]
-            else:
-                # Direction not configured -> No output
-                return None
+    # --- Copies ---
+    def clone(self) -> 'ProjectileContext':
+        """Cheap copy for splitters: shares path/modifiers, copies the synergy vector."""
+        ctx = ProjectileContext.__new__(ProjectileContext)
+        ctx.damage_multiplier = self.damage_multiplier
+        ctx.speed_multiplier = self.speed_multiplier
+        ctx.projectile_count = self.projectile_count
+        ctx._synergies = self._synergies.clone()
+        ctx._path_tail = self._path_tail
+        ctx._modifiers = self._modifiers
+        ctx.current_position = self.current_position
+        ctx.current_direction = self.current_direction
+        ctx.is_active = self.is_active
+        if self._custom_effects:
+            ctx._custom_effects = self._custom_effects
+            ctx._effects_shared = True
+            self._effects_shared = True
         else:
-            # No direction specified -> Return total output (Legacy/Fallback)
-            mix = self.synergy_outputs.copy()
-            
-        ctx = ProjectileContext(
-            synergies=mix.copy(),
-            current_position=self.position
-        )
+            ctx._custom_effects = None
+            ctx._effects_shared = False
         return ctx
-    
-# pixbots_enhanced/hex_system/energy_packet.py
-# REFACTORED VERSION - ProjectileContext for Advanced Hex Mechanics
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
-from enum import Enum
-import copy
-
-from .hex_coord import HexCoord
-
-class SynergyType(Enum):
-    """Enumeration of all possible energy synergy types."""
-    RAW = "raw"
-    FIRE = "fire"
-    ICE = "ice"
-    LIGHTNING = "lightning"
-    VORTEX = "vortex"
-    POISON = "poison"
-    EXPLOSION = "explosion"
-    KINETIC = "kinetic"
-    PIERCE = "pierce"
-    VAMPIRIC = "vampiric"
-
-@dataclass
-class ProjectileModifier:
-    """A modifier applied to the projectile context."""
-    stat: str  # e.g., "damage", "speed", "split_count"
-    value: float
-    operation: str = "multiply"  # "multiply" or "add"
-
-@dataclass
-class ProjectileContext:
-    """
-    Represents the state of a projectile as it travels through the hex grid.
-    Replaces the old EnergyPacket.
-    """
-    # Core Stats
-    damage_multiplier: float = 1.0
-    speed_multiplier: float = 1.0
-    projectile_count: int = 1
-    
-    # Synergies
-    synergies: Dict[SynergyType, float] = field(default_factory=dict)
-    
-    # Path History for Visuals
-    path: List[HexCoord] = field(default_factory=list)
-    path_colors: List[tuple] = field(default_factory=list) # Colors for each segment
-    
-    # State
-    current_position: Optional[HexCoord] = None
-    current_direction: int = 0
-    is_active: bool = True
-    
-    # Modifiers applied during traversal
-    modifiers: List[ProjectileModifier] = field(default_factory=list)
-
-    def __post_init__(self):
-        if not self.synergies:
-            self.synergies = {SynergyType.RAW: 100.0}
-
-    def add_modifier(self, modifier: ProjectileModifier):
-        """Applies a modifier to the context."""
-        self.modifiers.append(modifier)
-        
-        if modifier.operation == "multiply":
-            if modifier.stat == "damage":
-                self.damage_multiplier *= modifier.value
-            elif modifier.stat == "speed":
-                self.speed_multiplier *= modifier.value
-        elif modifier.operation == "add":
-            if modifier.stat == "projectile_count":
-                self.projectile_count += int(modifier.value)
-            elif modifier.stat == "damage":
-                pass 
+    def copy(self) -> 'ProjectileContext':
+        """Alias for clone(), providing standard naming."""
+        return self.clone()
 
-    def add_synergy(self, synergy_type: SynergyType, magnitude: float):
-        """Adds a synergy to the context."""
-        if synergy_type in self.synergies:
-            self.synergies[synergy_type] += magnitude
-        else:
-            self.synergies[synergy_type] = magnitude 
+    def split(self, ratio: float) -> 'ProjectileContext':
+        """Returns a clone carrying `ratio` of this context's synergies and damage."""
+        ctx = self.clone()
+        if ratio > 0:
+            ctx.damage_multiplier *= ratio
+        ctx._synergies.scale(ratio)
+        return ctx
 
-    def clone(self) -> 'ProjectileContext':
-        """Creates a deep copy of the context (for splitters)."""
-        return copy.deepcopy(self)
+    def filtered(self, mask: int) -> 'ProjectileContext':
+        """Returns a clone keeping only synergies whose bit is set in mask."""
+        ctx = self.clone()
+        ctx._synergies = self._synergies.masked(mask)
+        return ctx
 
+    # --- Queries ---
     def get_dominant_synergy(self) -> SynergyType:
         """Returns the synergy type with the highest magnitude."""
         if not self.synergies:
             return SynergyType.RAW
         return max(self.synergies.items(), key=lambda x: x[1])[0]
 
-    def record_step(self, coord: HexCoord, color: tuple):
-        """Records a step in the path."""
-        self.path.append(coord)
-        self.path_colors.append(color)
-    
+    def __repr__(self) -> str:
+        return (f"ProjectileContext(damage_multiplier={self.damage_multiplier}, "
+                f"speed_multiplier={self.speed_multiplier}, projectile_count={self.projectile_count}, "
+                f"synergies={self._synergies!r}, current_position={self.current_position!r}, "
+                f"current_direction={self.current_direction})")
+
     # Compatibility methods for EnergyPacket interface
     def get_total_magnitude(self) -> float:
-        return sum(self.synergies.values())
-        
+        return self._synergies.total()
+
     @property
     def magnitude(self) -> float:
         return self.get_total_magnitude()
@@ -87,6 +87,7 @@ class ComponentHexEditor:
 
     def save_changes(self):
         self.component.tile_slots = self.tile_grid
+        self.component.invalidate_flow_cache()
         self.component.recalculate_stats()
 
     def update(self):
@@ -277,21 +277,9 @@ class SplitterTile(HexTile):
         if count == 0:
             return [] 
             
-        results = []
-        import copy
-        
         # Smart Redistribution: 100% efficiency distributed among valid exits
         ratio = 1.0 / count
-        
-        for _ in range(count):
-            new_ctx = copy.deepcopy(context)
-            if new_ctx.damage_multiplier > 0:
-                new_ctx.damage_multiplier *= ratio
-            
-            for k in new_ctx.synergies:
-                new_ctx.synergies[k] *= ratio
-            
-            results.append(new_ctx)
+        results = [context.split(ratio) for _ in range(count)]
         
         return results
 
@@ -369,21 +357,11 @@ class ReflectorTile(HexTile):
         
     def process_energy(self, context: 'ProjectileContext', from_direction: int, valid_exits: list = None) -> List['ProjectileContext']:
         # Split context based on target synergy
-        pass_context = context.clone()
-        reflect_context = context.clone()
+        target_mask = context.synergies.mask_for(self.target_synergy.lower())
         
-        # Filter pass_context to ONLY have target_synergy
-        # Handle Enum string conversion (e.g. "SynergyType.FIRE" -> "fire")
-        pass_context.synergies = {
-            k: v for k, v in context.synergies.items() 
-            if str(k).lower().split('.')[-1] == self.target_synergy.lower()
-        }
-        
-        # Filter reflect_context to have everything ELSE
-        reflect_context.synergies = {
-            k: v for k, v in context.synergies.items() 
-            if str(k).lower().split('.')[-1] != self.target_synergy.lower()
-        }
+        # pass_context keeps ONLY target_synergy, reflect_context everything ELSE
+        pass_context = context.filtered(target_mask)
+        reflect_context = context.filtered(~target_mask)
         
         # We must return two contexts to match the two exit directions
         return [pass_context, reflect_context]
@@ -499,20 +477,13 @@ class SecondaryOutputTile(HexTile):
         consumption_rate = 0.8
         
         # Create output context (the flow continuing downstream)
-        # Use clone() as copy() might not be detected in some load states
         out_context = context.clone()
-        
-        # Scale down output synergies
-        for s in out_context.synergies:
-            out_context.synergies[s] *= (1.0 - consumption_rate)
+        out_context.scale(1.0 - consumption_rate)
             
         # Record consumed energy in the output context's custom effects
         # This allows component.py to read "consumed_energy" and apply it to the system.
         consumed_mag = context.get_total_magnitude() * consumption_rate
         
-        if not hasattr(out_context, "custom_effects"):
-            out_context.custom_effects = {}
-            
         out_context.custom_effects[f"system_{self.target_system.value}_charge"] = consumed_mag
         
         return [out_context]
@@ -1,26 +1,55 @@
 # G:\work\pixelbots\logging_setup.py
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 
+from core.log_utils import RateLimitFilter
+
+# The game thread only enqueues records; this listener's thread does the file and console I/O.
+_listener = None
+rate_limiter = RateLimitFilter()
+
 def configure_logging():
-    """Sets up advanced, file-rotating logging for the application."""
+    """
+    Sets up advanced, file-rotating logging for the application.
+    Loggers hand records to a QueueHandler (after per-call-site rate limiting);
+    a QueueListener thread writes them to the rotating file and stdout.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
     logs_dir = 'logs'
     os.makedirs(logs_dir, exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s [%(levelname)8s] %(name)25s: %(message)s',
-        handlers=[
-            logging.handlers.RotatingFileHandler(
-                os.path.join(logs_dir, 'pixbots.log'),
-                maxBytes=10*1024*1024,  # 10MB
-                backupCount=5
-            ),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    formatter = logging.Formatter('%(asctime)s [%(levelname)8s] %(name)25s: %(message)s')
+    handlers = [
+        logging.handlers.RotatingFileHandler(
+            os.path.join(logs_dir, 'pixbots.log'),
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5
+        ),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(rate_limiter)
+    # No formatter here: prepare() only merges msg and args; the listener's handlers lay out the line
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    # A forked child (train.py's pool workers) inherits the queue but not the listener thread
+    os.register_at_fork(after_in_child=_restart_listener)
 
     logging.getLogger('pygame').setLevel(logging.WARNING)
     logging.getLogger('PIL').setLevel(logging.WARNING)
@@ -28,3 +57,18 @@ def configure_logging():
     logger = logging.getLogger(__name__)
     logger.info("Logging configured.")
 
+def _restart_listener():
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+def shutdown_logging():
+    """Flushes queued records and stops the writer thread (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        suppressed = rate_limiter.suppressed()
+        if suppressed:
+            logging.getLogger(__name__).info("%d rate-limited log records were never written.", suppressed)
+        _listener.stop()
+        _listener = None
@@ -3,6 +3,8 @@ import os
 import sys
 import logging
 import math
+import time
+from itertools import chain
 
 # --- Setup Logging ---
 # It's best practice to configure logging as the very first thing.
@@ -16,12 +18,17 @@ logger = logging.getLogger(__name__)
 import constants
 from core.game_state import GameStateManager
 from core.asset_manager import ProceduralAssetManager
+from core.input_source import PYGAME_CLOCK, PYGAME_INPUT
+from core.profiler import profiler
+from core.rng import random_streams, reseed, stream
 
 # --- System Imports ---
 from systems import music
 from systems.combat_system import CombatSystem
 from systems.ai_behavior_system import BehaviorSystem
 from systems.behavior_executor import BehaviorExecutor
+from systems.ai_scheduler import AIScheduler
+from systems.movement_system import MovementSystem
 from systems.saveload import SaveLoadSystem
 from systems.squad_system import SquadManager
 
@@ -48,18 +55,36 @@ from ui.help_screen import HelpScreen
 
 from typing import Optional
 
+spawn_rng = stream("spawn") # Debug spawns and summon levels
+
 class Game:
-    def __init__(self):
-        # Initialize Mixer FIRST for proper audio buffering
-        try:
-            pygame.mixer.pre_init(44100, -16, 2, 2048)
-            pygame.mixer.init()
-            pygame.mixer.set_num_channels(32)
-        except Exception as e:
-            logger.error(f"Failed to pre-init mixer: {e}")
+    def __init__(self, headless: bool = False, input_source=None, time_source=None):
+        """
+        headless: no window, audio or rendering (SDL dummy drivers); drive it with step().
+        input_source / time_source: where keys, mouse, events and game time come
+        from (see core.input_source); live pygame by default.
+        """
+        self.headless = headless
+        self.input_source = input_source or PYGAME_INPUT
+        self.time_source = time_source or PYGAME_CLOCK
+        self.recorder = None # Set by core.session_log.SessionRecorder.attach()
+        
+        if headless:
+            # Surfaces still need a display mode for convert_alpha(); the dummy driver never opens a window
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        else:
+            # Initialize Mixer FIRST for proper audio buffering
+            try:
+                pygame.mixer.pre_init(44100, -16, 2, 2048)
+                pygame.mixer.init()
+                pygame.mixer.set_num_channels(32)
+            except Exception as e:
+                logger.error(f"Failed to pre-init mixer: {e}")
 
         pygame.init()
-        music.init()
+        if not headless:
+            music.init()
 
         # Screen and clock setup
         pygame.display.set_caption(constants.CAPTION)
@@ -76,6 +101,9 @@ class Game:
         # AI Behavior System (initialize first)
         self.behavior_system = BehaviorSystem()
         self.behavior_executor = BehaviorExecutor(self)
+        self.behavior_executor.attach(self.behavior_system)
+        self.ai_scheduler = AIScheduler()
+        self.movement_system = MovementSystem()
         
         # Squad System
         self.squad_manager = SquadManager(self)
@@ -95,6 +123,7 @@ class Game:
 
         # World and Camera
         self.game_map: Optional[GameMap] = None
+        self.map_size = (100, 100) # Tiles; initialize_game() generates a map this size
         self.camera_x = 0
         self.camera_y = 0
 
@@ -119,16 +148,36 @@ class Game:
             if frame_count < 10:
                 pass # logger.info(f"Frame {frame_count} start")
             
+            if self.recorder: self.recorder.begin_tick(dt)
+            profiler.begin("frame")
+            profiler.begin("events")
             self.handle_events()
+            profiler.end()
             if frame_count < 10: pass # logger.info(f"Frame {frame_count} events handled")
             
             
             self.update(dt)
+            if self.recorder: self.recorder.end_tick(self)
             self.render()
+            profiler.end()
+            profiler.end_frame()
+        if self.recorder: self.recorder.close(self)
+
+    def step(self, dt: float):
+        """Advances one frame without rendering (headless runs)."""
+        if self.recorder: self.recorder.begin_tick(dt)
+        profiler.begin("frame")
+        profiler.begin("events")
+        self.handle_events()
+        profiler.end()
+        self.update(dt)
+        if self.recorder: self.recorder.end_tick(self)
+        profiler.end()
+        profiler.end_frame()
 
     def handle_events(self):
         """Process all inputs and events."""
-        for event in pygame.event.get():
+        for event in self.input_source.get_events():
             if event.type == pygame.QUIT:
                 self.is_running = False
                 return
@@ -166,6 +215,8 @@ class Game:
                             if result:
                                 loaded_player, map_seed = result
                                 self.player = loaded_player
+                                self.player.input_source = self.input_source
+                                self.player.time_source = self.time_source
                                 
                                 # Re-init map with saved seed
                                 if map_seed is None: map_seed = 12345
@@ -212,19 +263,18 @@ class Game:
                     self.open_component_viewer()
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     # Shooting
-                    mx, my = pygame.mouse.get_pos()
+                    mx, my = self.input_source.get_mouse_pos()
                     # Camera logic: screen_x = world_x + camera_x. So world_x = screen_x - camera_x
                     world_x = mx - self.camera_x
                     world_y = my - self.camera_y
                     
-                    current_time = pygame.time.get_ticks() / 1000.0
+                    current_time = self.time_source.now()
                     self.player.shoot(world_x, world_y, self.combat_system, current_time)
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_b:
                     # Debug spawn enemy
-                    import random
-                    ex = self.player.x + random.randint(-300, 300)
-                    ey = self.player.y + random.randint(-300, 300)
-                    level = random.randint(1, 10)
+                    ex = self.player.x + spawn_rng.randint(-300, 300)
+                    ey = self.player.y + spawn_rng.randint(-300, 300)
+                    level = spawn_rng.randint(1, 10)
                     enemy = Enemy(f"Enemy Lvl {level}", ex, ey, level=level)
                     enemy.asset_manager = self.asset_manager
                     self.all_bots.append(enemy)
@@ -276,6 +326,7 @@ class Game:
 
                         # Re-link player to game map if needed (not strictly needed as player has x,y)
                         # But we need to ensure all_bots has the new player
+                        self.forget_enemies(self.all_bots)
                         self.all_bots = [self.player] # Reset bots list with loaded player
                         
                         # Link player to UI
@@ -345,11 +396,10 @@ class Game:
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
                     # Debug: Spawn Cohort
                     logger.info("Debug: Spawning Enemy Cohort (F6)")
-                    import random
                     
                     # 1. Always spawn a Boss
-                    bx = self.player.x + random.choice([-300, 300]) # Offset X
-                    by = self.player.y + random.choice([-300, 300]) # Offset Y
+                    bx = self.player.x + spawn_rng.choice([-300, 300]) # Offset X
+                    by = self.player.y + spawn_rng.choice([-300, 300]) # Offset Y
                     boss_lvl = 20
                     boss = Enemy("Boss", bx, by, level=boss_lvl, ai_class="Boss")
                     boss.asset_manager = self.asset_manager
@@ -357,24 +407,24 @@ class Game:
                     logger.info(f"Spawned Boss at {bx}, {by}")
 
                     # 2. Spawn 5-8 mixed enemies
-                    count = random.randint(5, 8)
+                    count = spawn_rng.randint(5, 8)
                     for i in range(count):
                         # Random position near player
-                        angle = random.uniform(0, 6.28)
-                        dist = random.uniform(200, 500)
+                        angle = spawn_rng.uniform(0, 6.28)
+                        dist = spawn_rng.uniform(200, 500)
                         
                         x = self.player.x + math.cos(angle) * dist
                         y = self.player.y + math.sin(angle) * dist
                         
                         # Random level based on player level
-                        lvl = max(1, self.player.level + random.randint(-1, 2))
+                        lvl = max(1, self.player.level + spawn_rng.randint(-1, 2))
                         
                         biome = "forest"
                         if self.game_map and hasattr(self.game_map, "biome_manager"):
                             biome = self.game_map.biome_manager.current_biome
                             
                         # Pick Class
-                        r = random.random()
+                        r = spawn_rng.random()
                         if r < 0.6: ai_class = "Grunt"
                         elif r < 0.8: ai_class = "Sniper"
                         else: ai_class = "Ambusher"
@@ -426,6 +476,14 @@ class Game:
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_F1:
                     # Open Help Screen
                     self.state_manager.set_state(constants.STATE_HELP)
+
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    # Frame profiler overlay (takes effect next frame)
+                    profiler.toggle()
+
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F12:
+                    # Dump the profiler's spans for chrome://tracing / Perfetto
+                    profiler.dump_trace(os.path.join("logs", time.strftime("trace_%Y%m%d_%H%M%S.json")))
                     
             elif current_state == constants.STATE_HELP:
                 action = self.help_screen.handle_input(event)
@@ -447,8 +505,7 @@ class Game:
                         self.state_manager.set_state(constants.STATE_PLAY)
                     
                     if biome:
-                        import random
-                        new_seed = random.randint(0, 999999)
+                        new_seed = stream("world").randint(0, 999999)
                         self.game_map.regenerate(seed=new_seed, biome_type=biome)
                         
                         # Respawn player on valid land
@@ -581,10 +638,9 @@ class Game:
                             self.state_manager.set_state(constants.STATE_PLAY)
                         
                         if enemy_class:
-                            import random
-                            ex = self.player.x + random.randint(-300, 300)
-                            ey = self.player.y + random.randint(-300, 300)
-                            level = random.randint(1, 10)
+                            ex = self.player.x + spawn_rng.randint(-300, 300)
+                            ey = self.player.y + spawn_rng.randint(-300, 300)
+                            level = spawn_rng.randint(1, 10)
                             if enemy_class == "Boss":
                                 level = 20 # Bosses are high level
                             
@@ -657,6 +713,9 @@ class Game:
                 action = self.reactor_menu.handle_input(event)
                 if action == "close":
                     self.reactor_menu = None
+                    if self.player:
+                        # Core output changed: re-route the loadout plan
+                        self.player.recalculate_stats()
                     self.state_manager.set_state(constants.STATE_PLAY)
 
             elif current_state == constants.STATE_COMPONENT_VIEWER:
@@ -727,15 +786,17 @@ class Game:
                 self.all_bots.append(self.player)
                 logger.warning("Player was missing from all_bots! Re-added.")
 
+            profiler.begin("player.movement")
             self.update_player_movement(dt)
+            profiler.end()
             self.player.update(dt)
             
             # Auto-Fire for Orbital Mode (Z-Key)
             if getattr(self.player, "orbital_mode", False):
-                mx, my = pygame.mouse.get_pos()
+                mx, my = self.input_source.get_mouse_pos()
                 world_x = mx - self.camera_x
                 world_y = my - self.camera_y
-                current_time = pygame.time.get_ticks() / 1000.0
+                current_time = self.time_source.now()
                 self.player.shoot(world_x, world_y, self.combat_system, current_time)
             
             # Update Music based on Biome
@@ -748,40 +809,84 @@ class Game:
                     biome = self.game_map.biome_manager.get_biome_type(px, py)
                     music.play_music(biome)
             
-            current_time = pygame.time.get_ticks() / 1000.0
+            current_time = self.time_source.now()
+            
+            # Re-target the shared enemy flow field (no-op unless the player changed tile)
+            if self.game_map:
+                self.game_map.flow_field.update(self.player.x, self.player.y)
             
-            # Update all bots (including enemies)
+            # Other bots update every frame; enemies go through the AI scheduler below
+            enemies = []
             for bot in self.all_bots:
                 if bot != self.player:
                     if isinstance(bot, Enemy):
-                        # Use AI behavior system
-                        enemy_id = str(id(bot))
-                        
-                        # Select behavior based on learned weights
-                        behavior = self.behavior_system.get_weighted_behavior(bot.ai_class)
-                        
-                        if behavior:
-                            # Execute the behavior
-                            success = self.behavior_executor.execute_behavior(
-                                bot, behavior, self.player, current_time
-                            )
-                            
-                            # Record behavior in memory
-                            if success:
-                                self.behavior_system.record_behavior(
-                                    enemy_id, bot.ai_class, behavior.id
-                                )
-                        
-                        # Still call normal update for fallback logic
-                        bot.update(dt, self.player, self.combat_system, current_time, self.game_map)
+                        enemies.append(bot)
                     else:
                         bot.update(dt)
             
+            # Enemy AI is level-of-detail scheduled: engaged enemies think every frame,
+            # idle ones farther away less often (with the skipped time folded into one step)
+            # Behaviors are drawn from learned weights for the enemies due this frame, one
+            # batched draw per class; far-tier enemies the budget reaches draw singly
+            view = (-self.camera_x, -self.camera_y, self.screen.get_width(), self.screen.get_height())
+            profiler.begin("ai.select")
+            due = self.ai_scheduler.due(enemies, self.player, view, dt)
+            enemies_by_class = {}
+            for bot, _, _ in due:
+                enemies_by_class.setdefault(bot.ai_class, []).append(bot)
+            chosen_behaviors = {}
+            for ai_class, class_enemies in enemies_by_class.items():
+                behaviors = self.behavior_system.get_weighted_behaviors(ai_class, len(class_enemies))
+                for enemy, behavior in zip(class_enemies, behaviors):
+                    chosen_behaviors[id(enemy)] = behavior
+            profiler.end()
+            
+            # Their movement is queued and integrated in one batch once every enemy has thought
+            profiler.begin("ai")
+            profile_enemies = profiler.enabled # Per-enemy spans skip the section stack
+            self.movement_system.begin()
+            for bot, step_dt, frames in chain(due, self.ai_scheduler.far(dt)):
+                if profile_enemies: enemy_start = time.perf_counter()
+                # Use AI behavior system
+                enemy_id = str(id(bot))
+                behavior = chosen_behaviors.get(id(bot))
+                if behavior is None: # Far tier (or a class without behaviors, which draws nothing)
+                    drawn = self.behavior_system.get_weighted_behaviors(bot.ai_class, 1)
+                    behavior = drawn[0] if drawn else None
+                
+                if behavior:
+                    # Execute the behavior
+                    self.behavior_executor.step_dt = self.behavior_executor.FRAME_DT * frames
+                    success = self.behavior_executor.execute_behavior(
+                        bot, behavior, self.player, current_time
+                    )
+                    
+                    # Record behavior in memory
+                    if success:
+                        self.behavior_system.record_behavior(
+                            enemy_id, bot.ai_class, behavior.id
+                        )
+                
+                # Still call normal update for fallback logic
+                bot.update(step_dt, self.player, self.combat_system, current_time, self.game_map)
+                if profile_enemies: profiler.record("ai.enemy", enemy_start, time.perf_counter())
+            self.movement_system.flush()
+            self.behavior_executor.step_dt = self.behavior_executor.FRAME_DT
+            profiler.end()
+            
+            # Squad blackboards (centers, shared target) for formation behaviors
+            self.squad_manager.update(dt)
+            
             # Update Combat
+            profiler.begin("combat")
             self.combat_system.update(dt, self.game_map, self.all_bots)
+            profiler.end()
             
             # Remove dead bots
-            self.all_bots = [b for b in self.all_bots if b.hp > 0]
+            dead = [b for b in self.all_bots if b.hp <= 0]
+            if dead:
+                self.all_bots = [b for b in self.all_bots if b.hp > 0]
+                self.forget_enemies(dead)
             if self.player.hp <= 0:
                 logger.info("Player died!")
                 # Respawn logic or game over could go here
@@ -791,8 +896,12 @@ class Game:
         elif current_state == constants.STATE_HEX_EDITOR and self.hex_editor:
             self.hex_editor.update()
 
+    def forget_enemies(self, bots):
+        """Drops the AI memories of enemies leaving the game (dead, or cleared by a load or restart)."""
+        self.behavior_system.evict_memories([str(id(b)) for b in bots if isinstance(b, Enemy)])
+
     def update_player_movement(self, dt: float):
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
         move_x = (keys[pygame.K_d] - keys[pygame.K_a])
         move_y = (keys[pygame.K_s] - keys[pygame.K_w])
         
@@ -819,11 +928,20 @@ class Game:
         self.screen.fill((20, 20, 30))
 
         if current_state == constants.STATE_PLAY and self.player:
+            profiler.begin("render.map")
             if self.game_map: self.game_map.render(self.screen, self.camera_x, self.camera_y)
-            if self.game_map: self.game_map.render(self.screen, self.camera_x, self.camera_y)
+            profiler.end()
+            profiler.begin("render.bots")
             for bot in self.all_bots: bot.render(self.screen, self.camera_x, self.camera_y)
+            profiler.end()
+            profiler.begin("render.combat")
             self.combat_system.render(self.screen, self.camera_x, self.camera_y)
+            profiler.end()
+            profiler.begin("render.ui")
             self.draw_play_ui()
+            profiler.end()
+            if profiler.enabled:
+                self.draw_profiler_overlay()
         elif current_state == constants.STATE_MENU:
             self.main_menu.draw()
         elif current_state == constants.STATE_SAVE_SLOT:
@@ -913,9 +1031,20 @@ class Game:
 
         pygame.display.flip()
 
-    def initialize_game(self):
-        """Sets up the player and world for a new game."""
-        self.game_map = GameMap(width=100, height=100, tile_size=constants.TILE_SIZE, asset_manager=self.asset_manager, biome_type=None)
+    def initialize_game(self, map_seed=None, seed=None):
+        """
+        Sets up the player and world for a new game. `seed` reseeds the RNG
+        streams (core.rng); without it they carry on, except that the first
+        game of a recording gets a fresh seed so the log can name it.
+        """
+        recording = self.recorder is not None and not self.recorder.is_open
+        if seed is not None or recording:
+            reseed(seed)
+        drawn_seed = stream("world").randint(0, 999999) # Drawn either way, so the stream doesn't depend on map_seed
+        if map_seed is None:
+            map_seed = drawn_seed
+        width, height = self.map_size
+        self.game_map = GameMap(width=width, height=height, tile_size=constants.TILE_SIZE, asset_manager=self.asset_manager, seed=map_seed, biome_type=None)
         
         # Find a safe spawn point near the center
         cx, cy = self.game_map.width // 2, self.game_map.height // 2
@@ -938,6 +1067,8 @@ class Game:
             
         self.player = Player(name="Player", x=spawn_x, y=spawn_y)
         self.player.asset_manager = self.asset_manager
+        self.player.input_source = self.input_source
+        self.player.time_source = self.time_source
         
         # Link player to UI
         self.component_viewer.player = self.player
@@ -957,8 +1088,13 @@ class Game:
         self.player.inventory.append(create_starter_head())
         logger.info("Started new game.")
 
+        self.forget_enemies(self.all_bots)
         self.all_bots = [self.player]
-        music.play_music(biome_name=self.game_map.biome_manager.current_biome)
+        self.update_camera()
+        if not self.headless:
+            music.play_music(biome_name=self.game_map.biome_manager.current_biome)
+        if recording:
+            self.recorder.open(self, random_streams.seed)
 
     def open_component_viewer(self):
         if self.player:
@@ -973,6 +1109,14 @@ class Game:
         text_surf = font.render(stats_text, True, (255, 255, 255))
         self.screen.blit(text_surf, (10, 10))
 
+    def draw_profiler_overlay(self):
+        stats = self.ai_scheduler.stats
+        profiler.draw_overlay(self.screen, [
+            f"bots {len(self.all_bots)}  projectiles {len(self.combat_system.projectiles) + self.combat_system.projectile_pool.count}",
+            f"AI updated {stats['updated']}  far {stats['far_updated']}  deferred {stats['deferred']}",
+            "F3 hide  F12 dump trace",
+        ])
+
     def cleanup(self):
         logger.info("Shutting down game.")
         if self.player and self.game_map:
@@ -984,8 +1128,7 @@ class Game:
     def spawn_enemy(self, enemy_class, x, y, level=None):
         """Spawns an enemy at the given location."""
         if level is None:
-            import random
-            level = random.randint(1, 10)
+            level = spawn_rng.randint(1, 10)
         
         biome = "forest"
         if self.game_map and hasattr(self.game_map, "biome_manager"):
@@ -1004,12 +1147,19 @@ class Game:
         enemy = Enemy(f"{proper_class} Lvl {level}", x, y, level=level, ai_class=proper_class, biome=biome)
         enemy.asset_manager = self.asset_manager
         self.all_bots.append(enemy)
-        logger.info(f"Spawned enemy {enemy.name} at {x:.1f}, {y:.1f}")
+        logger.info("Spawned enemy %s at %.1f, %.1f", enemy.name, x, y)
         return enemy
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Pixbots")
+    parser.add_argument("--record", metavar="PATH", help="Record the next new game to a session log (replay with replay.py)")
+    args = parser.parse_args()
     try:
         game = Game()
+        if args.record:
+            from core.session_log import SessionRecorder
+            SessionRecorder(args.record).attach(game)
         game.run()
     except Exception as e:
         logger.critical("An unrecoverable error occurred.", exc_info=True)
@@ -0,0 +1,110 @@
+# pixbots_enhanced/replay.py
+# Records headless sessions to compact logs and replays logs (headless or live-recorded) at full speed.
+
+import argparse
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+import constants
+from core.session_log import SessionReader, SessionRecorder, behavior_fingerprint, state_digest
+from headless import HeadlessRunner, patrol_script
+
+logger = logging.getLogger(__name__)
+
+
+def record(path: str, seconds: float, enemies: int = 30, seed: Optional[int] = None,
+           dt: float = 1.0 / constants.FPS, idle: bool = False) -> Dict:
+    """Runs a scripted headless session (see headless.py) and logs it to `path`."""
+    recorder = SessionRecorder(path)
+    runner = HeadlessRunner(None if idle else patrol_script(dt), dt=dt, recorder=recorder)
+    runner.start(seed=seed)
+    runner.spawn_wave(enemies)
+    stats = runner.run(seconds=seconds)
+    runner.close()
+    stats["seed"] = recorder.seed
+    return stats
+
+
+def replay(path: str, ticks: Optional[int] = None, verify: bool = True) -> Dict:
+    """
+    Re-runs a session log headless, as fast as the CPU allows. With `verify`,
+    compares the state digest at every checkpoint and stops at the first
+    mismatch. Stops after `ticks` ticks if given (fast-forward for profiling).
+    """
+    reader = SessionReader(path)
+    runner = HeadlessRunner(dt=reader.dt)
+    runner.start(reader.map_seed, seed=reader.seed)
+    game = runner.game
+    if behavior_fingerprint(game.behavior_system) != reader.behaviors:
+        logger.warning("Behavior library differs from the recording (graduations since?); replay may diverge.")
+
+    frame_total = frame_max = sim_seconds = 0.0
+    checked = 0
+    mismatch = None
+    start = time.perf_counter()
+    for record in reader:
+        if (ticks is not None and record["tick"] >= ticks) or not game.is_running:
+            break
+        for enemy_class, level, x, y in record["spawns"]:
+            game.spawn_enemy(enemy_class, x, y, level)
+        game.ai_scheduler.far_quota = record["far_quota"]
+        runner.input.load(record["frame"])
+        runner.clock.time = record["now"]
+        frame = runner.step(record["dt"])
+        frame_total += frame
+        frame_max = max(frame_max, frame)
+        sim_seconds += record["dt"]
+        if verify and record["digest"] is not None:
+            checked += 1
+            if state_digest(game) != record["digest"]:
+                mismatch = record["tick"]
+                logger.error(f"Replay diverged from the recording by tick {mismatch}.")
+                break
+    else:
+        if verify and reader.final_digest is not None and ticks is None:
+            checked += 1
+            if state_digest(game) != reader.final_digest:
+                mismatch = runner.tick - 1
+                logger.error("Replay diverged from the recording at the end of the session.")
+    wall = time.perf_counter() - start
+
+    stats = runner.summary(runner.tick, sim_seconds, wall, frame_total, frame_max)
+    stats.update({"seed": reader.seed, "map_seed": reader.map_seed,
+                  "checkpoints": checked, "diverged_at": mismatch})
+    runner.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay pixbots sessions.")
+    parser.add_argument("--log-level", default="WARNING")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Run a scripted headless session and log it")
+    rec.add_argument("path")
+    rec.add_argument("--seconds", type=float, default=60.0, help="Game time to simulate")
+    rec.add_argument("--enemies", type=int, default=30, help="Enemies spawned around the player at start")
+    rec.add_argument("--seed", type=int, default=None, help="RNG seed (default: fresh, stored in the log)")
+    rec.add_argument("--dt", type=float, default=1.0 / constants.FPS, help="Fixed step in seconds")
+    rec.add_argument("--idle", action="store_true", help="No player input (default: patrol and shoot)")
+
+    play = commands.add_parser("play", help="Replay a log headless at full speed")
+    play.add_argument("path")
+    play.add_argument("--ticks", type=int, default=None, help="Stop after this many ticks")
+    play.add_argument("--no-verify", action="store_true", help="Skip the state digest checks")
+
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    if args.command == "record":
+        stats = record(args.path, args.seconds, args.enemies, args.seed, args.dt, args.idle)
+    else:
+        stats = replay(args.path, args.ticks, verify=not args.no_verify)
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == '__main__':
+    main()
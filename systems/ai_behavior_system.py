@@ -3,16 +3,27 @@
 
 import json
 import logging
-import random
 import os
-from typing import Dict, List, Optional
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Callable, ClassVar, Dict, List, Optional
 from dataclasses import dataclass, field, asdict
 from collections import deque
 import time
+
+import numpy as np
+
+from core.rng import numpy_stream, stream
+
 from .behavior_constellation import BehaviorConstellationMatrix
 
 logger = logging.getLogger(__name__)
 
+rng = stream("behavior") # Behavior picks, mutations
+
+# Enemy.ai_class spellings that differ from the behavior library's class names
+BEHAVIOR_CLASS_ALIASES = {"ambusher": "ambush"}
+
 @dataclass
 class BehaviorEntry:
     """Single JSON-encoded behavior."""
@@ -22,6 +33,10 @@ class BehaviorEntry:
     parameters: Dict = field(default_factory=dict)
     success_weight: float = 1.0
     
+    # Compiled execution plan (BehaviorExecutor.compile). Set per instance;
+    # declared ClassVar so it stays out of the dataclass fields and to_dict().
+    plan: ClassVar[Optional[Any]] = None
+    
     def to_dict(self) -> dict:
         return asdict(self)
     
@@ -42,12 +57,63 @@ class DamageEvent:
     def to_dict(self) -> dict:
         return asdict(self)
 
+class BehaviorSampler:
+    """
+    Prefix-sum weighted sampler over one class's behaviors. Built lazily and
+    only rebuilt when the class list grows or BehaviorSystem.invalidate_sampler()
+    drops it after a weight change, so a draw is a binary search regardless of
+    how many mutations a boss has made.
+    """
+    def __init__(self):
+        self.behaviors: List[BehaviorEntry] = []
+        self.cumulative: List[float] = []
+        self.cumulative_array = np.empty(0)
+        self.total = 0.0
+        self._source: Optional[List[BehaviorEntry]] = None
+        self._source_len = -1
+
+    def is_stale(self, behaviors: List[BehaviorEntry]) -> bool:
+        return self._source is not behaviors or self._source_len != len(behaviors)
+
+    def rebuild(self, behaviors: List[BehaviorEntry]):
+        weights = [b.success_weight for b in behaviors]
+        self.behaviors = list(behaviors)
+        # Same summation order as a running total, so picks match a linear scan
+        self.cumulative = list(accumulate(weights))
+        self.cumulative_array = np.array(self.cumulative, dtype=np.float64)
+        self.total = sum(weights)
+        self._source = behaviors
+        self._source_len = len(behaviors)
+
+    def sample(self) -> BehaviorEntry:
+        if self.total == 0:
+            return rng.choice(self.behaviors)
+        index = bisect_left(self.cumulative, rng.uniform(0, self.total))
+        return self.behaviors[index] if index < len(self.behaviors) else self.behaviors[-1]
+
+    def sample_many(self, count: int, rng: np.random.Generator) -> List[BehaviorEntry]:
+        """`count` independent draws in one vectorized pass."""
+        n = len(self.behaviors)
+        if self.total == 0:
+            indices = rng.integers(0, n, size=count)
+        else:
+            indices = np.searchsorted(self.cumulative_array, rng.random(count) * self.total, side="left")
+            np.minimum(indices, n - 1, out=indices)
+        behaviors = self.behaviors
+        return [behaviors[i] for i in indices.tolist()]
+
 class BehaviorMemory:
-    """Tracks last X behaviors and their outcomes for an enemy."""
-    def __init__(self, memory_size: int = 10):
+    """
+    Tracks last X behaviors and their outcomes for an enemy. Only the newest
+    `damage_retention` damage events are kept; older ones survive as the
+    running totals here and in DamageCorrelator.
+    """
+    def __init__(self, memory_size: int = 10, damage_retention: int = 8):
         self.memory_size = memory_size
         self.recent_behaviors: deque = deque(maxlen=memory_size)
-        self.damage_events: List[DamageEvent] = []
+        self.damage_events: deque = deque(maxlen=damage_retention)
+        self.total_damage_events = 0
+        self.total_damage_dealt = 0.0
     
     def record_behavior(self, behavior_id: str):
         """Add behavior to memory."""
@@ -65,6 +131,8 @@ class BehaviorMemory:
             enemy_id=enemy_id
         )
         self.damage_events.append(event)
+        self.total_damage_events += 1
+        self.total_damage_dealt += damage_amount
         return event
     
     def get_recent_behaviors(self) -> List[str]:
@@ -88,7 +156,7 @@ class BehaviorMutator:
         # Amplify some parameters
         for key in combined_params:
             if isinstance(combined_params[key], (int, float)):
-                combined_params[key] *= random.uniform(1.1, 1.3)
+                combined_params[key] *= rng.uniform(1.1, 1.3)
         
         mutation = BehaviorEntry(
             id=mutation_id,
@@ -124,17 +192,22 @@ class BehaviorMutator:
         return amplified
 
 class DamageCorrelator:
-    """Analyzes damage events to identify successful behaviors."""
+    """
+    Analyzes damage events to identify successful behaviors. Events are folded
+    into per-behavior running totals as they arrive and are not kept.
+    """
     def __init__(self):
         self.behavior_success_rates: Dict[str, float] = {}
         self.behavior_damage_totals: Dict[str, float] = {}
         self.behavior_usage_counts: Dict[str, int] = {}
+        self.events_folded = 0
     
     def analyze_damage_events(self, damage_events: List[DamageEvent]) -> Dict[str, float]:
         """Analyze recent damage events and return updated weights."""
         updated_weights = {}
         
         for event in damage_events:
+            self.events_folded += 1
             # Each behavior in sequence gets credit for the damage
             credit_per_behavior = event.damage_dealt / len(event.behavior_sequence) if event.behavior_sequence else 0
             
@@ -144,17 +217,29 @@ class DamageCorrelator:
                     self.behavior_damage_totals.get(behavior_id, 0) + credit_per_behavior
                 self.behavior_usage_counts[behavior_id] = \
                     self.behavior_usage_counts.get(behavior_id, 0) + 1
-                
-                # Calculate success rate (average damage per use)
-                avg_damage = self.behavior_damage_totals[behavior_id] / \
-                            self.behavior_usage_counts[behavior_id]
-                
-                # Convert to weight (normalize around 1.0, with bonus for high damage)
-                weight = 1.0 + (avg_damage / 10.0)
-                updated_weights[behavior_id] = weight
+                updated_weights[behavior_id] = self.weight(behavior_id)
         
         return updated_weights
 
+    def weight(self, behavior_id: str) -> float:
+        """Success weight from the running totals: 1.0 plus a tenth of the average damage per use."""
+        avg_damage = self.behavior_damage_totals[behavior_id] / self.behavior_usage_counts[behavior_id]
+        return 1.0 + (avg_damage / 10.0)
+
+    def merge(self, damage_totals: Dict[str, float], usage_counts: Dict[str, int],
+              events_folded: int = 0) -> Dict[str, float]:
+        """
+        Folds in another correlator's totals (e.g. from a training arena), as if
+        its events had arrived here. Returns the new weights of the behaviors touched.
+        """
+        self.events_folded += events_folded
+        for behavior_id, uses in usage_counts.items():
+            self.behavior_usage_counts[behavior_id] = self.behavior_usage_counts.get(behavior_id, 0) + uses
+            self.behavior_damage_totals[behavior_id] = \
+                self.behavior_damage_totals.get(behavior_id, 0) + damage_totals.get(behavior_id, 0.0)
+        return {behavior_id: self.weight(behavior_id) for behavior_id in usage_counts
+                if self.behavior_usage_counts[behavior_id]}
+
 class BehaviorSystem:
     """Core AI behavior manager with learning, mutation, and graduation."""
     def __init__(self, data_dir: str = "data/behaviors"):
@@ -165,7 +250,16 @@ class BehaviorSystem:
             "sniper": [],
             "boss": []
         }
+        # Registry indexes over self.behaviors (kept in sync by _register_behavior)
+        self.behavior_index: Dict[str, List[BehaviorEntry]] = {} # id -> entries (one per class it is in)
+        self.class_behavior_ids: Dict[str, set] = {cls: set() for cls in self.behaviors}
+        self.entry_classes: Dict[int, str] = {} # id(entry) -> class list holding it
+        # Per class, behaviors whose usage/damage/weight changed since the class was last evaluated
+        self.graduation_queue: Dict[str, Dict[int, BehaviorEntry]] = {cls: {} for cls in self.behaviors}
+        self.plan_compiler: Optional[Callable[[BehaviorEntry], Any]] = None # Set by BehaviorExecutor.attach
         self.enemy_memories: Dict[str, BehaviorMemory] = {}
+        self.samplers: Dict[str, BehaviorSampler] = {}
+        self.rng = numpy_stream("behavior") # Batch draws (get_weighted_behaviors)
         self.correlator = DamageCorrelator()
         self.mutator = BehaviorMutator()
         
@@ -177,6 +271,17 @@ class BehaviorSystem:
             "boss": 50
         }
         
+        # Damage events kept per enemy memory (older ones live on as aggregates)
+        self.damage_retention = {
+            "grunt": 8,
+            "ambush": 8,
+            "sniper": 8,
+            "boss": 32
+        }
+        self.evicted_memories = 0
+        self.persist_graduations = True # Off in training arenas; the reducer writes the merged result
+        self._class_names: Dict[str, str] = {} # Enemy.ai_class -> behavior class
+        
         # Graduation thresholds - when mutations become permanent
         self.graduation_thresholds = {
             "min_uses": 5,          # Must be used at least 5 times
@@ -214,7 +319,7 @@ class BehaviorSystem:
                         data = json.load(f)
                         for behavior_data in data.get("behaviors", []):
                             behavior = BehaviorEntry.from_dict(behavior_data)
-                            self.behaviors[enemy_class].append(behavior)
+                            self._register_behavior(behavior, enemy_class)
                             # Track base behaviors from JSON
                             self.base_behavior_ids[enemy_class].add(behavior.id)
                     logger.info(f"Loaded {len(self.behaviors[enemy_class])} base behaviors for {enemy_class}")
@@ -223,21 +328,55 @@ class BehaviorSystem:
             else:
                 logger.warning(f"Behavior file not found: {filepath}")
     
+    def _register_behavior(self, behavior: BehaviorEntry, enemy_class: str):
+        """Adds a behavior to a class list and to the registry indexes."""
+        self.behaviors.setdefault(enemy_class, []).append(behavior)
+        self.behavior_index.setdefault(behavior.id, []).append(behavior)
+        self.class_behavior_ids.setdefault(enemy_class, set()).add(behavior.id)
+        self.entry_classes[id(behavior)] = enemy_class
+        self._mark_for_graduation(behavior)
+        if self.plan_compiler:
+            self.plan_compiler(behavior)
+    
+    def _mark_for_graduation(self, behavior: BehaviorEntry):
+        enemy_class = self.entry_classes[id(behavior)]
+        self.graduation_queue.setdefault(enemy_class, {})[id(behavior)] = behavior
+    
+    def behavior_class(self, ai_class: str) -> str:
+        """Behavior library class for an Enemy.ai_class ("Grunt" -> "grunt", "ambusher" -> "ambush")."""
+        name = self._class_names.get(ai_class)
+        if name is None:
+            name = ai_class.lower()
+            name = self._class_names[ai_class] = BEHAVIOR_CLASS_ALIASES.get(name, name)
+        return name
+    
     def get_or_create_memory(self, enemy_id: str, enemy_class: str) -> BehaviorMemory:
         """Get or create memory for an enemy."""
         if enemy_id not in self.enemy_memories:
             memory_size = self.memory_sizes.get(enemy_class, 10)
-            self.enemy_memories[enemy_id] = BehaviorMemory(memory_size)
+            damage_retention = self.damage_retention.get(enemy_class, 8)
+            self.enemy_memories[enemy_id] = BehaviorMemory(memory_size, damage_retention)
         return self.enemy_memories[enemy_id]
     
+    def evict_memories(self, enemy_ids) -> int:
+        """Drops the memories of enemies that died or despawned. Returns how many."""
+        evicted = 0
+        for enemy_id in enemy_ids:
+            if self.enemy_memories.pop(enemy_id, None) is not None:
+                evicted += 1
+        self.evicted_memories += evicted
+        return evicted
+    
     def record_behavior(self, enemy_id: str, enemy_class: str, behavior_id: str):
         """Record that an enemy executed a behavior."""
+        enemy_class = self.behavior_class(enemy_class)
         memory = self.get_or_create_memory(enemy_id, enemy_class)
         memory.record_behavior(behavior_id)
     
     def track_player_damage(self, damage_amount: float, player_health_before: float,
                            player_health_after: float, enemy_id: str, enemy_class: str):
         """Track damage dealt to player and correlate with behaviors."""
+        enemy_class = self.behavior_class(enemy_class)
         memory = self.get_or_create_memory(enemy_id, enemy_class)
         damage_event = memory.record_damage(
             damage_amount, player_health_before, player_health_after, enemy_id
@@ -251,43 +390,48 @@ class BehaviorSystem:
         # Analyze and update weights
         updated_weights = self.correlator.analyze_damage_events([damage_event])
         
-        # Update behavior weights
-        for behavior_list in self.behaviors.values():
-            for behavior in behavior_list:
-                if behavior.id in updated_weights:
-                    behavior.success_weight = updated_weights[behavior.id]
+        # Update behavior weights (only the behaviors in the sequence changed)
+        for behavior_id, weight in updated_weights.items():
+            for behavior in self.behavior_index.get(behavior_id, ()):
+                behavior.success_weight = weight
+                self._mark_for_graduation(behavior)
+                self.invalidate_sampler(self.entry_classes[id(behavior)])
         
-        logger.debug(f"Updated weights after damage: {updated_weights}")
+        logger.debug("Updated weights after damage: %s", updated_weights)
         
         # Check for graduation candidates
         self.evaluate_for_graduation(enemy_class)
         
         # Boss mutation chance
-        if enemy_class == "boss" and random.random() < 0.1:  # 10% chance
+        if enemy_class == "boss" and rng.random() < 0.1:  # 10% chance
             self.trigger_boss_mutation(enemy_id, memory)
     
-    def get_weighted_behavior(self, enemy_class: str) -> Optional[BehaviorEntry]:
-        """Get a behavior weighted by success probability."""
-        available_behaviors = self.behaviors.get(enemy_class, [])
+    def _get_sampler(self, enemy_class: str) -> Optional[BehaviorSampler]:
+        available_behaviors = self.behaviors.get(enemy_class)
         if not available_behaviors:
             return None
-        
-        # Weight selection
-        weights = [b.success_weight for b in available_behaviors]
-        total_weight = sum(weights)
-        
-        if total_weight == 0:
-            return random.choice(available_behaviors)
-        
-        # Weighted random choice
-        rand = random.uniform(0, total_weight)
-        cumulative = 0
-        for behavior, weight in zip(available_behaviors, weights):
-            cumulative += weight
-            if rand <= cumulative:
-                return behavior
-        
-        return available_behaviors[-1]
+        sampler = self.samplers.get(enemy_class)
+        if sampler is None:
+            sampler = self.samplers[enemy_class] = BehaviorSampler()
+        if sampler.is_stale(available_behaviors):
+            sampler.rebuild(available_behaviors)
+        return sampler
+
+    def invalidate_sampler(self, enemy_class: str):
+        """Forces the class's sampler to rebuild on the next draw."""
+        self.samplers.pop(enemy_class, None)
+    
+    def get_weighted_behavior(self, enemy_class: str) -> Optional[BehaviorEntry]:
+        """Get a behavior weighted by success probability."""
+        sampler = self._get_sampler(self.behavior_class(enemy_class))
+        return sampler.sample() if sampler else None
+
+    def get_weighted_behaviors(self, enemy_class: str, count: int) -> List[BehaviorEntry]:
+        """Draws `count` behaviors for enemies of one class in a single vectorized call."""
+        sampler = self._get_sampler(self.behavior_class(enemy_class))
+        if not sampler or count <= 0:
+            return []
+        return sampler.sample_many(count, self.rng)
     
     def trigger_boss_mutation(self, boss_id: str, memory: BehaviorMemory):
         """Boss tries to mutate/combine successful behaviors."""
@@ -302,7 +446,8 @@ class BehaviorSystem:
         
         # Mutate
         mutation = self.mutator.mutate_behavior(parent1, parent2)
-        self.behaviors["boss"].append(mutation)
+        self._register_behavior(mutation, "boss")
+        self.invalidate_sampler("boss")
         
         # Add to constellation matrix
         self.constellation_matrix.add_behavior_id(mutation.id)
@@ -315,11 +460,18 @@ class BehaviorSystem:
             self.spread_behavior_to_class(mutation, target_class)
     
     def evaluate_for_graduation(self, enemy_class: str):
-        """Check if any mutations should graduate to permanent behaviors."""
-        behaviors = self.behaviors.get(enemy_class, [])
+        """
+        Check if any mutations should graduate to permanent behaviors. Only
+        behaviors queued since the last check can have crossed a threshold.
+        """
+        queue = self.graduation_queue.get(enemy_class)
+        if not queue:
+            return
+        candidates = list(queue.values())
+        queue.clear()
         base_ids = self.base_behavior_ids.get(enemy_class, set())
         
-        for behavior in behaviors:
+        for behavior in candidates:
             # Skip behaviors already in base set
             if behavior.id in base_ids:
                 continue
@@ -340,6 +492,7 @@ class BehaviorSystem:
         """Promote a successful mutation to the permanent repertoire."""
         # Add to base behavior set
         self.base_behavior_ids[enemy_class].add(behavior.id)
+        self.invalidate_sampler(enemy_class)
         
         # Add to constellation matrix
         self.constellation_matrix.add_behavior_id(behavior.id)
@@ -352,7 +505,8 @@ class BehaviorSystem:
         )
         
         # Save to JSON for persistence
-        self.save_graduated_behavior(behavior, enemy_class)
+        if self.persist_graduations:
+            self.save_graduated_behavior(behavior, enemy_class)
     
     def save_graduated_behavior(self, behavior: BehaviorEntry, enemy_class: str):
         """Save graduated behavior to JSON file for persistence."""
@@ -371,7 +525,8 @@ class BehaviorSystem:
             except Exception as e:
                 logger.error(f"Failed to load graduated behaviors: {e}")
         
-        # Add new behavior
+        # Add new behavior (replacing an earlier save of the same id)
+        graduated_behaviors = [b for b in graduated_behaviors if b.get("id") != behavior.id]
         graduated_behaviors.append(behavior.to_dict())
         
         # Save back
@@ -388,8 +543,7 @@ class BehaviorSystem:
             return
         
         # Check if already exists
-        existing_ids = {b.id for b in self.behaviors[target_class]}
-        if behavior.id in existing_ids:
+        if behavior.id in self.class_behavior_ids[target_class]:
             return
         
         # Create adapted version for target class
@@ -401,11 +555,51 @@ class BehaviorSystem:
             success_weight=behavior.success_weight * 0.8  # Slightly reduced for new class
         )
         
-        self.behaviors[target_class].append(adapted_behavior)
+        self._register_behavior(adapted_behavior, target_class)
+        self.invalidate_sampler(target_class)
         self.constellation_matrix.add_behavior_id(adapted_behavior.id)
         
         logger.info(f"📡 SPREAD: {behavior.id} → {target_class} as {adapted_behavior.id}")
     
+    def export_learning(self) -> Dict:
+        """
+        Everything this system has learned, in a picklable form for
+        merge_learning(): correlator totals, constellation pair counts, and
+        every behavior (mutations and spreads included) with its class.
+        """
+        behavior_ids, pairs = self.constellation_matrix.export_pairs()
+        return {
+            "damage_totals": dict(self.correlator.behavior_damage_totals),
+            "usage_counts": dict(self.correlator.behavior_usage_counts),
+            "events": self.correlator.events_folded,
+            "behaviors": [(cls, entry.to_dict()) for cls, entries in self.behaviors.items() for entry in entries],
+            "constellation": {"behavior_ids": behavior_ids, "pairs": pairs},
+        }
+    
+    def merge_learning(self, learning: Dict):
+        """
+        Folds another system's export_learning() into this one: new behaviors are
+        registered, correlator totals and constellation counts are summed, weights
+        are recomputed from the merged totals, and graduation is re-evaluated.
+        """
+        for enemy_class, data in learning["behaviors"]:
+            if data["id"] not in self.class_behavior_ids.get(enemy_class, ()):
+                self._register_behavior(BehaviorEntry.from_dict(data), enemy_class)
+                self.invalidate_sampler(enemy_class)
+        
+        updated_weights = self.correlator.merge(learning["damage_totals"], learning["usage_counts"],
+                                                learning["events"])
+        for behavior_id, weight in updated_weights.items():
+            for behavior in self.behavior_index.get(behavior_id, ()):
+                behavior.success_weight = weight
+                self._mark_for_graduation(behavior)
+                self.invalidate_sampler(self.entry_classes[id(behavior)])
+        
+        constellation = learning["constellation"]
+        self.constellation_matrix.merge_pairs(constellation["behavior_ids"], constellation["pairs"])
+        for enemy_class in list(self.graduation_queue):
+            self.evaluate_for_graduation(enemy_class)
+    
     def get_stats(self) -> Dict:
         """Get current system stats for debugging."""
         return {
@@ -419,5 +613,20 @@ class BehaviorSystem:
                 [(b.id, b.success_weight) for behaviors in self.behaviors.values() for b in behaviors],
                 key=lambda x: x[1], reverse=True
             )[:5],
-            "constellation_stats": self.constellation_matrix.get_matrix_stats()
+            "constellation_stats": self.constellation_matrix.get_matrix_stats(),
+            "memory": self.get_memory_report()
+        }
+    
+    def get_memory_report(self) -> Dict:
+        """Sizes of the AI subsystem's growing structures, for soak-test monitoring."""
+        memories = self.enemy_memories.values()
+        return {
+            "enemy_memories": len(self.enemy_memories),
+            "evicted_memories": self.evicted_memories,
+            "damage_events_retained": sum(len(m.damage_events) for m in memories),
+            "damage_events_recorded": sum(m.total_damage_events for m in memories),
+            "correlator_behaviors": len(self.correlator.behavior_usage_counts),
+            "correlator_events_folded": self.correlator.events_folded,
+            "mutations_tracked": len(self.mutator.mutations),
+            "constellation": self.constellation_matrix.memory_usage()
         }
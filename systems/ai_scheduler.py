@@ -0,0 +1,163 @@
+# pixbots_enhanced/systems/ai_scheduler.py
+# Level-of-detail scheduling of enemy AI updates across frames.
+
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+TIER_ENGAGED = "engaged"
+TIER_NEAR = "near"
+TIER_FAR = "far"
+
+_ENGAGED, _NEAR, _FAR = 0, 1, 2
+
+
+class AIScheduler:
+    """
+    Decides which enemies think this frame, and with how much elapsed time.
+
+    - engaged: not idle, on screen, or close enough to notice the player.
+      These update every frame.
+    - near: idle within NEAR_RANGE of the player. These update every
+      NEAR_INTERVAL frames, staggered so each frame gets an even share.
+    - far: everything else. These share FAR_BUDGET_MS per frame,
+      longest-waiting first.
+
+    The far budget is wall-clock, so how many far enemies update depends on
+    the machine. Setting far_quota replaces it with an exact count for the
+    next frame; session replays use this to repeat the recorded decisions.
+
+    Each enemy is stamped with the frame and clock of its last update
+    (ai_frame / ai_clock), so an enemy that is skipped costs nothing beyond
+    the vectorized tiering pass. Its time comes back as one coarse step. The
+    step covers at most MAX_COARSE_DT seconds; any backlog beyond that is dropped.
+    Movement collides such a step in sub-steps of at most MAX_STEP_DISTANCE
+    (see Bot.update_movement), so far enemies can't skip over thin walls.
+    """
+    NEAR_RANGE = 1600.0
+    NEAR_INTERVAL = 4
+    FAR_BUDGET_MS = 1.0
+    MIN_FAR_UPDATES = 1 # Per frame, even when the budget is already spent
+    MAX_COARSE_DT = 0.25
+    WAKE_MARGIN = 1.2 # x detection_range; idle enemies this close stay engaged
+    SCREEN_MARGIN = 64
+
+    def __init__(self, far_budget_ms: float = FAR_BUDGET_MS, near_interval: int = NEAR_INTERVAL):
+        self.far_budget_ms = far_budget_ms
+        self.near_interval = near_interval
+        self.frame = 0
+        self.clock = 0.0 # Simulated seconds since the first schedule() call
+        self.far_quota: Optional[int] = None # Exact far updates next frame, instead of the budget
+        self._far: List = [] # This frame's far tier, ranked by due() for far()
+        self.stats = {TIER_ENGAGED: 0, TIER_NEAR: 0, TIER_FAR: 0,
+                      "updated": 0, "far_updated": 0, "deferred": 0,
+                      "far_ms": 0.0, "far_budget_ms": far_budget_ms}
+
+    def classify(self, enemies: List, player, view: Tuple[float, float, float, float]) -> np.ndarray:
+        """int8 tier per enemy (0 engaged, 1 near, 2 far). view is the visible world rect (x, y, w, h)."""
+        n = len(enemies)
+        xs = np.fromiter((e.x for e in enemies), np.float64, n)
+        ys = np.fromiter((e.y for e in enemies), np.float64, n)
+        idle = np.fromiter((e.state == "idle" for e in enemies), bool, n)
+        detection = np.fromiter((e.detection_range for e in enemies), np.float64, n)
+
+        dist = np.hypot(xs - player.x, ys - player.y)
+        vx, vy, vw, vh = view
+        margin = self.SCREEN_MARGIN
+        on_screen = ((xs >= vx - margin) & (xs <= vx + vw + margin) &
+                     (ys >= vy - margin) & (ys <= vy + vh + margin))
+
+        tiers = np.where(dist < self.NEAR_RANGE, _NEAR, _FAR).astype(np.int8)
+        tiers[~idle | (dist < detection * self.WAKE_MARGIN) | on_screen] = _ENGAGED
+        return tiers
+
+    def schedule(self, enemies: List, player, view: Tuple[float, float, float, float],
+                 dt: float) -> Iterator[Tuple[object, float, int]]:
+        """
+        Yields (enemy, step_dt, frames) for every enemy that should update this
+        frame: due() first, then far(). step_dt is the simulated time to
+        integrate; frames is how many frames it covers.
+        """
+        yield from self.due(enemies, player, view, dt)
+        yield from self.far(dt)
+
+    def due(self, enemies: List, player, view: Tuple[float, float, float, float],
+            dt: float) -> List[Tuple[object, float, int]]:
+        """
+        Starts a frame and returns the engaged and due near-tier updates, in
+        list order. The far tier is ranked for far(), which must follow.
+        """
+        self.frame += 1
+        self.clock += dt
+        frame = self.frame
+        stats = self.stats
+        n = len(enemies)
+        self._far = []
+        if not n:
+            stats.update({TIER_ENGAGED: 0, TIER_NEAR: 0, TIER_FAR: 0,
+                          "updated": 0, "far_updated": 0, "deferred": 0, "far_ms": 0.0})
+            return []
+
+        last = np.fromiter((getattr(e, "ai_frame", -1) for e in enemies), np.int64, n)
+        new = np.flatnonzero((last < 0) | (last >= frame)) # Unseen, or stamped by another scheduler
+        if len(new):
+            # Newcomers look as if they last updated 1..NEAR_INTERVAL frames ago
+            last[new] = frame - 1 - new % self.near_interval
+            for i in new.tolist():
+                enemy = enemies[i]
+                enemy.ai_frame = int(last[i])
+                enemy.ai_clock = self.clock - dt * (frame - enemy.ai_frame)
+
+        tiers = self.classify(enemies, player, view)
+        near = tiers == _NEAR
+        now = np.flatnonzero((tiers == _ENGAGED) | (near & (frame - last >= self.near_interval)))
+        far = np.flatnonzero(tiers == _FAR)
+        stats[TIER_ENGAGED] = int(np.count_nonzero(tiers == _ENGAGED))
+        stats[TIER_NEAR] = int(np.count_nonzero(near))
+        stats[TIER_FAR] = len(far)
+        stats["updated"] = len(now)
+
+        # Far tier: longest-waiting first
+        self._far = [enemies[i] for i in far[np.argsort(last[far], kind="stable")].tolist()]
+        return [self._take(enemies[i], dt) for i in now.tolist()]
+
+    def far(self, dt: float) -> Iterator[Tuple[object, float, int]]:
+        """
+        Yields far-tier updates ranked by due(), longest-waiting first, until
+        the budget runs out. The budget clock includes the caller's work
+        between yields.
+        """
+        stats = self.stats
+        quota, self.far_quota = self.far_quota, None
+        far, self._far = self._far, []
+        start = time.perf_counter()
+        budget = self.far_budget_ms / 1000.0
+        far_updated = 0
+        for enemy in far:
+            if quota is not None:
+                if far_updated >= quota:
+                    break
+            elif far_updated >= self.MIN_FAR_UPDATES and time.perf_counter() - start >= budget:
+                break
+            far_updated += 1
+            yield self._take(enemy, dt)
+
+        stats["updated"] += far_updated
+        stats["far_updated"] = far_updated
+        stats["deferred"] = len(far) - far_updated
+        stats["far_ms"] = (time.perf_counter() - start) * 1000.0
+
+    def _take(self, enemy, dt: float) -> Tuple[object, float, int]:
+        """Consumes the enemy's pending time, capped at MAX_COARSE_DT."""
+        frames = self.frame - enemy.ai_frame
+        seconds = dt if frames == 1 else self.clock - enemy.ai_clock
+        enemy.ai_frame = self.frame
+        enemy.ai_clock = self.clock
+        if seconds > self.MAX_COARSE_DT:
+            frames = max(1, round(frames * self.MAX_COARSE_DT / seconds))
+            seconds = self.MAX_COARSE_DT
+        return enemy, seconds, frames
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
@@ -4,11 +4,38 @@
 import numpy as np
 from typing import Dict, List, Tuple, Set, Optional
 from collections import defaultdict
+from itertools import chain
 import json
 import logging
+import os
+import sys
 
 logger = logging.getLogger(__name__)
 
+def _group_rows(pairs: np.ndarray, values: np.ndarray) -> Dict[int, Dict[int, object]]:
+    """Dict-of-rows {row: {col: value}} from (k, 2) index pairs and k values."""
+    rows = defaultdict(dict)
+    if not len(pairs):
+        return rows
+    order = np.argsort(pairs[:, 0], kind="stable")
+    row_ids = pairs[order, 0]
+    bounds = [0, *(np.flatnonzero(np.diff(row_ids)) + 1).tolist(), len(order)]
+    cols = pairs[order, 1].tolist()
+    values = values[order].tolist()
+    for row, start, stop in zip(row_ids[bounds[:-1]].tolist(), bounds[:-1], bounds[1:]):
+        rows[row] = dict(zip(cols[start:stop], values[start:stop]))
+    return rows
+
+def _flatten_rows(rows: Dict[int, Dict[int, object]], dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of _group_rows: ((k, 2) int32 pairs, k values)."""
+    sizes = [len(row) for row in rows.values()]
+    total = sum(sizes)
+    pairs = np.empty((total, 2), dtype=np.int32)
+    pairs[:, 0] = np.repeat(np.fromiter(rows.keys(), np.int32, len(rows)), sizes)
+    pairs[:, 1] = np.fromiter(chain.from_iterable(rows.values()), np.int32, total)
+    values = np.fromiter(chain.from_iterable(row.values() for row in rows.values()), dtype, total)
+    return pairs, values
+
 class BehaviorConstellationMatrix:
     """
     Tracks behavior patterns using matrices for efficient pattern recognition.
@@ -17,52 +44,239 @@ class BehaviorConstellationMatrix:
     - Co-occurrence matrix: Which behaviors appear together in successful sequences
     - Transition matrix: Which behavior typically follows another
     - Success correlation: Which combinations lead to player damage
+    
+    Small behavior sets use dense n x n arrays. Once mutations push the set past
+    SPARSE_THRESHOLD behaviors the pair data moves to dict-of-rows storage, so
+    memory and save size follow the observed pairs instead of n squared.
     """
     
-    def __init__(self, behavior_ids: List[str]):
+    INITIAL_CAPACITY = 16
+    SPARSE_THRESHOLD = 512
+    FILE_VERSION = 2 # save_to_file layout: JSON manifest + .npy pair arrays
+    
+    def __init__(self, behavior_ids: List[str], sparse_threshold: int = SPARSE_THRESHOLD):
         """Initialize matrices for given behavior IDs."""
         self.behavior_ids = behavior_ids
         self.behavior_to_idx = {bid: idx for idx, bid in enumerate(behavior_ids)}
         self.idx_to_behavior = {idx: bid for bid, idx in self.behavior_to_idx.items()}
         self.n = len(behavior_ids)
+        self.sparse_threshold = sparse_threshold
+        self.sparse = False
+        
+        # Matrices live in (capacity x capacity) buffers that double when full, so
+        # adding a behavior is amortized O(1) copies. The public attributes below
+        # are (n x n) views into them.
+        self._capacity = 0
+        self._allocate(max(self.INITIAL_CAPACITY, self.n))
+        
+        # Rows of `transition` whose counts changed since they were last normalized
+        self._dirty_rows: Set[int] = set()
+        
+        if self.n > self.sparse_threshold:
+            self._to_sparse()
+        
+        # Constellation clusters: identified patterns (sets of behaviors)
+        self.constellations: Dict[str, Set[str]] = {}
+        self.constellation_success_rates: Dict[str, float] = {}
+    
+    def _allocate(self, capacity: int):
+        """(Re)allocate the backing buffers, keeping the current n x n contents."""
+        def grow(old, dtype):
+            buffer = np.zeros((capacity, capacity), dtype=dtype)
+            if old is not None:
+                buffer[:self.n, :self.n] = old[:self.n, :self.n]
+            return buffer
         
         # Co-occurrence matrix: counts how often behaviors appear together in successful sequences
-        # Shape: (n_behaviors, n_behaviors)
         # cooccurrence[i][j] = count of times behavior_i and behavior_j appeared in same damage sequence
-        self.cooccurrence = np.zeros((self.n, self.n), dtype=np.float32)
+        self._cooccurrence = grow(getattr(self, "_cooccurrence", None), np.float32)
         
         # Transition matrix: probability of behavior_j following behavior_i
-        # Shape: (n_behaviors, n_behaviors)
         # transition[i][j] = P(behavior_j | behavior_i)
-        self.transition = np.zeros((self.n, self.n), dtype=np.float32)
-        self.transition_counts = np.zeros((self.n, self.n), dtype=np.int32)
+        self._transition = grow(getattr(self, "_transition", None), np.float32)
+        self._transition_counts = grow(getattr(self, "_transition_counts", None), np.int32)
         
         # Success weight matrix: average damage when behavior_i precedes behavior_j
-        # Shape: (n_behaviors, n_behaviors)
-        self.success_weights = np.zeros((self.n, self.n), dtype=np.float32)
-        self.success_counts = np.zeros((self.n, self.n), dtype=np.int32)
+        self._success_weights = grow(getattr(self, "_success_weights", None), np.float32)
+        self._success_counts = grow(getattr(self, "_success_counts", None), np.int32)
+        self._capacity = capacity
+    
+    def _to_sparse(self):
+        """Move the dense pair data into dict-of-rows storage and drop the buffers."""
+        pairs = self._pair_arrays()
+        self._drop_dense()
+        self._fill_sparse(pairs)
+        logger.info(f"Constellation matrix switched to sparse storage at {self.n} behaviors")
+    
+    def _drop_dense(self):
+        self._cooccurrence = self._transition = self._transition_counts = None
+        self._success_weights = self._success_counts = None
+        self._capacity = 0
+        self._dirty_rows = set()
+    
+    def _fill_sparse(self, pairs: Dict[str, np.ndarray]):
+        """Build dict-of-rows storage from pair arrays (see _pair_arrays)."""
+        # row -> {col: value}, only for observed pairs. The three transition
+        # tables always hold the same pairs.
+        transition_pairs = np.asarray(pairs["transition_pairs"])
+        counts = np.asarray(pairs["transition_counts"])
+        successes = np.asarray(pairs["success_counts"])
+        observed = (counts != 0) | (successes != 0)
+        transition_pairs = transition_pairs[observed]
         
-        # Constellation clusters: identified patterns (sets of behaviors)
-        self.constellations: Dict[str, Set[str]] = {}
-        self.constellation_success_rates: Dict[str, float] = {}
+        self._co_rows = _group_rows(np.asarray(pairs["co_pairs"]), np.asarray(pairs["co_counts"]).astype(np.int64))
+        self._transition_rows = _group_rows(transition_pairs, counts[observed])
+        self._weight_rows = _group_rows(transition_pairs, np.asarray(pairs["success_weights"])[observed])
+        self._success_rows = _group_rows(transition_pairs, successes[observed])
+        self._row_totals: Dict[int, int] = defaultdict(int) # Transition count per row
+        for i, row in self._transition_rows.items():
+            self._row_totals[i] = sum(row.values())
+        self.sparse = True
+    
+    def _fill_dense(self, pairs: Dict[str, np.ndarray]):
+        """Allocate dense buffers and fill them from pair arrays (see _pair_arrays)."""
+        self._drop_dense()
+        self._allocate(max(self.INITIAL_CAPACITY, self.n))
+        co_pairs, transition_pairs = pairs["co_pairs"], pairs["transition_pairs"]
+        self._cooccurrence[co_pairs[:, 0], co_pairs[:, 1]] = pairs["co_counts"]
+        rows, cols = transition_pairs[:, 0], transition_pairs[:, 1]
+        self._transition_counts[rows, cols] = pairs["transition_counts"]
+        self._success_weights[rows, cols] = pairs["success_weights"]
+        self._success_counts[rows, cols] = pairs["success_counts"]
+        self._dirty_rows = set(np.unique(rows).tolist())
+        self.sparse = False
+    
+    def _pair_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Observed pairs as flat arrays, the storage-independent form used for
+        switching modes and for saving: (k, 2) int32 index pairs plus values.
+        """
+        if self.sparse:
+            co_pairs, co_counts = _flatten_rows(self._co_rows, np.float32)
+            transition_pairs, transition_counts = _flatten_rows(self._transition_rows, np.int32)
+            keys = transition_pairs.tolist()
+            weight_rows, success_rows = self._weight_rows, self._success_rows
+            return {
+                "co_pairs": co_pairs,
+                "co_counts": co_counts,
+                "transition_pairs": transition_pairs,
+                "transition_counts": transition_counts,
+                "success_weights": np.fromiter((weight_rows[i][j] for i, j in keys), np.float32, len(keys)),
+                "success_counts": np.fromiter((success_rows[i][j] for i, j in keys), np.int32, len(keys)),
+            }
+        
+        n = self.n
+        return self._dense_pair_arrays(self._cooccurrence[:n, :n], self._transition_counts[:n, :n],
+                                       self._success_weights[:n, :n], self._success_counts[:n, :n])
+    
+    @staticmethod
+    def _dense_pair_arrays(cooccurrence: np.ndarray, transition_counts: np.ndarray,
+                           success_weights: np.ndarray, success_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        co_pairs = np.argwhere(cooccurrence != 0)
+        transition_pairs = np.argwhere((transition_counts != 0) | (success_weights != 0) | (success_counts != 0))
+        rows, cols = transition_pairs[:, 0], transition_pairs[:, 1]
+        return {
+            "co_pairs": co_pairs.astype(np.int32),
+            "co_counts": cooccurrence[co_pairs[:, 0], co_pairs[:, 1]],
+            "transition_pairs": transition_pairs.astype(np.int32),
+            "transition_counts": transition_counts[rows, cols],
+            "success_weights": success_weights[rows, cols],
+            "success_counts": success_counts[rows, cols],
+        }
+    
+    def _densify(self, rows: Dict[int, Dict[int, float]], dtype) -> np.ndarray:
+        dense = np.zeros((self.n, self.n), dtype=dtype)
+        for i, row in rows.items():
+            dense[i, list(row)] = list(row.values())
+        return dense
+    
+    # --- (n x n) views (dense copies in sparse mode) ---
+    @property
+    def cooccurrence(self) -> np.ndarray:
+        if self.sparse:
+            return self._densify(self._co_rows, np.float32)
+        return self._cooccurrence[:self.n, :self.n]
+    
+    @property
+    def transition(self) -> np.ndarray:
+        if self.sparse:
+            rows = {i: {j: count / self._row_totals[i] for j, count in row.items()}
+                    for i, row in self._transition_rows.items()}
+            return self._densify(rows, np.float32)
+        self._update_transition_probabilities()
+        return self._transition[:self.n, :self.n]
+    
+    @property
+    def transition_counts(self) -> np.ndarray:
+        if self.sparse:
+            return self._densify(self._transition_rows, np.int32)
+        return self._transition_counts[:self.n, :self.n]
+    
+    @property
+    def success_weights(self) -> np.ndarray:
+        if self.sparse:
+            return self._densify(self._weight_rows, np.float32)
+        return self._success_weights[:self.n, :self.n]
+    
+    @property
+    def success_counts(self) -> np.ndarray:
+        if self.sparse:
+            return self._densify(self._success_rows, np.int32)
+        return self._success_counts[:self.n, :self.n]
     
     def add_behavior_id(self, behavior_id: str):
         """Dynamically add a new behavior (e.g., boss mutation) to the matrix."""
         if behavior_id in self.behavior_to_idx:
             return
         
+        if not self.sparse:
+            if self.n >= self.sparse_threshold:
+                self._to_sparse()
+            elif self.n >= self._capacity:
+                self._allocate(self._capacity * 2)
+        
         idx = self.n
         self.behavior_ids.append(behavior_id)
         self.behavior_to_idx[behavior_id] = idx
         self.idx_to_behavior[idx] = behavior_id
         self.n += 1
+    
+    def export_pairs(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Behavior ids plus observed pair arrays (indices into those ids), for merge_pairs()."""
+        return list(self.behavior_ids), self._pair_arrays()
+    
+    def merge_pairs(self, behavior_ids: List[str], pairs: Dict[str, np.ndarray]):
+        """
+        Adds another matrix's counts (from export_pairs(), e.g. a training arena)
+        to this one. Unknown behavior ids are added first.
+        """
+        for behavior_id in behavior_ids:
+            self.add_behavior_id(behavior_id)
+        remap = np.fromiter((self.behavior_to_idx[b] for b in behavior_ids), np.intp, len(behavior_ids))
+        co_pairs = remap[np.asarray(pairs["co_pairs"], dtype=np.intp)].reshape(-1, 2)
+        transition_pairs = remap[np.asarray(pairs["transition_pairs"], dtype=np.intp)].reshape(-1, 2)
+        co_counts = np.asarray(pairs["co_counts"], dtype=np.float32)
+        transition_counts = np.asarray(pairs["transition_counts"], dtype=np.int32)
+        success_weights = np.asarray(pairs["success_weights"], dtype=np.float32)
+        success_counts = np.asarray(pairs["success_counts"], dtype=np.int32)
+        
+        if self.sparse:
+            for (i, j), count in zip(co_pairs.tolist(), co_counts.tolist()):
+                self._co_rows[i][j] = self._co_rows[i].get(j, 0) + count
+            for (i, j), count, weight, successes in zip(transition_pairs.tolist(), transition_counts.tolist(),
+                                                        success_weights, success_counts.tolist()):
+                self._transition_rows[i][j] = self._transition_rows[i].get(j, 0) + count
+                self._row_totals[i] += count
+                self._weight_rows[i][j] = self._weight_rows[i].get(j, np.float32(0)) + weight
+                self._success_rows[i][j] = self._success_rows[i].get(j, 0) + successes
+            return
         
-        # Expand matrices
-        self.cooccurrence = np.pad(self.cooccurrence, ((0, 1), (0, 1)), constant_values=0)
-        self.transition = np.pad(self.transition, ((0, 1), (0, 1)), constant_values=0)
-        self.transition_counts = np.pad(self.transition_counts, ((0, 1), (0, 1)), constant_values=0)
-        self.success_weights = np.pad(self.success_weights, ((0, 1), (0, 1)), constant_values=0)
-        self.success_counts = np.pad(self.success_counts, ((0, 1), (0, 1)), constant_values=0)
+        np.add.at(self._cooccurrence, (co_pairs[:, 0], co_pairs[:, 1]), co_counts)
+        rows, cols = transition_pairs[:, 0], transition_pairs[:, 1]
+        np.add.at(self._transition_counts, (rows, cols), transition_counts)
+        np.add.at(self._success_weights, (rows, cols), success_weights)
+        np.add.at(self._success_counts, (rows, cols), success_counts)
+        self._dirty_rows.update(rows.tolist())
     
     def record_sequence(self, behavior_sequence: List[str], damage_dealt: float):
         """
@@ -76,32 +290,119 @@ class BehaviorConstellationMatrix:
         if len(indices) < 2:
             return
         
-        # Update co-occurrence matrix (all pairs in sequence)
-        for i in range(len(indices)):
-            for j in range(i + 1, len(indices)):
-                idx_i, idx_j = indices[i], indices[j]
-                self.cooccurrence[idx_i][idx_j] += 1
-                self.cooccurrence[idx_j][idx_i] += 1  # Symmetric
-        
-        # Update transition matrix (sequential pairs)
-        for i in range(len(indices) - 1):
-            idx_current = indices[i]
-            idx_next = indices[i + 1]
-            self.transition_counts[idx_current][idx_next] += 1
-            
-            # Update success weights (damage credit for this transition)
-            self.success_weights[idx_current][idx_next] += damage_dealt
-            self.success_counts[idx_current][idx_next] += 1
+        if self.sparse:
+            self._record_sparse(indices, np.float32(damage_dealt))
+            return
+        indices = np.asarray(indices, dtype=np.intp)
         
-        # Recompute transition probabilities
-        self._update_transition_probabilities()
+        # Update co-occurrence matrix (all pairs in sequence, symmetric)
+        first, second = np.triu_indices(len(indices), k=1)
+        rows, cols = indices[first], indices[second]
+        np.add.at(self._cooccurrence, (rows, cols), 1)
+        np.add.at(self._cooccurrence, (cols, rows), 1)
+        
+        # Update transition matrix (sequential pairs) and the damage credit for each transition
+        current, following = indices[:-1], indices[1:]
+        np.add.at(self._transition_counts, (current, following), 1)
+        np.add.at(self._success_weights, (current, following), np.float32(damage_dealt))
+        np.add.at(self._success_counts, (current, following), 1)
+        
+        # Transition probabilities are renormalized lazily, only for these rows
+        self._dirty_rows.update(current.tolist())
+    
+    def _record_sparse(self, indices: List[int], damage_dealt: np.float32):
+        co_rows = self._co_rows
+        for a in range(len(indices)):
+            idx_i = indices[a]
+            for idx_j in indices[a + 1:]:
+                co_rows[idx_i][idx_j] = co_rows[idx_i].get(idx_j, 0) + 1
+                co_rows[idx_j][idx_i] = co_rows[idx_j].get(idx_i, 0) + 1 # Symmetric
+        
+        for idx_current, idx_next in zip(indices, indices[1:]):
+            counts = self._transition_rows[idx_current]
+            counts[idx_next] = counts.get(idx_next, 0) + 1
+            self._row_totals[idx_current] += 1
+            weights = self._weight_rows[idx_current]
+            weights[idx_next] = weights.get(idx_next, np.float32(0)) + damage_dealt
+            successes = self._success_rows[idx_current]
+            successes[idx_next] = successes.get(idx_next, 0) + 1
     
     def _update_transition_probabilities(self):
-        """Convert transition counts to probabilities."""
-        for i in range(self.n):
-            row_sum = self.transition_counts[i].sum()
-            if row_sum > 0:
-                self.transition[i] = self.transition_counts[i] / row_sum
+        """Convert transition counts to probabilities for rows that changed."""
+        if not self._dirty_rows:
+            return
+        rows = np.fromiter(self._dirty_rows, dtype=np.intp, count=len(self._dirty_rows))
+        self._dirty_rows.clear()
+        counts = self._transition_counts[rows, :self.n]
+        row_sums = counts.sum(axis=1)
+        has_counts = row_sums > 0
+        self._transition[rows[has_counts], :self.n] = counts[has_counts] / row_sums[has_counts, None]
+    
+    # --- Storage-independent accessors (row-major order in both modes) ---
+    def _transition_row(self, idx: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(followers, success_weights, success_counts, probabilities) for transitions out of idx."""
+        if not self.sparse:
+            counts = self.success_counts[idx]
+            followers = np.flatnonzero(counts > 0)
+            return (followers, self.success_weights[idx, followers], counts[followers],
+                    self.transition[idx, followers])
+        
+        successes = self._success_rows.get(idx, {})
+        followers = np.array(sorted(successes), dtype=np.intp)
+        weights = self._weight_rows[idx]
+        counts = self._transition_rows[idx]
+        total = self._row_totals[idx]
+        return (followers,
+                np.array([weights[j] for j in followers.tolist()], dtype=np.float32),
+                np.array([successes[j] for j in followers.tolist()], dtype=np.int32),
+                (np.array([counts.get(j, 0) for j in followers.tolist()]) / total).astype(np.float32))
+    
+    def _transition_entries(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rows, cols, probabilities) of every observed transition."""
+        if not self.sparse:
+            rows, cols = np.nonzero(self.transition_counts)
+            return rows, cols, self.transition[rows, cols]
+        
+        entries = sorted((i, j, count / self._row_totals[i])
+                         for i, row in self._transition_rows.items() for j, count in row.items())
+        rows, cols, probabilities = zip(*entries) if entries else ((), (), ())
+        return (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp),
+                np.array(probabilities).astype(np.float32))
+    
+    def _upper_cooccurrences(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rows, cols, counts) of observed co-occurrences with row < col."""
+        if not self.sparse:
+            rows, cols = np.nonzero(np.triu(self.cooccurrence, k=1))
+            return rows, cols, self.cooccurrence[rows, cols]
+        
+        entries = sorted((i, j, count) for i, row in self._co_rows.items() for j, count in row.items() if i < j)
+        rows, cols, counts = zip(*entries) if entries else ((), (), ())
+        return (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp),
+                np.array(counts, dtype=np.float32))
+    
+    def _pair_success(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(success_weights, success_counts) for the given (row, col) pairs."""
+        if not self.sparse:
+            return self.success_weights[rows, cols], self.success_counts[rows, cols]
+        
+        pairs = list(zip(rows.tolist(), cols.tolist()))
+        weights = np.array([self._weight_rows[i].get(j, 0) if i in self._weight_rows else 0 for i, j in pairs],
+                           dtype=np.float32)
+        counts = np.array([self._success_rows[i].get(j, 0) if i in self._success_rows else 0 for i, j in pairs],
+                          dtype=np.int32)
+        return weights, counts
+    
+    def _cooccurs_with(self, idx: int, min_count: float) -> np.ndarray:
+        """Bool mask of behaviors whose co-occurrence count with idx is at least min_count."""
+        if not self.sparse:
+            return self.cooccurrence[idx] >= min_count
+        
+        if min_count <= 0:
+            return np.ones(self.n, dtype=bool)
+        mask = np.zeros(self.n, dtype=bool)
+        row = self._co_rows.get(idx, {})
+        mask[[j for j, count in row.items() if count >= min_count]] = True
+        return mask
     
     def get_best_next_behavior(self, current_behavior: str, top_k: int = 3) -> List[Tuple[str, float]]:
         """
@@ -113,18 +414,15 @@ class BehaviorConstellationMatrix:
         
         idx = self.behavior_to_idx[current_behavior]
         
-        # Calculate expected damage for each next behavior
-        expected_damages = []
-        for j in range(self.n):
-            if self.success_counts[idx][j] > 0:
-                avg_damage = self.success_weights[idx][j] / self.success_counts[idx][j]
-                transition_prob = self.transition[idx][j]
-                expected_damage = avg_damage * transition_prob
-                expected_damages.append((self.idx_to_behavior[j], expected_damage))
+        # Expected damage = average damage of the transition * its probability
+        followers, weights, counts, probabilities = self._transition_row(idx)
+        if not len(followers):
+            return []
+        expected = weights / counts * probabilities
         
-        # Sort by expected damage and return top K
-        expected_damages.sort(key=lambda x: x[1], reverse=True)
-        return expected_damages[:top_k]
+        # Sort by expected damage (ties keep index order) and return top K
+        order = np.argsort(-expected, kind="stable")[:top_k]
+        return [(self.idx_to_behavior[int(followers[o])], float(expected[o])) for o in order]
     
     def identify_constellations(self, min_cooccurrence: int = 3, min_success_weight: float = 20.0):
         """
@@ -134,46 +432,37 @@ class BehaviorConstellationMatrix:
         self.constellations.clear()
         self.constellation_success_rates.clear()
         
-        # Find strongly connected behavior pairs
-        strong_pairs = []
-        for i in range(self.n):
-            for j in range(i + 1, self.n):
-                if self.cooccurrence[i][j] >= min_cooccurrence:
-                    # Calculate average success when these behaviors co-occur
-                    total_success = (self.success_weights[i][j] + self.success_weights[j][i])
-                    total_count = max(1, self.success_counts[i][j] + self.success_counts[j][i])
-                    avg_success = total_success / total_count
-                    
-                    if avg_success >= min_success_weight:
-                        strong_pairs.append((i, j, avg_success))
-        
-        # Group pairs into constellations using simple clustering
-        used_behaviors = set()
+        # Find strongly connected behavior pairs (i < j), with their average success when co-occurring
+        pair_i, pair_j, counts = self._upper_cooccurrences()
+        frequent = counts >= min_cooccurrence
+        pair_i, pair_j = pair_i[frequent], pair_j[frequent]
+        forward_weights, forward_counts = self._pair_success(pair_i, pair_j)
+        backward_weights, backward_counts = self._pair_success(pair_j, pair_i)
+        total_success = forward_weights + backward_weights
+        total_count = np.maximum(1, forward_counts + backward_counts)
+        avg_success = total_success / total_count
+        strong = avg_success >= min_success_weight
+        pair_i, pair_j, avg_success = pair_i[strong], pair_j[strong], avg_success[strong]
+        
+        # Group pairs into constellations, strongest pair first (ties in row-major order)
+        used = np.zeros(self.n, dtype=bool)
         constellation_id = 0
         
-        for i, j, success in sorted(strong_pairs, key=lambda x: x[2], reverse=True):
-            if i in used_behaviors or j in used_behaviors:
+        for p in np.argsort(-avg_success, kind="stable").tolist():
+            i, j = int(pair_i[p]), int(pair_j[p])
+            if used[i] or used[j]:
                 continue
             
-            # Start new constellation
-            constellation_name = f"constellation_{constellation_id}"
-            constellation_behaviors = {self.idx_to_behavior[i], self.idx_to_behavior[j]}
+            # Expand with behaviors that co-occur strongly with both i and j
+            members = (self._cooccurs_with(i, min_cooccurrence / 2)
+                       & self._cooccurs_with(j, min_cooccurrence / 2) & ~used)
+            members[[i, j]] = True
             
-            # Try to expand constellation with nearby behaviors
-            for k in range(self.n):
-                if k in [i, j] or k in used_behaviors:
-                    continue
-                
-                # Check if k co-occurs strongly with both i and j
-                co_i = self.cooccurrence[i][k]
-                co_j = self.cooccurrence[j][k]
-                if co_i >= min_cooccurrence / 2 and co_j >= min_cooccurrence / 2:
-                    constellation_behaviors.add(self.idx_to_behavior[k])
-            
-            self.constellations[constellation_name] = constellation_behaviors
-            self.constellation_success_rates[constellation_name] = success
+            constellation_name = f"constellation_{constellation_id}"
+            self.constellations[constellation_name] = {self.idx_to_behavior[k] for k in np.flatnonzero(members).tolist()}
+            self.constellation_success_rates[constellation_name] = avg_success[p]
             
-            used_behaviors.update([i, j])
+            used[i] = used[j] = True
             constellation_id += 1
         
         logger.info(f"Identified {len(self.constellations)} behavior constellations")
@@ -207,63 +496,82 @@ class BehaviorConstellationMatrix:
     
     def get_matrix_stats(self) -> Dict:
         """Get statistics about the matrices for debugging."""
+        if self.sparse:
+            total_cooccurrences = sum(sum(row.values()) for row in self._co_rows.values()) // 2
+            total_transitions = sum(self._row_totals.values())
+        else:
+            total_cooccurrences = int(self.cooccurrence.sum() / 2) # Divide by 2 since symmetric
+            total_transitions = int(self.transition_counts.sum())
         return {
             "n_behaviors": self.n,
-            "total_cooccurrences": int(self.cooccurrence.sum() / 2),  # Divide by 2 since symmetric
-            "total_transitions": int(self.transition_counts.sum()),
+            "storage": "sparse" if self.sparse else "dense",
+            "total_cooccurrences": total_cooccurrences,
+            "total_transitions": total_transitions,
             "n_constellations": len(self.constellations),
             "avg_constellation_size": np.mean([len(c) for c in self.constellations.values()]) if self.constellations else 0,
             "most_common_transitions": self._get_top_transitions(5),
             "strongest_cooccurrences": self._get_top_cooccurrences(5)
         }
     
+    def memory_usage(self) -> Dict:
+        """Approximate bytes held by the pair storage."""
+        if self.sparse:
+            tables = (self._co_rows, self._transition_rows, self._weight_rows, self._success_rows)
+            stored_pairs = sum(len(row) for table in tables for row in table.values())
+            nbytes = sum(sys.getsizeof(row) for table in tables for row in table.values())
+        else:
+            buffers = (self._cooccurrence, self._transition, self._transition_counts,
+                       self._success_weights, self._success_counts)
+            stored_pairs = self.n * self.n * len(buffers)
+            nbytes = sum(buffer.nbytes for buffer in buffers)
+        return {
+            "storage": "sparse" if self.sparse else "dense",
+            "n_behaviors": self.n,
+            "stored_pairs": stored_pairs,
+            "bytes": nbytes
+        }
+    
     def _get_top_transitions(self, n: int) -> List[Tuple[str, str, float]]:
         """Get top N most common behavior transitions."""
-        transitions = []
-        for i in range(self.n):
-            for j in range(self.n):
-                if self.transition_counts[i][j] > 0:
-                    transitions.append((
-                        self.idx_to_behavior[i],
-                        self.idx_to_behavior[j],
-                        float(self.transition[i][j])
-                    ))
-        transitions.sort(key=lambda x: x[2], reverse=True)
-        return transitions[:n]
+        rows, cols, probabilities = self._transition_entries()
+        order = np.argsort(-probabilities, kind="stable")[:n]
+        return [(self.idx_to_behavior[int(rows[o])], self.idx_to_behavior[int(cols[o])], float(probabilities[o]))
+                for o in order]
     
     def _get_top_cooccurrences(self, n: int) -> List[Tuple[str, str, float]]:
         """Get top N most common behavior co-occurrences."""
-        cooccurrences = []
-        for i in range(self.n):
-            for j in range(i + 1, self.n):
-                if self.cooccurrence[i][j] > 0:
-                    cooccurrences.append((
-                        self.idx_to_behavior[i],
-                        self.idx_to_behavior[j],
-                        float(self.cooccurrence[i][j])
-                    ))
-        cooccurrences.sort(key=lambda x: x[2], reverse=True)
-        return cooccurrences[:n]
+        rows, cols, counts = self._upper_cooccurrences()
+        order = np.argsort(-counts, kind="stable")[:n]
+        return [(self.idx_to_behavior[int(rows[o])], self.idx_to_behavior[int(cols[o])], float(counts[o]))
+                for o in order]
     
     def save_to_file(self, filepath: str):
-        """Save matrices to file for persistence."""
-        data = {
+        """
+        Save matrices for persistence: a small JSON manifest at filepath plus one
+        .npy file per pair array next to it (<name>.<array>.npy).
+        """
+        base = os.path.splitext(filepath)[0]
+        arrays = {}
+        for name, values in self._pair_arrays().items():
+            array_path = f"{base}.{name}.npy"
+            np.save(array_path, values)
+            arrays[name] = os.path.basename(array_path)
+        
+        manifest = {
+            "version": self.FILE_VERSION,
+            "storage": "sparse" if self.sparse else "dense",
             "behavior_ids": self.behavior_ids,
-            "cooccurrence": self.cooccurrence.tolist(),
-            "transition_counts": self.transition_counts.tolist(),
-            "success_weights": self.success_weights.tolist(),
-            "success_counts": self.success_counts.tolist(),
+            "arrays": arrays,
             "constellations": {k: list(v) for k, v in self.constellations.items()},
             "constellation_success_rates": self.constellation_success_rates
         }
-        
         with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump(manifest, f, separators=(",", ":"))
         
         logger.info(f"Saved constellation matrix to {filepath}")
     
     def load_from_file(self, filepath: str):
-        """Load matrices from file."""
+        """Load matrices from file. Pair arrays are read as binary .npy, not parsed."""
         with open(filepath, 'r') as f:
             data = json.load(f)
         
@@ -272,14 +580,30 @@ class BehaviorConstellationMatrix:
         self.idx_to_behavior = {idx: bid for bid, idx in self.behavior_to_idx.items()}
         self.n = len(self.behavior_ids)
         
-        self.cooccurrence = np.array(data["cooccurrence"], dtype=np.float32)
-        self.transition_counts = np.array(data["transition_counts"], dtype=np.int32)
-        self.success_weights = np.array(data["success_weights"], dtype=np.float32)
-        self.success_counts = np.array(data["success_counts"], dtype=np.int32)
+        if "arrays" in data:
+            folder = os.path.dirname(filepath)
+            pairs = {name: np.load(os.path.join(folder, filename))
+                     for name, filename in data["arrays"].items()}
+        else:
+            pairs = self._legacy_pair_arrays(data)
         
-        self._update_transition_probabilities()
+        self._drop_dense()
+        if self.n > self.sparse_threshold:
+            self._fill_sparse(pairs)
+        else:
+            self._fill_dense(pairs)
         
         self.constellations = {k: set(v) for k, v in data["constellations"].items()}
         self.constellation_success_rates = data["constellation_success_rates"]
         
         logger.info(f"Loaded constellation matrix from {filepath}")
+    
+    @staticmethod
+    def _legacy_pair_arrays(data: Dict) -> Dict[str, np.ndarray]:
+        """Pair arrays from a pre-manifest save (nested JSON matrices)."""
+        n = len(data["behavior_ids"])
+        return BehaviorConstellationMatrix._dense_pair_arrays(
+            np.array(data["cooccurrence"], dtype=np.float32).reshape(n, n),
+            np.array(data["transition_counts"], dtype=np.int32).reshape(n, n),
+            np.array(data["success_weights"], dtype=np.float32).reshape(n, n),
+            np.array(data["success_counts"], dtype=np.int32).reshape(n, n))
@@ -3,17 +3,46 @@
 
 import logging
 import math
-import random
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Optional, Tuple
 import pygame
 
+from core.rng import stream
+
 logger = logging.getLogger(__name__)
 
+rng = stream("executor") # Aim noise, repositioning, teleports, summons
+
+class BehaviorPlan:
+    """
+    A behavior's action_type resolved once into handler calls: bound handlers
+    plus a frozen copy of its parameters. Compound plans (boss mutations "a+b")
+    run every handler and report success; simple plans return their handler's result.
+    """
+    __slots__ = ("executor", "handlers", "params", "compound")
+    
+    def __init__(self, executor: 'BehaviorExecutor', handlers: Tuple[Callable, ...],
+                 params: MappingProxyType, compound: bool):
+        self.executor = executor
+        self.handlers = handlers
+        self.params = params
+        self.compound = compound
+    
+    def __call__(self, enemy, player, current_time: float) -> bool:
+        if self.compound:
+            for handler in self.handlers:
+                handler(enemy, self.params, player, current_time)
+            return True
+        if not self.handlers:
+            return False
+        return self.handlers[0](enemy, self.params, player, current_time)
+
 class BehaviorExecutor:
     """
     Maps JSON behavior definitions to actual game actions.
     This is the bridge between declarative JSON and imperative code.
     """
+    FRAME_DT = 0.016
     
     def __init__(self, game_state):
         """
@@ -22,6 +51,10 @@ class BehaviorExecutor:
         """
         self.game_state = game_state
         
+        # Movement integrated per behavior call. One frame (~60fps) normally; the
+        # AI scheduler raises it for enemies that think less often.
+        self.step_dt = self.FRAME_DT
+        
         # Register all action handlers
         self.action_handlers = {
             # Movement behaviors
@@ -55,6 +88,39 @@ class BehaviorExecutor:
             "combo": self._execute_combo,
         }
     
+    def attach(self, behavior_system):
+        """Compile plans for every known behavior, and for new ones as they are registered."""
+        behavior_system.plan_compiler = self.compile
+        for behaviors in behavior_system.behaviors.values():
+            for behavior in behaviors:
+                self.compile(behavior)
+    
+    def compile(self, behavior) -> BehaviorPlan:
+        """Resolves behavior.action_type to handlers and stores the plan on the behavior."""
+        action_type = behavior.action_type
+        params = MappingProxyType(dict(behavior.parameters))
+        
+        # Check for combo/compound behaviors
+        if "+" in action_type:
+            # Boss mutation - execute multiple behaviors in sequence
+            handlers = tuple(self.action_handlers[sub_action] for sub_action in action_type.split("+")
+                             if sub_action in self.action_handlers)
+            plan = BehaviorPlan(self, handlers, params, compound=True)
+        else:
+            handler = None
+            # Check for amplified behaviors
+            if action_type.startswith("amplified_"):
+                handler = self.action_handlers.get(action_type.replace("amplified_", ""))
+            # Standard behavior execution
+            if handler is None:
+                handler = self.action_handlers.get(action_type)
+            if handler is None:
+                logger.warning(f"No handler for action_type: {action_type}")
+            plan = BehaviorPlan(self, (handler,) if handler else (), params, compound=False)
+        
+        behavior.plan = plan
+        return plan
+    
     def execute_behavior(self, enemy, behavior, player, current_time: float) -> bool:
         """
         Execute a behavior for an enemy.
@@ -68,31 +134,10 @@ class BehaviorExecutor:
         Returns:
             bool: True if behavior executed successfully
         """
-        action_type = behavior.action_type
-        params = behavior.parameters
-        
-        # Check for combo/compound behaviors
-        if "+" in action_type:
-            # Boss mutation - execute multiple behaviors in sequence
-            sub_actions = action_type.split("+")
-            for sub_action in sub_actions:
-                if sub_action in self.action_handlers:
-                    self.action_handlers[sub_action](enemy, params, player, current_time)
-            return True
-        
-        # Check for amplified behaviors
-        if action_type.startswith("amplified_"):
-            base_action = action_type.replace("amplified_", "")
-            if base_action in self.action_handlers:
-                return self.action_handlers[base_action](enemy, params, player, current_time)
-        
-        # Standard behavior execution
-        handler = self.action_handlers.get(action_type)
-        if handler:
-            return handler(enemy, params, player, current_time)
-        else:
-            logger.warning(f"No handler for action_type: {action_type}")
-            return False
+        plan = getattr(behavior, "plan", None)
+        if plan is None or plan.executor is not self:
+            plan = self.compile(behavior)
+        return plan(enemy, player, current_time)
     
     # ===== MOVEMENT BEHAVIORS =====
     
@@ -105,13 +150,19 @@ class BehaviorExecutor:
             # Apply "Estimation Error" / Aggro Drop
             # Enemies guess randomly around the player
             # Bosses/Ambushers might have better tracking (less noise), but for now generic:
-            import random
             noise_range = 300 # Significant error
-            tx += random.uniform(-noise_range, noise_range)
-            ty += random.uniform(-noise_range, noise_range)
+            tx += rng.uniform(-noise_range, noise_range)
+            ty += rng.uniform(-noise_range, noise_range)
             
         return tx, ty
 
+    def _game_map(self):
+        return getattr(self.game_state, 'game_map', None)
+
+    def _flow_field(self):
+        """Shared player flow field of the current map, if any."""
+        return getattr(self._game_map(), 'flow_field', None)
+
     # ===== MOVEMENT BEHAVIORS =====
     
     def _execute_move_toward(self, enemy, params, player, current_time):
@@ -126,7 +177,10 @@ class BehaviorExecutor:
         
         if dist > min_dist:
             enemy.max_speed = enemy.base_speed * speed_mult if hasattr(enemy, 'base_speed') else 200 * speed_mult
-            enemy.update_movement(dx, dy, 0.016)  # Assume ~60fps
+            flow_field = self._flow_field()
+            if flow_field:
+                dx, dy = flow_field.steer(enemy.x, enemy.y, tx, ty)
+            enemy.update_movement(dx, dy, self.step_dt, self._game_map())
         return True
     
     def _execute_kite_away(self, enemy, params, player, current_time):
@@ -140,13 +194,21 @@ class BehaviorExecutor:
         dy = ty - enemy.y
         dist = math.sqrt(dx**2 + dy**2)
         
+        flow_field = self._flow_field()
+        game_map = self._game_map()
         if dist < min_range:
-            # Too close - retreat
-            enemy.update_movement(-dx, -dy, 0.016)
+            # Too close - retreat (climb the flow field so we don't back into walls)
+            if flow_field:
+                away_x, away_y = flow_field.flee(enemy.x, enemy.y, tx, ty)
+            else:
+                away_x, away_y = -dx, -dy
+            enemy.update_movement(away_x, away_y, self.step_dt, game_map)
             enemy.max_speed *= retreat_speed
         elif dist > ideal_range * 1.5:
             # Too far - advance
-            enemy.update_movement(dx, dy, 0.016)
+            if flow_field:
+                dx, dy = flow_field.steer(enemy.x, enemy.y, tx, ty)
+            enemy.update_movement(dx, dy, self.step_dt, game_map)
         return True
     
     def _execute_flanking_move(self, enemy, params, player, current_time):
@@ -160,8 +222,11 @@ class BehaviorExecutor:
         dx = tx - enemy.x
         dy = ty - enemy.y
         
-        # Rotate 90 degrees
-        if direction == "left":
+        # Rotate 90 degrees (around the flow field's path direction when we have one)
+        flow_field = self._flow_field()
+        if flow_field:
+            flank_dx, flank_dy = flow_field.flank(enemy.x, enemy.y, tx, ty, direction)
+        elif direction == "left":
             flank_dx = -dy
             flank_dy = dx
         else:
@@ -169,15 +234,15 @@ class BehaviorExecutor:
             flank_dy = -dx
         
         enemy.max_speed *= speed_mult
-        enemy.update_movement(flank_dx, flank_dy, 0.016)
+        enemy.update_movement(flank_dx, flank_dy, self.step_dt, self._game_map())
         return True
     
     def _execute_tactical_move(self, enemy, params, player, current_time):
         """Reposition for cover/advantage."""
         # Simplified: move to random nearby position
         if not hasattr(enemy, 'tactical_target'):
-            angle = random.uniform(0, math.pi * 2)
-            dist = random.uniform(100, 200)
+            angle = rng.uniform(0, math.pi * 2)
+            dist = rng.uniform(100, 200)
             enemy.tactical_target = (
                 enemy.x + math.cos(angle) * dist,
                 enemy.y + math.sin(angle) * dist
@@ -190,7 +255,7 @@ class BehaviorExecutor:
         if math.sqrt(dx**2 + dy**2) < 20:
             del enemy.tactical_target
         else:
-            enemy.update_movement(dx, dy, 0.016)
+            enemy.update_movement(dx, dy, self.step_dt)
         return True
     
     def _execute_sprint_attack(self, enemy, params, player, current_time):
@@ -349,7 +414,7 @@ class BehaviorExecutor:
                 return True # On cooldown, but "executing"
                 
             enemy.last_alert_time = current_time
-            logger.info(f"{enemy.name} ALERTED enemies within {alert_radius}px!")
+            logger.info("%s ALERTED enemies within %spx!", enemy.name, alert_radius)
             
             # Find enemies in range
             count = 0
@@ -387,7 +452,7 @@ class BehaviorExecutor:
             enemy.cloaked_until = current_time + duration
             enemy.detection_range *= detection_mult
             enemy.is_cloaked = True
-            logger.info(f"{enemy.name} activated cloak")
+            logger.info("%s activated cloak", enemy.name)
         
         if current_time >= enemy.cloaked_until:
             enemy.is_cloaked = False
@@ -418,7 +483,7 @@ class BehaviorExecutor:
         damage = params.get("damage", 30)
         
         # Teleport behind player
-        angle = random.uniform(0, math.pi * 2)
+        angle = rng.uniform(0, math.pi * 2)
         enemy.x = player.x + math.cos(angle) * 100
         enemy.y = player.y + math.sin(angle) * 100
         
@@ -447,7 +512,7 @@ class BehaviorExecutor:
             dist = math.sqrt(dx**2 + dy**2)
             
             if dist > 10:
-                enemy.update_movement(dx, dy, 0.016)
+                enemy.update_movement(dx, dy, self.step_dt)
                 return True
         
         return False
@@ -476,7 +541,7 @@ class BehaviorExecutor:
             if not hasattr(enemy, 'is_enraged'):
                 enemy.is_enraged = True
                 enemy.damage_multiplier = damage_boost
-                logger.info(f"{enemy.name} ENRAGED!")
+                logger.info("%s ENRAGED!", enemy.name)
         
         return True
     
@@ -492,13 +557,13 @@ class BehaviorExecutor:
         if current_time - enemy.last_summon_time >= cooldown:
             if hasattr(self.game_state, 'spawn_enemy'):
                 for _ in range(count):
-                    angle = random.uniform(0, math.pi * 2)
+                    angle = rng.uniform(0, math.pi * 2)
                     spawn_x = enemy.x + math.cos(angle) * 200
                     spawn_y = enemy.y + math.sin(angle) * 200
                     self.game_state.spawn_enemy(ally_type, spawn_x, spawn_y)
             
             enemy.last_summon_time = current_time
-            logger.info(f"{enemy.name} summoned {count} {ally_type}s!")
+            logger.info("%s summoned %d %ss!", enemy.name, count, ally_type)
             return True
         
         return False
@@ -1,13 +1,19 @@
 import pygame
 import math
+import numpy as np
 import constants
-import random
 import logging
+from core.profiler import profiler
+from core.rng import stream
 from entities.projectile import Projectile
+from entities.projectile_pool import ProjectilePool
 from entities.vortex import Vortex
+from systems.spatial_hash import ENEMY_FACTION, SpatialHash, target_faction
 
 logger = logging.getLogger(__name__)
 
+fx_rng = stream("effects") # Cosmetic only; never feeds back into the simulation
+
 class VisualEffect:
     def __init__(self, effect_type, x, y, **kwargs):
         self.type = effect_type
@@ -47,7 +53,7 @@ class VisualEffect:
                     perp_x /= plen
                     perp_y /= plen
                 
-                jitter = random.randint(-10, 10)
+                jitter = fx_rng.randint(-10, 10)
                 px = start[0] + dx * i + perp_x * jitter
                 py = start[1] + dy * i + perp_y * jitter
                 points.append((px, py))
@@ -90,6 +96,8 @@ class ZoneEffect(VisualEffect):
             dist_sq = (p.x - self.x)**2 + (p.y - self.y)**2
             if dist_sq < self.radius**2:
                 self._handle_projectile_interaction(p, combat_system)
+        for p in combat_system.projectile_pool.within(self.x, self.y, self.radius):
+            self._handle_projectile_interaction(p, combat_system)
 
     def _apply_zone_logic(self, bot, dt):
         if self.element == "water":
@@ -112,7 +120,7 @@ class ZoneEffect(VisualEffect):
                 # Transform to Electrified Water
                 self.element = "electrified_water"
                 self.lifetime = 5.0 # Refresh duration
-                combat_system.visual_effects.append(VisualEffect("lightning_bolt", self.x, self.y, end_pos=(self.x+random.randint(-20,20), self.y+random.randint(-20,20)), duration=0.5))
+                combat_system.visual_effects.append(VisualEffect("lightning_bolt", self.x, self.y, end_pos=(self.x+fx_rng.randint(-20,20), self.y+fx_rng.randint(-20,20)), duration=0.5))
                 p.active = False # Consume projectile? Maybe
             elif synergy == "fire":
                 # Create Steam
@@ -149,14 +157,18 @@ class ZoneEffect(VisualEffect):
 class CombatSystem:
     def __init__(self, asset_manager, behavior_system=None):
         self.asset_manager = asset_manager
-        self.projectiles = []
+        self.projectiles = [] # Slow path: Orbitals, vortex/detonation carriers
+        self.projectile_pool = ProjectilePool() # Everything else, as NumPy arrays
+        self._bots_displaced = False # Set when an implosion moves bots mid-collision pass
         self.vortices = [] # Legacy Vortex entities
         self.visual_effects = [] # New Visual Effects
         self.zone_effects = [] # New Zone Effects
         self.behavior_system = behavior_system  # For AI learning
+        self.spatial_index = SpatialHash() # Bot broad-phase, rebuilt each update
 
     def update(self, dt, game_map, all_bots):
         # Update Visual Effects
+        profiler.begin("combat.effects")
         for effect in self.visual_effects:
             effect.update(dt)
         self.visual_effects = [e for e in self.visual_effects if e.lifetime > 0]
@@ -184,6 +196,13 @@ class CombatSystem:
                     bot.x += math.cos(angle) * force * dt
                     bot.y += math.sin(angle) * force * dt
 
+        profiler.end()
+
+        # Broad-phase: bucket bots once per tick (after legacy vortex pulls)
+        profiler.begin("combat.projectiles")
+        index = self.spatial_index
+        index.rebuild(all_bots)
+
         # Update Projectiles
         for p in self.projectiles:
             p.update(dt)
@@ -200,10 +219,7 @@ class CombatSystem:
                 drag_radius = 200.0 
                 drag_strength = p.damage * 8.0
                 
-                for bot in all_bots:
-                    if p.owner == "player" and bot.name == "Player": continue
-                    if p.owner == "enemy" and bot.name != "Player": continue
-                    
+                for bot in index.query(p.x, p.y, drag_radius, target_faction(p.owner)):
                     dx = p.x - bot.x
                     dy = p.y - bot.y
                     dist_sq = dx*dx + dy*dy
@@ -215,11 +231,19 @@ class CombatSystem:
                         force = drag_strength / (dist * 0.1) * dt
                         bot.x += nx * force
                         bot.y += ny * force
+                        index.move(bot)
         
         # Remove inactive projectiles
         self.projectiles = [p for p in self.projectiles if p.active]
         
+        # Plain projectiles: vectorized integration, expiry and wall culling
+        pool = self.projectile_pool
+        pool.integrate(dt)
+        pool.cull_walls(game_map.get_wall_mask(), constants.TILE_SIZE)
+        profiler.end()
+        
         # Collision Detection
+        profiler.begin("combat.collision")
         for p in self.projectiles:
             if not p.active: continue
             
@@ -235,194 +259,62 @@ class CombatSystem:
                 p.active = False
                 continue
                 
-            # Entity Collision
-            for bot in all_bots:
-                if p.owner == "player" and bot.name == "Player": continue
-                if p.owner == "enemy" and bot.name != "Player": continue
-                
-                # Bounding Box Check (Generous)
-                radius = constants.TILE_SIZE
-                if bot.sprite:
-                    radius = max(bot.sprite.get_width(), bot.sprite.get_height()) / 2
-                
-                dist = math.sqrt((p.x - bot.x)**2 + (p.y - bot.y)**2)
-                if dist < radius:
-                    # Pixel-Perfect Mask Check
-                    hit = True
-                    if bot.mask and bot.sprite:
-                        # Calculate offset relative to sprite top-left
-                        # Sprite is centered at bot.x, bot.y
-                        sx = bot.x - bot.sprite.get_width() / 2
-                        sy = bot.y - bot.sprite.get_height() / 2
-                        offset_x = int(p.x - sx)
-                        offset_y = int(p.y - sy)
-                        
-                        # Check bounds
-                        if 0 <= offset_x < bot.sprite.get_width() and 0 <= offset_y < bot.sprite.get_height():
-                            if not bot.mask.get_at((offset_x, offset_y)):
-                                hit = False
-                        else:
-                            hit = False
-                    
-                    if hit:
-                        health_before = bot.hp
-                        
-                        # Apply Status Effects
-                        if p.effects and "status_effect" in p.effects:
-                            status_name = p.effects["status_effect"]
-                            duration = p.effects.get("duration", 5.0)
-                            power = p.damage * 0.2 
-                            bot.apply_status_effect(status_name, duration, power)
-                        
-                        # Synergy Specifics
-                        # Handle multiple active synergies
-                        active_synergies = p.effects.get("active_synergies", [])
-                        # Fallback for legacy/single synergy
-                        if not active_synergies and p.effects.get("synergy_name"):
-                            active_synergies = [p.effects.get("synergy_name")]
-                            
-                        for synergy in active_synergies:
-                            if synergy == "fire":
-                                bot.apply_status_effect("burn", 3.0, p.damage * 0.2)
-                                
-                            if synergy == "ice":
-                                bot.apply_status_effect("freeze", 3.0, 0)
-                                
-                            if synergy == "lightning":
-                                chain_range = 250.0
-                                chain_dmg = p.damage * 0.7
-                                
-                                nearest = None
-                                min_d = float('inf')
-                                for other in all_bots:
-                                    if other == bot: continue
-                                    if p.owner == "player" and other.name == "Player": continue
-                                    if p.owner == "enemy" and other.name != "Player": continue
-                                    
-                                    d_sq = (bot.x - other.x)**2 + (bot.y - other.y)**2
-                                    if d_sq < chain_range**2 and d_sq < min_d:
-                                        min_d = d_sq
-                                        nearest = other
-                                
-                                if nearest:
-                                    nearest.take_damage(chain_dmg)
-                                    self.visual_effects.append(VisualEffect(
-                                        "lightning_bolt", bot.x, bot.y, 
-                                        end_pos=(nearest.x, nearest.y), duration=0.2
-                                    ))
-        
-                            if synergy == "vortex":
-                                 self.visual_effects.append(VisualEffect(
-                                    "implosion", p.x, p.y, radius=100, duration=0.3
-                                ))
-                                # Vortex Implosion (Instant Pull)
-                                 implosion_radius = 200.0
-                                 implosion_strength = 50.0
-                                 for other_bot in all_bots:
-                                     if other_bot == bot: continue
-                                     if p.owner == "player" and other_bot.name == "Player": continue
-                                     if p.owner == "enemy" and other_bot.name != "Player": continue
-                                     
-                                     dx = p.x - other_bot.x
-                                     dy = p.y - other_bot.y
-                                     dist_sq = dx*dx + dy*dy
-                                     if dist_sq < implosion_radius**2:
-                                         dist = math.sqrt(dist_sq)
-                                         if dist > 10:
-                                             pull = min(dist - 10, implosion_strength)
-                                             other_bot.x += (dx / dist) * pull
-                                             other_bot.y += (dy / dist) * pull
-        
-                            if synergy == "explosion":
-                                self._trigger_explosion(p, all_bots)
+            self._collide_projectile(p, all_bots, index)
 
-                            if synergy == "kinetic":
-                                # Kinetic Knockback
-                                knockback_force = 300.0
-                                bot.knockback(knockback_force, p.angle)
-    
-                            # Vampiric (Check both dominant and background synergies)
-                            active_synergies = p.effects.get("active_synergies", [])
-                            if synergy == "vampiric" or "vampiric" in active_synergies:
-                                # Formula: Healing = (Base_Rarity_Percentage) * (Reactor_Power / 100)
-                                # Base Rarity Percentage: Common=5%, Uncommon=10%, Rare=15%, Epic=20%, Legendary=25%
-                                rarity = p.effects.get("rarity", "Common")
-                                base_pct = 0.05
-                                if rarity == "Uncommon": base_pct = 0.10
-                                elif rarity == "Rare": base_pct = 0.15
-                                elif rarity == "Epic": base_pct = 0.20
-                                elif rarity == "Legendary": base_pct = 0.25
-                                
-                                # Reactor Power comes from the magnitude of the Vampiric synergy
-                                # We need to pass this in effects. Let's assume 'vampiric_power' is passed.
-                                reactor_power = p.effects.get("vampiric_power", 100.0)
-                                
-                                heal_pct = base_pct * (reactor_power / 100.0)
-                                heal_amount = p.damage * heal_pct
-                                
-                                if p.owner == "player":
-                                    for b in all_bots:
-                                        if b.name == "Player":
-                                            b.heal(heal_amount)
-                                            break
-    
-                        bot.take_damage(p.damage)
-                        
-                        # Pierce Logic
-                        if p.pierce_count > 0:
-                            p.pierce_count -= 1
-                            p.hit_list.append(id(bot))
-                            p.lifetime = constants.PROJECTILE_LIFETIME # Reset range
-                            # Do NOT set active = False
-                        else:
-                            p.active = False
-                        
-                        # AI Learning
-                        if bot.name == "Player" and self.behavior_system is not None:
-                            from entities.enemy import Enemy
-                            for enemy in all_bots:
-                                if isinstance(enemy, Enemy) and p.owner == "enemy":
-                                    enemy_id = str(id(enemy))
-                                    self.behavior_system.track_player_damage(
-                                        damage_amount=p.damage,
-                                        player_health_before=health_before,
-                                        player_health_after=bot.hp,
-                                        enemy_id=enemy_id,
-                                        enemy_class=enemy.ai_class
-                                    )
-                                    break
-                        
-                        if p.active: # If piercing, continue to check other collisions? 
-                            # No, usually one hit per frame per projectile is enough to avoid hitting same target multiple times if we didn't use hit_list correctly
-                            # But we use hit_list. 
-                            # However, if we break here, we stop checking other bots for this projectile this frame.
-                            # Which is correct, we hit one thing.
-                            break
-                        else:
-                            break
+        # Pooled projectiles: narrow-phase only for those the vectorized broad-phase flags
+        self._bots_displaced = False
+        self._collide_pool(all_bots, index)
+        pool.compact()
+        profiler.end()
 
         # Enemy-Enemy Collision & Vortex Smash & Contagion
+        profiler.begin("combat.separation")
+        self._separate_enemies(all_bots, index)
+        profiler.end()
+
+    def _separate_enemies(self, all_bots, index):
+        """
+        Enemy separation, vortex smash and poison contagion, over grid neighbours only.
+        Neighbours come back in all_bots order, so pairs are visited (and pushes
+        compose) the same way as the old all-pairs scan.
+        """
         enemies = [b for b in all_bots if b.name != "Player" and b.hp > 0]
-        for i, bot1 in enumerate(enemies):
+        if len(enemies) < 2:
+            return
+        order = index.order
+        if any(id(b) not in order for b in enemies):
+            index.rebuild(all_bots) # Something spawned after the broad-phase
+            order = index.order
+        alive = {id(b) for b in enemies}
+        
+        spread_range = constants.TILE_SIZE * 2
+        min_dist = constants.TILE_SIZE * 0.8
+        # Player-side vortex projectiles don't move during this pass
+        vortices = [(p.x, p.y) for p in self.projectiles
+                    if p.active and p.effects and p.effects.get("synergy_name") == "vortex" and p.owner != "enemy"]
+        
+        for bot1 in enemies:
+            rank = order[id(bot1)]
+            neighbours = [b for b in index.query(bot1.x, bot1.y, spread_range, ENEMY_FACTION) if id(b) in alive]
+            
             # Contagion Spread
             if "poison" in bot1.status_effects:
-                for bot2 in enemies:
+                for bot2 in neighbours:
                     if bot1 == bot2: continue
                     if "poison" in bot2.status_effects: continue
                     
                     d_sq = (bot1.x - bot2.x)**2 + (bot1.y - bot2.y)**2
-                    if d_sq < (constants.TILE_SIZE * 2)**2: # Spread range
+                    if d_sq < spread_range**2:
                         # Spread poison!
                         p_effect = bot1.status_effects["poison"]
                         bot2.apply_status_effect("poison", p_effect["duration"], p_effect["power"])
 
-            for j in range(i + 1, len(enemies)):
-                bot2 = enemies[j]
+            for bot2 in neighbours:
+                if order[id(bot2)] <= rank: continue
                 
                 dx = bot1.x - bot2.x
                 dy = bot1.y - bot2.y
                 dist_sq = dx*dx + dy*dy
-                min_dist = constants.TILE_SIZE * 0.8
                 
                 if dist_sq < min_dist**2:
                     dist = math.sqrt(dist_sq)
@@ -438,21 +330,210 @@ class CombatSystem:
                     bot1.y += ny * sep_amount
                     bot2.x -= nx * sep_amount
                     bot2.y -= ny * sep_amount
+                    index.move(bot1)
+                    index.move(bot2)
                     
                     # Smash Damage
-                    near_vortex = False
-                    for p in self.projectiles:
-                        if p.active and p.effects and p.effects.get("synergy_name") == "vortex":
-                            if p.owner == "enemy": continue # No friendly fire from enemy vortices
-                            if (p.x - bot1.x)**2 + (p.y - bot1.y)**2 < 250**2:
-                                near_vortex = True
-                                break
-                    
-                    if near_vortex:
+                    if vortices and any((vx - bot1.x)**2 + (vy - bot1.y)**2 < 250**2 for vx, vy in vortices):
                         smash_dmg = overlap * 2.0 
                         bot1.take_damage(smash_dmg)
                         bot2.take_damage(smash_dmg)
 
+    def _collide_projectile(self, p, all_bots, index):
+        """Hit-tests one projectile against nearby bots and applies the first hit."""
+        # Entity Collision (broad-phase candidates, in all_bots order)
+        for bot in index.query_hits(p.x, p.y, target_faction(p.owner)):
+            # Bounding Box Check (Generous)
+            radius = index.radius_of(bot)
+            
+            dist_sq = (p.x - bot.x)**2 + (p.y - bot.y)**2
+            if dist_sq < radius * radius:
+                # Pixel-Perfect Mask Check
+                hit = True
+                if bot.mask and bot.sprite:
+                    # Calculate offset relative to sprite top-left
+                    # Sprite is centered at bot.x, bot.y
+                    sx = bot.x - bot.sprite.get_width() / 2
+                    sy = bot.y - bot.sprite.get_height() / 2
+                    offset_x = int(p.x - sx)
+                    offset_y = int(p.y - sy)
+                    
+                    # Check bounds
+                    if 0 <= offset_x < bot.sprite.get_width() and 0 <= offset_y < bot.sprite.get_height():
+                        if not bot.mask.get_at((offset_x, offset_y)):
+                            hit = False
+                    else:
+                        hit = False
+                
+                if hit:
+                    health_before = bot.hp
+                    
+                    # Apply Status Effects
+                    if p.effects and "status_effect" in p.effects:
+                        status_name = p.effects["status_effect"]
+                        duration = p.effects.get("duration", 5.0)
+                        power = p.damage * 0.2 
+                        bot.apply_status_effect(status_name, duration, power)
+                    
+                    # Synergy Specifics
+                    # Handle multiple active synergies
+                    active_synergies = p.effects.get("active_synergies", [])
+                    # Fallback for legacy/single synergy
+                    if not active_synergies and p.effects.get("synergy_name"):
+                        active_synergies = [p.effects.get("synergy_name")]
+                        
+                    for synergy in active_synergies:
+                        if synergy == "fire":
+                            bot.apply_status_effect("burn", 3.0, p.damage * 0.2)
+                            
+                        if synergy == "ice":
+                            bot.apply_status_effect("freeze", 3.0, 0)
+                            
+                        if synergy == "lightning":
+                            chain_range = 250.0
+                            chain_dmg = p.damage * 0.7
+                            
+                            nearest = None
+                            min_d = float('inf')
+                            for other in index.query(bot.x, bot.y, chain_range, target_faction(p.owner)):
+                                if other == bot: continue
+                                
+                                d_sq = (bot.x - other.x)**2 + (bot.y - other.y)**2
+                                if d_sq < chain_range**2 and d_sq < min_d:
+                                    min_d = d_sq
+                                    nearest = other
+                            
+                            if nearest:
+                                nearest.take_damage(chain_dmg)
+                                self.visual_effects.append(VisualEffect(
+                                    "lightning_bolt", bot.x, bot.y, 
+                                    end_pos=(nearest.x, nearest.y), duration=0.2
+                                ))
+    
+                        if synergy == "vortex":
+                             self.visual_effects.append(VisualEffect(
+                                "implosion", p.x, p.y, radius=100, duration=0.3
+                            ))
+                            # Vortex Implosion (Instant Pull)
+                             implosion_radius = 200.0
+                             implosion_strength = 50.0
+                             for other_bot in index.query(p.x, p.y, implosion_radius, target_faction(p.owner)):
+                                 if other_bot == bot: continue
+                                 
+                                 dx = p.x - other_bot.x
+                                 dy = p.y - other_bot.y
+                                 dist_sq = dx*dx + dy*dy
+                                 if dist_sq < implosion_radius**2:
+                                     dist = math.sqrt(dist_sq)
+                                     if dist > 10:
+                                         pull = min(dist - 10, implosion_strength)
+                                         other_bot.x += (dx / dist) * pull
+                                         other_bot.y += (dy / dist) * pull
+                                         index.move(other_bot)
+                                         self._bots_displaced = True
+    
+                        if synergy == "explosion":
+                            self._trigger_explosion(p, all_bots)
+
+                        if synergy == "kinetic":
+                            # Kinetic Knockback
+                            knockback_force = 300.0
+                            bot.knockback(knockback_force, p.angle)
+
+                        # Vampiric (Check both dominant and background synergies)
+                        active_synergies = p.effects.get("active_synergies", [])
+                        if synergy == "vampiric" or "vampiric" in active_synergies:
+                            # Formula: Healing = (Base_Rarity_Percentage) * (Reactor_Power / 100)
+                            # Base Rarity Percentage: Common=5%, Uncommon=10%, Rare=15%, Epic=20%, Legendary=25%
+                            rarity = p.effects.get("rarity", "Common")
+                            base_pct = 0.05
+                            if rarity == "Uncommon": base_pct = 0.10
+                            elif rarity == "Rare": base_pct = 0.15
+                            elif rarity == "Epic": base_pct = 0.20
+                            elif rarity == "Legendary": base_pct = 0.25
+                            
+                            # Reactor Power comes from the magnitude of the Vampiric synergy
+                            # We need to pass this in effects. Let's assume 'vampiric_power' is passed.
+                            reactor_power = p.effects.get("vampiric_power", 100.0)
+                            
+                            heal_pct = base_pct * (reactor_power / 100.0)
+                            heal_amount = p.damage * heal_pct
+                            
+                            if p.owner == "player":
+                                for b in all_bots:
+                                    if b.name == "Player":
+                                        b.heal(heal_amount)
+                                        break
+
+                    bot.take_damage(p.damage)
+                    
+                    # Pierce Logic
+                    if p.pierce_count > 0:
+                        p.pierce_count -= 1
+                        p.hit_list.append(id(bot))
+                        p.lifetime = constants.PROJECTILE_LIFETIME # Reset range
+                        # Do NOT set active = False
+                    else:
+                        p.active = False
+                    
+                    # AI Learning
+                    if bot.name == "Player" and self.behavior_system is not None:
+                        from entities.enemy import Enemy
+                        for enemy in all_bots:
+                            if isinstance(enemy, Enemy) and p.owner == "enemy":
+                                enemy_id = str(id(enemy))
+                                self.behavior_system.track_player_damage(
+                                    damage_amount=p.damage,
+                                    player_health_before=health_before,
+                                    player_health_after=bot.hp,
+                                    enemy_id=enemy_id,
+                                    enemy_class=enemy.ai_class
+                                )
+                                break
+                    
+                    if p.active: # If piercing, continue to check other collisions? 
+                        # No, usually one hit per frame per projectile is enough to avoid hitting same target multiple times if we didn't use hit_list correctly
+                        # But we use hit_list. 
+                        # However, if we break here, we stop checking other bots for this projectile this frame.
+                        # Which is correct, we hit one thing.
+                        break
+                    else:
+                        break
+
+    def _collide_pool(self, all_bots, index):
+        """Narrow-phase for pooled projectiles that lie inside some target's collision radius."""
+        pool = self.projectile_pool
+        if not pool.count or not all_bots:
+            return
+        order = self._pool_hit_candidates(index).tolist()
+        k = 0
+        while k < len(order):
+            i = order[k]
+            k += 1
+            p = pool.view(i)
+            if not p.active: continue
+            self._collide_projectile(p, all_bots, index)
+            if self._bots_displaced:
+                # An implosion moved bots after the broad-phase: check the rest exactly
+                self._bots_displaced = False
+                order = [j for j in pool.alive_indices().tolist() if j > i]
+                k = 0
+
+    def _pool_hit_candidates(self, index):
+        """Vectorized broad-phase: pool slots inside at least one hittable bot's radius."""
+        pool = self.projectile_pool
+        found = []
+        for code, owner in enumerate(pool.owner_names):
+            bots = index.members(target_faction(owner))
+            if not bots: continue
+            bot_x = np.fromiter((b.x for b in bots), dtype=np.float64, count=len(bots))
+            bot_y = np.fromiter((b.y for b in bots), dtype=np.float64, count=len(bots))
+            bot_r = np.fromiter((index.radius_of(b) for b in bots), dtype=np.float64, count=len(bots))
+            found.append(pool.hit_candidates(code, bot_x, bot_y, bot_r))
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
     def render(self, screen, camera_x, camera_y):
         for v in self.vortices:
             v.render(screen, camera_x, camera_y)
@@ -460,12 +541,17 @@ class CombatSystem:
             z.render(screen, camera_x, camera_y)
         for p in self.projectiles:
             p.render(screen, camera_x, camera_y)
+        self.projectile_pool.render(screen, camera_x, camera_y)
         for effect in self.visual_effects:
             effect.render(screen, camera_x, camera_y)
 
     def spawn_projectile(self, x, y, angle, speed, damage, damage_type, owner, effects=None):
-        p = Projectile(x, y, angle, speed, damage, damage_type, owner, effects)
-        self.projectiles.append(p)
+        # Vortex and detonation carriers need per-frame logic: keep them as objects
+        if effects and ("detonation_time" in effects or effects.get("synergy_name") == "vortex"):
+            p = Projectile(x, y, angle, speed, damage, damage_type, owner, effects)
+            self.projectiles.append(p)
+        else:
+            self.projectile_pool.spawn(x, y, angle, speed, damage, damage_type, owner, effects)
 
     def spawn_vortex(self, x, y, radius, strength, duration, owner):
         v = Vortex(x, y, radius, strength, duration, owner)
@@ -491,7 +577,7 @@ class CombatSystem:
         self.zone_effects.append(z)
 
     def _trigger_explosion(self, p, all_bots):
-        """Trigger an explosion effect from a projectile."""
+        """Trigger an explosion effect from a projectile. Uses the spatial index built in update()."""
         # Explosion logic: Push away + Damage
         explosion_radius = 150.0
         explosion_force = 500.0
@@ -499,10 +585,7 @@ class CombatSystem:
             "implosion", p.x, p.y, radius=explosion_radius, duration=0.2 
         ))
         
-        for other_bot in all_bots:
-            if p.owner == "player" and other_bot.name == "Player": continue
-            if p.owner == "enemy" and other_bot.name != "Player": continue
-            
+        for other_bot in self.spatial_index.query(p.x, p.y, explosion_radius, target_faction(p.owner)):
             dx = other_bot.x - p.x
             dy = other_bot.y - p.y
             dist_sq = dx*dx + dy*dy
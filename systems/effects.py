@@ -3,14 +3,16 @@
 # Description: Advanced visual effect classes with support for dynamic zoom.
 
 import pygame
-import random
 import math
 import time
 import logging
 import constants
+from core.rng import stream
 
 logger = logging.getLogger(__name__)
 
+rng = stream("effects")
+
 class Effect:
     """Base class for all temporary visual effects."""
     def __init__(self, duration):
@@ -35,8 +37,8 @@ class SparkleEffect(Effect):
         super().__init__(duration)
         self.x, self.y = x, y
         self.color = color
-        self.sparkles = [{'offset': (random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)),
-                          'size': random.randint(2, 5)} for _ in range(num_sparkles)]
+        self.sparkles = [{'offset': (rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)),
+                          'size': rng.randint(2, 5)} for _ in range(num_sparkles)]
 
     def render(self, screen, offset_x, offset_y, display_tile_size, asset_manager=None):
         if self.is_expired(): return
@@ -0,0 +1,275 @@
+# pixbots_enhanced/systems/movement_system.py
+# Batched movement integration for non-player bots.
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+import constants
+from entities.bot import Bot, MAX_STEP_DISTANCE
+from systems.spatial_hash import ENEMY_FACTION, faction_of
+
+logger = logging.getLogger(__name__)
+
+IMPACT_SPEED = 300 # Wall hits faster than this hurt
+IMPACT_DAMAGE = 0.1 # x impact speed
+KNOCKBACK_RATIO = 1.1 # Speeds above max_speed * this decay instead of clamping
+KNOCKBACK_DECAY = 0.92
+
+
+class MovementSystem:
+    """
+    Collects Bot.update_movement calls for non-player bots and integrates them
+    together with NumPy. Between begin() and flush(), update_movement only
+    queues the input. It captures acceleration, max speed and freeze at call
+    time, so behaviors that tweak max_speed afterwards still apply to the next
+    call. flush() runs the same steps as Bot.update_movement: acceleration or
+    deceleration, the knockback soft clamp, then X and Y tile collision against
+    the map's blocked mask with wall-impact damage. Like Bot.update_movement,
+    a move longer than MAX_STEP_DISTANCE is collided in sub-steps. Results are
+    written back to the bots.
+
+    A bot moved several times in one batch is integrated in call order: its
+    k-th move lands in round k, and each round is one vectorized step.
+    Positions read between begin() and flush() are the ones from before the batch.
+    """
+
+    def __init__(self):
+        # One entry per queued move; params holds input_x, input_y, dt, accel, max_speed per move
+        self.movers: List = []
+        self.params: List[float] = []
+        self.maps: List = []
+        self.active = False
+        self.stats = {"moves": 0, "rounds": 0, "bots": 0, "wall_hits": 0}
+
+    # --- Queueing ---
+    def begin(self):
+        """Routes non-player update_movement calls into this batch until flush()."""
+        if Bot.movement_batch is not None and Bot.movement_batch is not self:
+            Bot.movement_batch.flush()
+        self.active = True
+        Bot.movement_batch = self
+
+    def queue(self, bot, input_x: float, input_y: float, dt: float, game_map=None) -> bool:
+        """Called by Bot.update_movement. Returns False if the bot must move immediately."""
+        if not self.active or faction_of(bot) != ENEMY_FACTION:
+            return False
+        accel = bot.acceleration
+        max_spd = bot.max_speed
+        if "freeze" in bot.status_effects:
+            accel *= 0.5
+            max_spd *= 0.5
+        self.movers.append(bot)
+        self.params.extend((input_x, input_y, dt, accel, max_spd))
+        self.maps.append(game_map)
+        return True
+
+    def flush(self):
+        """Integrates every queued move and stops batching."""
+        self.active = False
+        if Bot.movement_batch is self:
+            Bot.movement_batch = None
+        movers, maps, params = self.movers, self.maps, self.params
+        self.movers, self.maps, self.params = [], [], []
+        n = len(movers)
+        if not n:
+            self.stats.update({"moves": 0, "rounds": 0, "bots": 0, "wall_hits": 0})
+            return
+
+        # Each bot's state is gathered once; owner maps a move to its bot's row
+        keys = np.fromiter(map(id, movers), np.int64, n)
+        _, first, owner = np.unique(keys, return_index=True, return_inverse=True)
+        bots = [movers[i] for i in first.tolist()]
+        x = np.array([b.x for b in bots], dtype=np.float64)
+        y = np.array([b.y for b in bots], dtype=np.float64)
+        vx = np.array([b.velocity_x for b in bots], dtype=np.float64)
+        vy = np.array([b.velocity_y for b in bots], dtype=np.float64)
+        decel = np.array([b.deceleration for b in bots], dtype=np.float64)
+        params = np.array(params, dtype=np.float64).reshape(n, 5).T
+
+        # Round k holds each bot's k-th move, so no bot appears twice in a round
+        order = np.argsort(owner, kind="stable")
+        group_start = np.searchsorted(owner[order], owner[order], side="left")
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n) - group_start
+
+        # Moves that collide, grouped by map; on_map None means every move
+        if maps.count(maps[0]) == n:
+            on_maps = [(maps[0], None)] if maps[0] is not None else []
+        else:
+            map_keys = np.fromiter(map(id, maps), np.int64, n)
+            on_maps = []
+            for key in np.unique(map_keys).tolist():
+                if key != id(None):
+                    on_map = map_keys == key
+                    on_maps.append((maps[int(on_map.argmax())], on_map))
+
+        rounds = int(rank.max()) + 1
+        wall_hits = 0
+        for k in range(rounds):
+            sel = np.flatnonzero(rank == k) if rounds > 1 else np.arange(n)
+            round_maps = [(game_map, on_map if on_map is None else on_map[sel]) for game_map, on_map in on_maps]
+            wall_hits += self._integrate(bots, round_maps, owner[sel], params[:, sel], x, y, vx, vy, decel)
+
+        for bot, bx, by, bvx, bvy in zip(bots, x.tolist(), y.tolist(), vx.tolist(), vy.tolist()):
+            bot.x = bx
+            bot.y = by
+            bot.velocity_x = bvx
+            bot.velocity_y = bvy
+        self.stats.update({"moves": n, "rounds": rounds, "bots": len(bots), "wall_hits": wall_hits})
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+    # --- Integration ---
+    def _integrate(self, bots: List, maps: List, rows: np.ndarray, params: np.ndarray,
+                   x, y, vx, vy, decel) -> int:
+        """
+        One vectorized update_movement for a round of moves of distinct bots
+        `rows`; maps pairs each game map with the mask of moves colliding on
+        it (None for all of them).
+        Updates the per-bot state arrays in place and returns the wall hits.
+        """
+        input_x, input_y, dt, accel, max_spd = params
+        bx, by = x[rows], y[rows]
+        bvx, bvy = vx[rows], vy[rows]
+
+        # Accelerate along the input, or coast to a stop
+        mag = np.sqrt(input_x ** 2 + input_y ** 2)
+        moving = mag > 0
+        safe_mag = np.where(moving, mag, 1.0)
+        vx_coast = bvx * decel[rows]
+        vy_coast = bvy * decel[rows]
+        vx_coast[np.abs(vx_coast) < 1] = 0.0
+        vy_coast[np.abs(vy_coast) < 1] = 0.0
+        bvx = np.where(moving, bvx + input_x / safe_mag * accel * dt, vx_coast)
+        bvy = np.where(moving, bvy + input_y / safe_mag * accel * dt, vy_coast)
+
+        # Soft clamp: knockback speeds decay, ordinary overspeed is capped
+        speed = np.sqrt(bvx ** 2 + bvy ** 2)
+        over = speed > max_spd
+        knocked = over & (speed > max_spd * KNOCKBACK_RATIO)
+        capped = over & ~knocked
+        bvx[knocked] *= KNOCKBACK_DECAY
+        bvy[knocked] *= KNOCKBACK_DECAY
+        scale = max_spd[capped] / speed[capped]
+        bvx[capped] *= scale
+        bvy[capped] *= scale
+
+        # Collision only tests the destination tile, so long moves (coarse far-tier AI
+        # updates) are marched in sub-steps of at most MAX_STEP_DISTANCE
+        steps = np.ceil(np.sqrt(bvx ** 2 + bvy ** 2) * dt / MAX_STEP_DISTANCE)
+        if steps.max() > 1:
+            return self._march(bots, maps, rows, np.maximum(steps, 1.0), dt, bx, by, bvx, bvy, x, y, vx, vy)
+
+        next_x = bx + bvx * dt
+        next_y = by + bvy * dt
+
+        wall_hits = 0
+        for game_map, on_map in maps:
+            wall_hits += self._collide(game_map, bots, rows, on_map, bx, by, bvx, bvy, next_x, next_y)
+
+        x[rows] = next_x
+        y[rows] = next_y
+        vx[rows] = bvx
+        vy[rows] = bvy
+        return wall_hits
+
+    def _march(self, bots: List, maps: List, rows: np.ndarray, steps: np.ndarray, dt: np.ndarray,
+               bx, by, bvx, bvy, x, y, vx, vy) -> int:
+        """
+        Moves each row in `steps` equal sub-steps. Every remaining sub-step of
+        every move is sampled along its straight line at once; a move advances
+        to just before its first blocked sample, and that sub-step goes through
+        the usual _collide. So this loops once per wall hit, not once per sub-step.
+        """
+        sub_dt = dt / steps
+        taken = np.zeros(len(rows))
+        wall_hits = 0
+        live = np.arange(len(rows))
+        while len(live):
+            left = (steps[live] - taken[live]).astype(np.intp)
+            move = np.repeat(np.arange(len(live)), left) # Sample -> index into live
+            k = (np.arange(len(move)) - np.repeat(np.cumsum(left) - left, left) + 1).astype(np.float64)
+            src = live[move]
+            step_x = bvx[src] * sub_dt[src]
+            step_y = bvy[src] * sub_dt[src]
+            sample_x = bx[src] + step_x * k
+            sample_y = by[src] + step_y * k
+
+            # Same tests as _collide: X at the previous Y, then Y at the new X
+            hit = np.zeros(len(move), dtype=bool)
+            for game_map, on_map in maps:
+                blocked = game_map.get_blocked_mask()
+                idx = np.arange(len(move)) if on_map is None else np.flatnonzero(on_map[src])
+                hit[idx] |= (self._blocked(blocked, sample_x[idx], sample_y[idx] - step_y[idx]) |
+                             self._blocked(blocked, sample_x[idx], sample_y[idx]))
+
+            first = np.full(len(live), np.inf)
+            np.minimum.at(first, move[hit], k[hit])
+            stopped = np.isfinite(first)
+            free = np.where(stopped, first - 1, left)
+            bx[live] += bvx[live] * sub_dt[live] * free
+            by[live] += bvy[live] * sub_dt[live] * free
+            taken[live] += free
+
+            wall = live[stopped]
+            if len(wall):
+                lx, ly, lvx, lvy = bx[wall], by[wall], bvx[wall], bvy[wall]
+                next_x = lx + lvx * sub_dt[wall]
+                next_y = ly + lvy * sub_dt[wall]
+                for game_map, on_map in maps:
+                    wall_hits += self._collide(game_map, bots, rows[wall], on_map if on_map is None else on_map[wall],
+                                               lx, ly, lvx, lvy, next_x, next_y)
+                bx[wall] = next_x
+                by[wall] = next_y
+                bvx[wall] = lvx
+                bvy[wall] = lvy
+                taken[wall] += 1
+            live = live[taken[live] < steps[live]]
+
+        x[rows] = bx
+        y[rows] = by
+        vx[rows] = bvx
+        vy[rows] = bvy
+        return wall_hits
+
+    @staticmethod
+    def _blocked(blocked: np.ndarray, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """True where (px, py) is off the map or on a blocked tile."""
+        tile_size = constants.TILE_SIZE
+        # int() truncation, matching the scalar path (so -0.5 tiles still counts as column 0)
+        tx = np.trunc(px / tile_size)
+        ty = np.trunc(py / tile_size)
+        height, width = blocked.shape
+        hit = ~((tx >= 0) & (tx < width) & (ty >= 0) & (ty < height))
+        inside = ~hit
+        hit[inside] = blocked[ty[inside].astype(np.intp), tx[inside].astype(np.intp)]
+        return hit
+
+    def _collide(self, game_map, bots: List, rows: np.ndarray, on_map, x, y, vx, vy, next_x, next_y) -> int:
+        """Axis-separated tile collision for the moves selected by on_map, in place. Returns wall hits."""
+        blocked = game_map.get_blocked_mask()
+        idx = np.arange(len(x)) if on_map is None else np.flatnonzero(on_map)
+
+        hit_x = idx[self._blocked(blocked, next_x[idx], y[idx])]
+        self._impact(bots, rows, hit_x, vx, "X")
+        vx[hit_x] = 0.0
+        next_x[hit_x] = x[hit_x]
+
+        hit_y = idx[self._blocked(blocked, next_x[idx], next_y[idx])]
+        self._impact(bots, rows, hit_y, vy, "Y")
+        vy[hit_y] = 0.0
+        next_y[hit_y] = y[hit_y]
+        return len(hit_x) + len(hit_y)
+
+    @staticmethod
+    def _impact(bots: List, rows: np.ndarray, hits: np.ndarray, velocity: np.ndarray, axis: str):
+        fast = hits[np.abs(velocity[hits]) > IMPACT_SPEED]
+        for i in fast.tolist():
+            bot = bots[rows[i]]
+            speed = velocity[i].item()
+            dmg = abs(speed) * IMPACT_DAMAGE
+            bot.take_damage(dmg)
+            logger.debug("%s hit wall %s with speed %s, took %s damage", bot.name, axis, speed, dmg)
@@ -5,10 +5,31 @@
 import os
 import json
 import logging
+import numpy as np
 import constants
 
 logger = logging.getLogger(__name__)
 
+# Workbook values that are NumPy arrays are stored as .npy files next to the
+# JSON and referenced as {ARRAY_REF: filename}; they load memory-mapped.
+ARRAY_REF = "__npy__"
+
+def _split_arrays(node, folder: str, prefix: str):
+    if isinstance(node, np.ndarray):
+        filename = f"{prefix}.npy"
+        np.save(os.path.join(folder, filename), node)
+        return {ARRAY_REF: filename}
+    if isinstance(node, dict):
+        return {key: _split_arrays(value, folder, f"{prefix}.{key}") for key, value in node.items()}
+    return node
+
+def _join_arrays(node, folder: str):
+    if isinstance(node, dict):
+        if set(node) == {ARRAY_REF}:
+            return np.load(os.path.join(folder, node[ARRAY_REF]), mmap_mode="r")
+        return {key: _join_arrays(value, folder) for key, value in node.items()}
+    return node
+
 class SaveLoadSystem:
     def __init__(self, saves_dir: str, data_dir: str):
         self.saves_dir = saves_dir
@@ -25,8 +46,8 @@ class SaveLoadSystem:
             return None
         try:
             with open(workbook_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+                return _join_arrays(json.load(f), profile_path)
+        except (json.JSONDecodeError, ValueError, IOError) as e:
             logger.error(f"Failed to load AI workbook for '{profile_name}': {e}")
             return None
 
@@ -35,8 +56,9 @@ class SaveLoadSystem:
         os.makedirs(profile_path, exist_ok=True)
         workbook_file = os.path.join(profile_path, "ai_workbook.json")
         try:
+            workbook_data = _split_arrays(workbook_data, profile_path, "ai_workbook")
             with open(workbook_file, 'w') as f:
-                json.dump(workbook_data, f, indent=4)
+                json.dump(workbook_data, f, separators=(",", ":"))
             return True
         except IOError as e:
             logger.error(f"Failed to save AI workbook for '{profile_name}': {e}")
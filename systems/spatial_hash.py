@@ -0,0 +1,132 @@
+# pixbots_enhanced/systems/spatial_hash.py
+# Uniform-grid broad-phase index of bots, partitioned by faction.
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import constants
+
+PLAYER_FACTION = "player"
+ENEMY_FACTION = "enemy"
+
+
+def faction_of(bot) -> str:
+    """Bots are split the same way CombatSystem filters friendly fire."""
+    return PLAYER_FACTION if bot.name == "Player" else ENEMY_FACTION
+
+
+def target_faction(owner: str) -> Optional[str]:
+    """Faction a projectile/effect owned by `owner` may hit. None means everyone."""
+    if owner == "player":
+        return ENEMY_FACTION
+    if owner == "enemy":
+        return PLAYER_FACTION
+    return None
+
+
+class SpatialHash:
+    """
+    Buckets bots into square cells once per tick so radius queries only touch
+    nearby cells. Queries return candidates in all_bots order (so first-hit and
+    nearest-target tie breaks match a plain list scan); callers still do the
+    exact distance test. Call move() after nudging a bot's position mid-tick.
+    """
+    DEFAULT_CELL_SIZE = constants.TILE_SIZE * 4
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[str, Dict[Tuple[int, int], List]] = {PLAYER_FACTION: {}, ENEMY_FACTION: {}}
+        self.order: Dict[int, int] = {}  # id(bot) -> index in all_bots
+        self.bot_cells: Dict[int, Tuple[int, int]] = {}
+        self.radii: Dict[int, float] = {}  # id(bot) -> collision radius
+        self.max_radius: Dict[str, float] = {PLAYER_FACTION: 0.0, ENEMY_FACTION: 0.0}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    @staticmethod
+    def collision_radius(bot) -> float:
+        if bot.sprite:
+            return max(bot.sprite.get_width(), bot.sprite.get_height()) / 2
+        return constants.TILE_SIZE
+
+    def rebuild(self, all_bots: List):
+        """Re-buckets every bot. Cheap enough to run every tick."""
+        for cells in self.cells.values():
+            cells.clear()
+        self.order.clear()
+        self.bot_cells.clear()
+        self.radii.clear()
+        self.max_radius = {PLAYER_FACTION: 0.0, ENEMY_FACTION: 0.0}
+
+        for index, bot in enumerate(all_bots):
+            key = id(bot)
+            faction = faction_of(bot)
+            cell = self._cell(bot.x, bot.y)
+            self.cells[faction].setdefault(cell, []).append(bot)
+            self.order[key] = index
+            self.bot_cells[key] = cell
+            radius = self.collision_radius(bot)
+            self.radii[key] = radius
+            if radius > self.max_radius[faction]:
+                self.max_radius[faction] = radius
+
+    def move(self, bot):
+        """Re-buckets one bot after its position changed mid-tick."""
+        key = id(bot)
+        old_cell = self.bot_cells.get(key)
+        if old_cell is None:
+            return
+        new_cell = self._cell(bot.x, bot.y)
+        if new_cell == old_cell:
+            return
+        cells = self.cells[faction_of(bot)]
+        bucket = cells.get(old_cell)
+        if bucket is not None:
+            bucket.remove(bot)
+            if not bucket:
+                del cells[old_cell]
+        cells.setdefault(new_cell, []).append(bot)
+        self.bot_cells[key] = new_cell
+
+    def query(self, x: float, y: float, radius: float, faction: Optional[str] = None) -> List:
+        """Bots whose cell overlaps the circle's bounding box, in all_bots order."""
+        factions = (faction,) if faction is not None else (PLAYER_FACTION, ENEMY_FACTION)
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+
+        found = []
+        for f in factions:
+            cells = self.cells[f]
+            if not cells:
+                continue
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        found.extend(bucket)
+
+        if len(found) > 1:
+            order = self.order
+            found.sort(key=lambda b: order[id(b)])
+        return found
+
+    def query_hits(self, x: float, y: float, faction: Optional[str] = None) -> List:
+        """Candidates whose collision radius could contain the point (x, y)."""
+        if faction is None:
+            reach = max(self.max_radius.values())
+        else:
+            reach = self.max_radius[faction]
+        return self.query(x, y, reach, faction)
+
+    def radius_of(self, bot) -> float:
+        radius = self.radii.get(id(bot))
+        return radius if radius is not None else self.collision_radius(bot)
+
+    def members(self, faction: Optional[str] = None) -> List:
+        """All indexed bots of one faction (None = both), in all_bots order."""
+        factions = (faction,) if faction is not None else (PLAYER_FACTION, ENEMY_FACTION)
+        bots = [bot for f in factions for bucket in self.cells[f].values() for bot in bucket]
+        order = self.order
+        bots.sort(key=lambda b: order[id(b)])
+        return bots
@@ -82,10 +82,9 @@ class Squad:
         forward_x, forward_y = dx/dist, dy/dist
         right_x, right_y = -forward_y, forward_x
         
-        # Sort members by ID for consistent slot assignment
-        sorted_members = sorted(self.members, key=lambda e: id(e))
+        # Slots follow join order: stable across frames and across replays (id() is not)
         try:
-            rank = sorted_members.index(enemy)
+            rank = self.members.index(enemy)
         except ValueError:
             return None
 
@@ -0,0 +1,175 @@
+# pixbots_enhanced/train.py
+# Offline AI behavior training: headless arenas in a process pool, merged into the behavior library.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional
+
+import constants
+from core.rng import RandomStreams
+from systems.ai_behavior_system import BehaviorSystem
+
+logger = logging.getLogger(__name__)
+
+# Arena i numbers its mutations from i * MUTATION_ID_STRIDE, so ids never collide across arenas
+MUTATION_ID_STRIDE = 1_000_000
+
+
+def arena_seed(seed: int, index: int) -> int:
+    return RandomStreams.derive(seed, f"arena{index}") % 2 ** 31
+
+
+def run_arena(spec: Dict) -> Dict:
+    """
+    One training arena (runs in a pool worker): a seeded map, waves of squads
+    from data/squads.json against the duelist player bot, for spec["seconds"]
+    of game time. A new wave spawns whenever the previous one is wiped out or
+    the player dies. Returns the arena's BehaviorSystem.export_learning().
+    """
+    from headless import HeadlessRunner, duelist_script # Imports pygame; keep it out of the parent
+
+    logging.getLogger().setLevel(spec["log_level"])
+    start = time.perf_counter()
+    runner = HeadlessRunner(dt=spec["dt"], profile=f"arena{spec['index']}")
+    runner.input.script = duelist_script(runner)
+    runner.start(seed=spec["seed"])
+    game = runner.game
+    behavior_system = game.behavior_system
+    behavior_system.persist_graduations = False
+    behavior_system.mutator.mutation_counter = spec["index"] * MUTATION_ID_STRIDE
+
+    sim_seconds = 0.0
+    waves = 0
+    while sim_seconds < spec["seconds"] and game.is_running:
+        game.squad_manager.squads.clear() # Squads never drop dead members; start each wave clean
+        if not runner.spawn_squads(spec["squads"], spec["squad_types"]):
+            break
+        waves += 1
+        deaths = runner.player_deaths
+        stats = runner.run(seconds=spec["seconds"] - sim_seconds,
+                           until=lambda r: r.player_deaths > deaths or len(r.game.all_bots) <= 1)
+        if not stats["ticks"]:
+            break
+        sim_seconds += stats["sim_seconds"]
+
+    result = {
+        "index": spec["index"],
+        "seed": spec["seed"],
+        "sim_seconds": sim_seconds,
+        "wall_seconds": time.perf_counter() - start,
+        "waves": waves,
+        "player_deaths": runner.player_deaths,
+        "learning": behavior_system.export_learning(),
+    }
+    runner.close()
+    return result
+
+
+class TrainingReducer:
+    """
+    Merges arena results into one BehaviorSystem, in arena order, as they
+    arrive. Graduations are evaluated on the merged totals and written to
+    <data_dir>/graduated like live-play graduations.
+    """
+
+    def __init__(self, data_dir: str = "data/behaviors", persist: bool = True):
+        self.behavior_system = BehaviorSystem(data_dir)
+        self.behavior_system.persist_graduations = persist
+        self.base_ids = set(self.behavior_system.behavior_index)
+        self.arenas: List[Dict] = []
+
+    def merge(self, result: Dict):
+        self.behavior_system.merge_learning(result["learning"])
+        self.arenas.append({k: v for k, v in result.items() if k != "learning"})
+        logger.info(f"Merged arena {result['index']}: {result['learning']['events']} damage events, "
+                    f"{result['sim_seconds']:.0f}s simulated in {result['wall_seconds']:.1f}s")
+
+    def save(self, graduated_dir: str):
+        """
+        Rewrites this run's graduated behaviors with their final merged weights
+        (they were saved as they graduated) and writes the merged constellation
+        matrix and a summary next to them.
+        """
+        behavior_system = self.behavior_system
+        for enemy_class, ids in behavior_system.base_behavior_ids.items():
+            for entry in behavior_system.behaviors[enemy_class]:
+                if entry.id in ids and entry.id not in self.base_ids:
+                    behavior_system.save_graduated_behavior(entry, enemy_class)
+        os.makedirs(graduated_dir, exist_ok=True)
+        self.behavior_system.constellation_matrix.save_to_file(os.path.join(graduated_dir, "constellation.json"))
+        with open(os.path.join(graduated_dir, "training_summary.json"), "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def summary(self) -> Dict:
+        behavior_system = self.behavior_system
+        correlator = behavior_system.correlator
+        weights = {b.id: {"class": cls, "weight": b.success_weight,
+                          "uses": correlator.behavior_usage_counts.get(b.id, 0),
+                          "damage": correlator.behavior_damage_totals.get(b.id, 0.0)}
+                   for cls, entries in behavior_system.behaviors.items() for b in entries
+                   if b.id in correlator.behavior_usage_counts}
+        sim_seconds = sum(a["sim_seconds"] for a in self.arenas)
+        return {
+            "arenas": len(self.arenas),
+            "sim_seconds": sim_seconds,
+            "damage_events": correlator.events_folded,
+            "new_behaviors": sorted(set(behavior_system.behavior_index) - self.base_ids),
+            "graduated": {cls: sorted(ids - self.base_ids)
+                          for cls, ids in behavior_system.base_behavior_ids.items() if ids - self.base_ids},
+            "weights": dict(sorted(weights.items(), key=lambda item: -item[1]["weight"])),
+            "constellation": behavior_system.constellation_matrix.get_matrix_stats(),
+        }
+
+
+def train(arenas: int, seconds: float, workers: Optional[int] = None, seed: int = 0, squads: int = 3,
+          squad_types: Optional[List[str]] = None, dt: float = 1.0 / constants.FPS,
+          data_dir: str = "data/behaviors", dry_run: bool = False, log_level: str = "WARNING") -> Dict:
+    """Runs `arenas` arenas across `workers` processes and merges them. Returns the summary."""
+    workers = workers or min(arenas, os.cpu_count() or 1)
+    specs = [{"index": i, "seed": arena_seed(seed, i), "seconds": seconds, "squads": squads,
+              "squad_types": squad_types, "dt": dt, "log_level": log_level} for i in range(arenas)]
+    reducer = TrainingReducer(data_dir, persist=not dry_run)
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        # imap keeps arena order, so a given seed always merges (and graduates) the same way
+        for result in pool.imap(run_arena, specs):
+            reducer.merge(result)
+    wall = time.perf_counter() - start
+
+    if not dry_run:
+        reducer.save(os.path.join(data_dir, "graduated"))
+    summary = reducer.summary()
+    summary.update({"workers": workers, "wall_seconds": wall,
+                    "speedup": summary["sim_seconds"] / wall if wall > 0 else 0.0})
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train enemy AI behaviors in parallel headless arenas.")
+    parser.add_argument("--arenas", type=int, default=8, help="Number of arenas (one pool task each)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Game time per arena")
+    parser.add_argument("--squads", type=int, default=3, help="Squads per wave")
+    parser.add_argument("--squad-type", action="append", dest="squad_types",
+                        help="Squad type from data/squads.json (repeatable; default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; arena i gets a seed derived from it")
+    parser.add_argument("--dt", type=float, default=1.0 / constants.FPS, help="Fixed step in seconds")
+    parser.add_argument("--data-dir", default="data/behaviors", help="Behavior library to train and write to")
+    parser.add_argument("--dry-run", action="store_true", help="Merge and report, but write nothing")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    summary = train(args.arenas, args.seconds, args.workers, args.seed, args.squads, args.squad_types,
+                    args.dt, args.data_dir, args.dry_run, args.log_level.upper())
+    summary["weights"] = dict(list(summary["weights"].items())[:10])
+    print(json.dumps(summary, indent=2, default=str))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
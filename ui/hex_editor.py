@@ -67,6 +67,11 @@ class ComponentHexEditor:
         self.configuring_splitter: Optional[HexCoord] = None
         self.splitter_config_step: int = 0  # 0=not configuring, 1=set first exit, 2=set second exit
         
+        # Last flow simulation of the working grid; re-propagated only from edited hexes
+        self._flow_input = self._resolve_flow_input()
+        self._flow_trace = None
+        self._pending_edits = set()
+        
         # Center camera on the component grid
         mid_q = self.component.grid_width // 2
         mid_r = self.component.grid_height // 2
@@ -97,41 +102,6 @@ class ComponentHexEditor:
             self.renderer.draw_hex_filled(coord, (30, 40, 50))
             self.renderer.draw_hex_outline(coord, (60, 100, 150))
         
-        # Inject test energy for non-Torso components so user can see flow
-        input_context = self.input_context # Use the passed context by default
-        input_dir = 0
-        
-        if self.component.slot != "torso":
-            from hex_system.energy_packet import ProjectileContext, SynergyType
-            
-            # If no real context was passed, create a dummy one
-            if input_context is None:
-                input_context = ProjectileContext(synergies={SynergyType.RAW: 50.0})
-            
-            # Find entry hex to inject into
-            entry_hex, _ = self.component.get_entry_exit_hexes()
-            if entry_hex:
-                 # Determine input direction based on slot
-                 # If Right Arm, entry is usually on the Left side (min_q).
-                 # So energy comes FROM the Left (West).
-                 # Moving East (0). Enters side 3 (West).
-                 
-                 if self.component.slot == "right_arm":
-                     input_dir = 3 # Enters West side
-                 elif self.component.slot == "left_arm":
-                     input_dir = 0 # Enters East side (entry is on Right/max_q)
-                 elif self.component.slot == "head":
-                     input_dir = 4 
-                 elif self.component.slot == "legs":
-                     input_dir = 1 # Enters Top (NE/NW). Let's say 1 (NE).
-                 elif self.component.slot == "back":
-                     input_dir = 0 # Enters East side (attached to Left)
-                 
-        # Backup original tiles from component
-        original_tiles = self.component.tile_slots
-        # Set component tiles to current editor state for simulation
-        self.component.tile_slots = self.tile_grid
-        
         # Draw the grid first
         self.renderer.draw_grid(self.tile_grid, highlight_coords=[self.mouse_hex] if self.mouse_hex else [])
         
@@ -182,12 +152,9 @@ class ComponentHexEditor:
                     if is_configuring:
                          pygame.draw.circle(self.screen, (255, 255, 255), (int(ex), int(ey)), radius, 1)
         
-        flows, stats, _ = self.component.simulate_flow(input_context=input_context, input_direction=input_dir)
+        flows, stats = self._current_flow()
         self.renderer.draw_flow_overlay(flows, valid_coords=self.component.valid_coords)
         
-        # Restore original tiles
-        self.component.tile_slots = original_tiles
-        
         # Draw Palette
         self._draw_palette()
         
@@ -201,6 +168,61 @@ class ComponentHexEditor:
         if self.mouse_hex:
             self._draw_tooltip(self.mouse_hex)
 
+    def _resolve_flow_input(self):
+        """Returns the (input_context, input_direction) the editor simulates with."""
+        # Inject test energy for non-Torso components so user can see flow
+        input_context = self.input_context # Use the passed context by default
+        input_dir = 0
+        
+        if self.component.slot != "torso":
+            from hex_system.energy_packet import ProjectileContext, SynergyType
+            
+            # If no real context was passed, create a dummy one
+            if input_context is None:
+                input_context = ProjectileContext(synergies={SynergyType.RAW: 50.0})
+            
+            # Find entry hex to inject into
+            entry_hex, _ = self.component.get_entry_exit_hexes()
+            if entry_hex:
+                 # Determine input direction based on slot
+                 # If Right Arm, entry is usually on the Left side (min_q).
+                 # So energy comes FROM the Left (West).
+                 # Moving East (0). Enters side 3 (West).
+                 
+                 if self.component.slot == "right_arm":
+                     input_dir = 3 # Enters West side
+                 elif self.component.slot == "left_arm":
+                     input_dir = 0 # Enters East side (entry is on Right/max_q)
+                 elif self.component.slot == "head":
+                     input_dir = 4 
+                 elif self.component.slot == "legs":
+                     input_dir = 1 # Enters Top (NE/NW). Let's say 1 (NE).
+                 elif self.component.slot == "back":
+                     input_dir = 0 # Enters East side (attached to Left)
+        return input_context, input_dir
+
+    def _current_flow(self):
+        """
+        Returns (flows, stats) for the working grid. The last trace is reused
+        while the grid is idle; after edits only the affected hexes downstream
+        are re-propagated.
+        """
+        if self._flow_trace is None or self._pending_edits:
+            # Set component tiles to current editor state for simulation
+            original_tiles = self.component.tile_slots
+            self.component.tile_slots = self.tile_grid
+            try:
+                if self._flow_trace is None:
+                    self._flow_trace = self.component.simulate_flow_traced(*self._flow_input)
+                else:
+                    self._flow_trace = self.component.resimulate_flow(self._flow_trace, self._pending_edits)
+            finally:
+                # Restore original tiles
+                self.component.tile_slots = original_tiles
+            self._pending_edits.clear()
+        flows, stats, _ = self._flow_trace.result
+        return flows, stats
+
     def get_mouse_hex(self) -> Optional[HexCoord]:
         mouse_x, mouse_y = pygame.mouse.get_pos()
         world_x = mouse_x - self.renderer.camera_x
@@ -213,6 +235,18 @@ class ComponentHexEditor:
     def save_changes(self):
         """Saves the working copy back to component."""
         self.component.tile_slots = self.tile_grid
+        self.component.invalidate_flow_cache()
+
+    def _on_grid_edited(self, coord: Optional[HexCoord] = None):
+        """
+        Tiles are edited in place, so the component's compiled flow plans go stale.
+        Queues coord for incremental re-simulation (None forces a full run).
+        """
+        self.component.invalidate_flow_cache()
+        if coord is None:
+            self._flow_trace = None
+        else:
+            self._pending_edits.add(coord)
 
     def update(self):
         self.mouse_hex = self.get_mouse_hex()
@@ -246,6 +280,7 @@ class ComponentHexEditor:
                             tile.target_synergy = synergies[next_idx]
                         except ValueError:
                             tile.target_synergy = "fire"
+                        self._on_grid_edited(self.mouse_hex)
 
             elif event.key == pygame.K_e: # Edit Exits (Splitter)
                 if self.configuring_splitter:
@@ -283,6 +318,7 @@ class ComponentHexEditor:
                          # Check distance to click (increased radius)
                          if math.hypot(mx - ex, my - ey) < 15:
                              tile.toggle_exit_direction(i)
+                             self._on_grid_edited(self.configuring_splitter)
                              return None # Handled
                              
                  # If clicked outside, exit config mode?
@@ -297,6 +333,7 @@ class ComponentHexEditor:
                     if self._is_in_bounds(self.mouse_hex):
                         new_tile = self.palette.get_selected()
                         self.tile_grid[self.mouse_hex] = new_tile
+                        self._on_grid_edited(self.mouse_hex)
             
             elif event.button == 3: # Right Click: Rotate or Delete
                 if self.mouse_hex in self.tile_grid:
@@ -320,6 +357,7 @@ class ComponentHexEditor:
                         else:
                             # If not rotatable, delete it (fallback)
                             del self.tile_grid[self.mouse_hex]
+                    self._on_grid_edited(self.mouse_hex)
         
         return None
 
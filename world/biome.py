@@ -6,13 +6,19 @@ import os
 import random
 import math
 import logging
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
 
 try:
     from noise import pnoise2
+    HAVE_NOISE = True
 except ImportError:
     logging.warning("'noise' library not found. Falling back to basic math functions for world gen.")
     def pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=0):
         return (math.sin(x/10.0 + base) + math.cos(y/10.0 + base)) / 2.0
+    HAVE_NOISE = False
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +30,146 @@ TERRAIN_NAMES = {
     FOREST: "Forest", TUNDRA: "Tundra", VOLCANO: "Volcano"
 }
 
+# Biomes get_biome_type() picks from noise, in threshold order
+NOISE_BIOMES = ["desert", "grassland", "forest", "tundra", "volcano"]
+
+_BIOME_TERRAIN = {"desert": DESERT, "forest": FOREST, "tundra": TUNDRA, "volcano": VOLCANO}
+
+# Permutation table of noise's C extension (PERM in _noise.h: 256 entries, doubled)
+_PERM = np.array((
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+) * 2, dtype=np.int32)
+
+# noise's grad2 uses the first two columns of GRAD3
+_GRAD2 = np.array([
+    [1, 1], [-1, 1], [1, -1], [-1, -1],
+    [1, 0], [-1, 0], [1, 0], [-1, 0],
+    [0, 1], [0, -1], [0, 1], [0, -1],
+    [1, 0], [-1, 0], [0, -1], [0, 1]], dtype=np.float32)
+# Gradient components keyed directly by the hash passed to grad2 (PERM[AA] etc.)
+_GRAD_X = _GRAD2[_PERM & 15, 0]
+_GRAD_Y = _GRAD2[_PERM & 15, 1]
+
+# noise2 indexes PERM up to 255 + 255 + base, i.e. past its 512 entries into
+# whatever const data the extension was linked with next. Cells whose lookups
+# leave the table are not reproduced here; pnoise2_grid hands them to pnoise2.
+
+
+def _noise2_grid(x: np.ndarray, y: np.ndarray, repeat: np.float32, base: int):
+    """
+    Vectorized port of noise's C noise2(), op for op in float32 so results are
+    bit-identical. x and y broadcast against each other, so a (1, W) row of x
+    and an (H, 1) column of y keep the per-axis work one-dimensional. Also
+    returns a mask of cells whose permutation lookups run past the 512-entry
+    PERM table.
+    """
+    i = np.floor(np.fmod(x, repeat)).astype(np.int32)
+    j = np.floor(np.fmod(y, repeat)).astype(np.int32)
+    ii = np.fmod((i + 1).astype(np.float32), repeat).astype(np.int32)
+    jj = np.fmod((j + 1).astype(np.float32), repeat).astype(np.int32)
+    i = (i & 255) + base
+    j = (j & 255) + base
+    ii = (ii & 255) + base
+    jj = (jj & 255) + base
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    fx = x * x * x * (x * (x * 6 - 15) + 10)
+    fy = y * y * y * (y * (y * 6 - 15) + 10)
+
+    table = _PERM
+    last = len(table) - 1
+    overflow = np.zeros(np.broadcast_shapes(x.shape, y.shape), dtype=bool)
+    overflow |= (i > last) | (ii > last)
+    A = table[np.minimum(i, last)]
+    B = table[np.minimum(ii, last)]
+    lookups = (A + j, A + jj, B + j, B + jj)
+    for index in lookups:
+        overflow |= index > last
+    AA, AB, BA, BB = (table[np.minimum(index, last)] for index in lookups)
+
+    def grad2(h, gx, gy):
+        return gx * _GRAD_X[h] + gy * _GRAD_Y[h]
+
+    def lerp(t, a, b):
+        return a + t * (b - a)
+
+    value = lerp(fy, lerp(fx, grad2(AA, x, y), grad2(BA, x - 1, y)),
+                     lerp(fx, grad2(AB, x, y - 1), grad2(BB, x - 1, y - 1)))
+    return value, overflow
+
+
+def pnoise2_grid(x: np.ndarray, y: np.ndarray, octaves=1, persistence=0.5, lacunarity=2.0, base=0) -> np.ndarray:
+    """pnoise2 over (broadcast) coordinate arrays, returning exactly what per-cell calls would."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    shape = np.broadcast_shapes(x.shape, y.shape)
+    if not HAVE_NOISE:
+        x, y = np.broadcast_to(x, shape), np.broadcast_to(y, shape)
+        fallback = [pnoise2(a, b, octaves=octaves, persistence=persistence, lacunarity=lacunarity, base=base)
+                    for a, b in zip(x.ravel().tolist(), y.ravel().tolist())]
+        return np.array(fallback, dtype=np.float64).reshape(shape)
+
+    # pnoise2 parses its arguments as C floats
+    x32 = x.astype(np.float32)
+    y32 = y.astype(np.float32)
+    repeat = np.float32(1024)
+    if octaves == 1:
+        total, overflow = _noise2_grid(x32, y32, repeat, base)
+    else:
+        freq, amp, max_amp = np.float32(1), np.float32(1), np.float32(0)
+        total = np.zeros(shape, dtype=np.float32)
+        overflow = np.zeros(shape, dtype=bool)
+        for _ in range(octaves):
+            octave, octave_overflow = _noise2_grid(x32 * freq, y32 * freq, repeat * freq, base)
+            total = total + octave * amp
+            overflow |= octave_overflow
+            max_amp = max_amp + amp
+            freq = freq * np.float32(lacunarity)
+            amp = amp * np.float32(persistence)
+        total = total / max_amp
+
+    result = total.astype(np.float64)
+    cells = np.flatnonzero(overflow)
+    if len(cells):
+        # Out-of-table reads can't be reproduced portably; ask the extension itself
+        flat = result.reshape(-1)
+        xs = np.broadcast_to(x, shape).reshape(-1)[cells]
+        ys = np.broadcast_to(y, shape).reshape(-1)[cells]
+        flat[cells] = [pnoise2(a, b, octaves=octaves, persistence=persistence, lacunarity=lacunarity, base=base)
+                       for a, b in zip(xs.tolist(), ys.tolist())]
+    return result
+
+
+@dataclass
+class MapFields:
+    """Whole-map output of BiomeManager.generate_fields()."""
+    terrain: np.ndarray # (height, width) uint8 terrain constants
+    biome: np.ndarray # (height, width) uint8 indices into biome_names
+    biome_names: List[str]
+    obstacle_cells: np.ndarray # (N, 2) int32 (x, y), row-major order
+    obstacle_types: np.ndarray # (N,) uint8 indices into obstacle_names
+    obstacle_names: List[str] = field(default_factory=list)
+
+    def biome_grid(self) -> List[List[str]]:
+        return np.array(self.biome_names, dtype=object)[self.biome].tolist()
+
+
 class BiomeManager:
     """Manages biome generation, characteristics, and transitions."""
     
@@ -149,6 +295,74 @@ class BiomeManager:
         selection_seed = hash((x, y, self.seed)) % len(obstacle_types)
         return obstacle_types[selection_seed]
     
+    def generate_fields(self, width: int, height: int) -> MapFields:
+        """
+        Computes biome, terrain and obstacle placement for a whole map in one
+        vectorized pass. Matches get_biome_type / get_terrain_type /
+        should_spawn_obstacle / get_obstacle_type cell for cell.
+        """
+        xs = np.arange(width, dtype=np.float64)[None, :]
+        ys = np.arange(height, dtype=np.float64)[:, None]
+
+        if self.forced_biome:
+            biome_names = [self.forced_biome]
+            biome = np.zeros((height, width), dtype=np.uint8)
+        else:
+            biome_names = list(NOISE_BIOMES)
+            noise_val = pnoise2_grid(xs * self.biome_noise_scale, ys * self.biome_noise_scale,
+                                     octaves=3, persistence=0.5, lacunarity=2.0, base=self.seed % 255)
+            noise_val = (noise_val + 1) / 2
+            biome = ((noise_val >= 0.2).astype(np.uint8) + (noise_val >= 0.4) + (noise_val >= 0.6) + (noise_val >= 0.8)).astype(np.uint8)
+
+        terrain_noise = pnoise2_grid(xs * self.terrain_noise_scale, ys * self.terrain_noise_scale,
+                                     octaves=4, persistence=0.7, lacunarity=2.0, base=(self.seed + 10) % 255)
+        terrain_noise = (terrain_noise + 1) / 2
+
+        terrain = np.empty((height, width), dtype=np.uint8)
+        infos = [self.biome_data.get(name, self.biome_data["grassland"]) for name in biome_names]
+        for code, (name, info) in enumerate(zip(biome_names, infos)):
+            sel = biome == code
+            if not sel.any():
+                continue
+            tn = terrain_noise[sel]
+            if name == "island":
+                # Same radial mask as get_terrain_type with its default 100x100 map size
+                cx, cy = 100 / 2, 100 / 2
+                max_dist = min(100, 100) * 0.5
+                dist = np.sqrt((np.broadcast_to(xs, sel.shape)[sel] - cx)**2 + (np.broadcast_to(ys, sel.shape)[sel] - cy)**2)
+                value = tn * 0.3 + (1.0 - dist / max_dist) * 0.7
+                terrain[sel] = np.where(value < 0.4, WATER, np.where(value > 0.85, MOUNTAIN, GRASS))
+            else:
+                base_terrain = _BIOME_TERRAIN.get(name, GRASS)
+                terrain[sel] = np.where(tn < info.get("water_threshold", 0.3), WATER,
+                                        np.where(tn > info.get("mountain_threshold", 0.7), MOUNTAIN, base_terrain))
+
+        obstacle_noise = pnoise2_grid(xs * 0.2, ys * 0.2, octaves=1, base=(self.seed + 30) % 255)
+        chance = np.array([info.get("obstacle_chance", 0.1) for info in infos], dtype=np.float64)
+        spawn = (terrain != WATER) & (((obstacle_noise + 1) / 2) < chance[biome])
+        oy, ox = np.nonzero(spawn)
+
+        obstacle_names: List[str] = []
+        name_codes = {}
+        types = []
+        type_lists = [info.get("obstacle_types", ["Boulder", "Tree"]) for info in infos]
+        for x, y, code in zip(ox.tolist(), oy.tolist(), biome[oy, ox].tolist()):
+            choices = type_lists[code]
+            name = choices[hash((x, y, self.seed)) % len(choices)] if choices else "Boulder"
+            if name not in name_codes:
+                name_codes[name] = len(obstacle_names)
+                obstacle_names.append(name)
+            types.append(name_codes[name])
+
+        return MapFields(
+            terrain=terrain,
+            biome=biome,
+            biome_names=biome_names,
+            obstacle_cells=np.stack([ox, oy], axis=1).astype(np.int32),
+            obstacle_types=np.array(types, dtype=np.uint8),
+            obstacle_names=obstacle_names,
+        )
+
     def _create_default_biomes(self):
         """Returns a dictionary of default biome data."""
         return {
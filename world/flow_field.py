@@ -0,0 +1,248 @@
+# pixbots_enhanced/world/flow_field.py
+# Shared distance field toward the player, used by enemies to path around terrain.
+
+import math
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+_DIAG = math.sqrt(2)
+
+# (dx, dy, cost) for the 8 neighbours of a tile
+NEIGHBORS = (
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, _DIAG), (-1, 1, _DIAG), (1, -1, _DIAG), (-1, -1, _DIAG),
+)
+_UNIT = tuple((dx / cost, dy / cost) for dx, dy, cost in NEIGHBORS)
+_COSTS = np.array([cost for _, _, cost in NEIGHBORS], dtype=np.float32).reshape(-1, 1, 1)
+
+NO_STEP = -1
+
+
+class FlowField:
+    """
+    Dijkstra distance map (in tiles, diagonal = sqrt 2) from the player's tile
+    over walkable terrain, shared by every enemy. It covers a window of
+    RADIUS_TILES around the player and is only rebuilt when the player changes
+    tile; the window (and its step legality) is kept until the player strays
+    half a radius from its centre. Per-enemy lookups are array reads: descend
+    to chase, ascend to kite away.
+    """
+    RADIUS_TILES = 48
+
+    def __init__(self, game_map, radius_tiles: int = RADIUS_TILES):
+        self.game_map = game_map
+        self.radius = radius_tiles
+        self.goal: Optional[Tuple[int, int]] = None # Map tile the field flows to
+        self.origin = (0, 0) # Map tile of window[0, 0]
+        self.center: Optional[Tuple[int, int]] = None # Goal tile the window was centred on
+        self.dist: Optional[np.ndarray] = None # float32 (h, w), inf = blocked/unreachable
+        self.descent: Optional[np.ndarray] = None # int8 (h, w) index into NEIGHBORS, NO_STEP at goal
+        self.ascent: Optional[np.ndarray] = None # int8 (h, w) index into NEIGHBORS, NO_STEP at local maxima
+        self._walkable: Optional[np.ndarray] = None
+        self._step_allowed: Optional[np.ndarray] = None # bool (8, h, w) per-direction move legality
+        self._flat_allowed: Optional[np.ndarray] = None # bool (8, (h+2)*(w+2)), same over a padded flat grid
+        self._flat_offsets: Optional[np.ndarray] = None # int (8, 1) flat index step for each neighbour
+        self._nav_version = None
+        self.rebuilds = 0
+
+    # --- Building ---
+    def update(self, x: float, y: float) -> bool:
+        """Re-targets the field on the tile containing (x, y). Returns True if it changed."""
+        tile_size = constants.TILE_SIZE
+        tx, ty = int(x // tile_size), int(y // tile_size)
+        nav_version = self.game_map.nav_version
+        if (tx, ty) == self.goal and nav_version == self._nav_version:
+            return False
+
+        blocked = self.game_map.get_blocked_mask()
+        height, width = blocked.shape
+        if not (0 <= tx < width and 0 <= ty < height) or blocked[ty, tx]:
+            return False # Keep flowing to the last valid tile
+
+        cx, cy = self.center if self.center else (tx, ty)
+        recenter = (self.dist is None or nav_version != self._nav_version
+                    or abs(tx - cx) > self.radius // 2 or abs(ty - cy) > self.radius // 2)
+        if recenter:
+            self._set_window(blocked, tx, ty)
+
+        ox, oy = self.origin
+        self.dist = self._search(tx - ox, ty - oy)
+        self.goal = (tx, ty)
+        self._nav_version = nav_version
+        self._build_steps()
+        self.rebuilds += 1
+        return True
+
+    def _set_window(self, blocked: np.ndarray, tx: int, ty: int):
+        height, width = blocked.shape
+        x0, y0 = max(0, tx - self.radius), max(0, ty - self.radius)
+        x1, y1 = min(width, tx + self.radius + 1), min(height, ty + self.radius + 1)
+        self.origin = (x0, y0)
+        self.center = (tx, ty)
+        walkable = ~blocked[y0:y1, x0:x1]
+        self._walkable = walkable
+
+        # A step is legal if both ends are walkable and, diagonally, it doesn't cut a corner
+        padded = np.pad(walkable, 1, constant_values=False)
+        h, w = walkable.shape
+
+        def neighbour(dx, dy):
+            return padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+
+        # Built on the padded grid so the search can step by flat offsets without wrapping rows
+        allowed = np.zeros((len(NEIGHBORS), h + 2, w + 2), dtype=bool)
+        for k, (dx, dy, _) in enumerate(NEIGHBORS):
+            ok = walkable & neighbour(dx, dy)
+            if dx and dy:
+                ok &= neighbour(dx, 0) & neighbour(0, dy)
+            allowed[k, 1:-1, 1:-1] = ok
+        self._step_allowed = allowed[:, 1:-1, 1:-1]
+        self._flat_allowed = allowed.reshape(len(NEIGHBORS), -1)
+        self._flat_offsets = np.array([dy * (w + 2) + dx for dx, dy, _ in NEIGHBORS]).reshape(-1, 1)
+
+    def _neighbour_dist(self, dist: np.ndarray) -> np.ndarray:
+        """(8, h, w) distance of each tile's neighbour k, inf where the step is illegal."""
+        h, w = dist.shape
+        padded = np.pad(dist, 1, constant_values=np.inf)
+        out = np.empty((len(NEIGHBORS), h, w), dtype=np.float32)
+        for k, (dx, dy, _) in enumerate(NEIGHBORS):
+            out[k] = padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+        out[~self._step_allowed] = np.inf
+        return out
+
+    def _search(self, lx: int, ly: int) -> np.ndarray:
+        """
+        Dijkstra from window tile (lx, ly), a whole distance bucket at a time
+        (Dial's algorithm with unit-wide buckets). No step costs less than 1,
+        so every open tile closer than `limit` already has its final distance
+        and the bucket can be settled and expanded in one vectorized pass.
+        """
+        h, w = self._walkable.shape
+        size = (h + 2) * (w + 2)
+        dist = np.full(size, np.inf)
+        is_open = np.zeros(size, dtype=bool)
+        start = (ly + 1) * (w + 2) + lx + 1
+        dist[start] = 0.0
+        is_open[start] = True
+        allowed, offsets = self._flat_allowed, self._flat_offsets
+        costs = _COSTS.reshape(-1, 1)
+
+        limit = 1.0
+        while True:
+            bucket = np.flatnonzero(is_open & (dist < limit))
+            if not bucket.size:
+                if not is_open.any():
+                    break
+                limit = math.floor(dist[is_open].min()) + 1.0 # Skip empty buckets
+                continue
+            is_open[bucket] = False
+            legal = allowed[:, bucket]
+            targets = (bucket + offsets)[legal]
+            via = (dist[bucket] + costs)[legal]
+            better = via < dist[targets]
+            targets, via = targets[better], via[better]
+            np.minimum.at(dist, targets, via) # Several tiles of the bucket may reach the same neighbour
+            is_open[targets] = True
+            limit += 1.0
+        return dist.reshape(h + 2, w + 2)[1:-1, 1:-1].astype(np.float32)
+
+    def _build_steps(self):
+        neighbour = self._neighbour_dist(self.dist)
+        reachable = np.isfinite(self.dist)
+
+        via = neighbour + _COSTS
+        descent = via.argmin(axis=0).astype(np.int8)
+        descent[~(reachable & (self.dist > 0))] = NO_STEP
+        self.descent = descent
+
+        farther = np.where(np.isfinite(neighbour), neighbour, -np.inf)
+        ascent = farther.argmax(axis=0).astype(np.int8)
+        ascent[~(reachable & (farther.max(axis=0) > self.dist))] = NO_STEP
+        self.ascent = ascent
+
+    # --- Lookups ---
+    def _local(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        if self.dist is None:
+            return None
+        tile_size = constants.TILE_SIZE
+        lx = int(x // tile_size) - self.origin[0]
+        ly = int(y // tile_size) - self.origin[1]
+        h, w = self.dist.shape
+        if 0 <= lx < w and 0 <= ly < h:
+            return lx, ly
+        return None
+
+    def _tracks(self, target_x: float, target_y: float) -> bool:
+        """True if (target_x, target_y) is on the tile the field flows to."""
+        tile_size = constants.TILE_SIZE
+        return self.goal == (int(target_x // tile_size), int(target_y // tile_size))
+
+    def distance_at(self, x: float, y: float) -> float:
+        """Path distance in tiles to the goal, inf if unreachable or outside the window."""
+        local = self._local(x, y)
+        return self.dist.item(local[1], local[0]) if local else math.inf
+
+    def direction_to_goal(self, x: float, y: float) -> Optional[Tuple[float, float]]:
+        """Unit step toward the goal along the field, or None off-field / at the goal."""
+        local = self._local(x, y)
+        if not local:
+            return None
+        k = self.descent.item(local[1], local[0])
+        return _UNIT[k] if k != NO_STEP else None
+
+    def direction_away(self, x: float, y: float) -> Optional[Tuple[float, float]]:
+        """Unit step that increases path distance the most (gradient ascent), or None."""
+        local = self._local(x, y)
+        if not local:
+            return None
+        k = self.ascent.item(local[1], local[0])
+        return _UNIT[k] if k != NO_STEP else None
+
+    # --- Steering helpers (fall back to straight lines off-field) ---
+    def _toward_next_tile(self, x: float, y: float, steps: np.ndarray) -> Optional[Tuple[float, float]]:
+        """Vector from (x, y) to the centre of the neighbour tile `steps` points at."""
+        local = self._local(x, y)
+        if not local:
+            return None
+        k = steps.item(local[1], local[0])
+        if k == NO_STEP:
+            return None
+        dx, dy, _ = NEIGHBORS[k]
+        tile_size = constants.TILE_SIZE
+        # Aiming at tile centres keeps bots off wall corners in narrow passages
+        next_x = (self.origin[0] + local[0] + dx + 0.5) * tile_size
+        next_y = (self.origin[1] + local[1] + dy + 0.5) * tile_size
+        return next_x - x, next_y - y
+
+    def steer(self, x: float, y: float, target_x: float, target_y: float) -> Tuple[float, float]:
+        """Movement input for chasing (target_x, target_y)."""
+        if self._tracks(target_x, target_y):
+            step = self._toward_next_tile(x, y, self.descent)
+            if step:
+                return step
+        return target_x - x, target_y - y
+
+    def flee(self, x: float, y: float, target_x: float, target_y: float) -> Tuple[float, float]:
+        """Movement input for backing away from (target_x, target_y)."""
+        if self._tracks(target_x, target_y):
+            step = self._toward_next_tile(x, y, self.ascent)
+            if step:
+                return step
+        return x - target_x, y - target_y
+
+    def flank(self, x: float, y: float, target_x: float, target_y: float, direction: str = "left") -> Tuple[float, float]:
+        """Movement input for circling (target_x, target_y), sliding along the field's contour."""
+        dx, dy = self.steer(x, y, target_x, target_y)
+        side_x, side_y = (-dy, dx) if direction == "left" else (dy, -dx)
+        if self._tracks(target_x, target_y):
+            mag = math.hypot(side_x, side_y) or 1.0
+            local = self._local(x + side_x / mag * constants.TILE_SIZE, y + side_y / mag * constants.TILE_SIZE)
+            if not local or not self._walkable[local[1], local[0]]:
+                return dx, dy # Contour is blocked, keep closing in instead
+        return side_x, side_y
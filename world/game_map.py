@@ -4,11 +4,16 @@
 import pygame
 import random
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
 
 from .biome import BiomeManager, GRASS, WATER, MOUNTAIN, DESERT, FOREST, TUNDRA, VOLCANO
+from .flow_field import FlowField
 import constants
 from core.asset_manager import ProceduralAssetManager
+from core.rng import stream
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +28,17 @@ class Obstacle:
 
 class GameMap:
     """Grid-based world with sprite rendering and procedural generation."""
+    # Terrain is drawn as pre-rendered CHUNK_TILES x CHUNK_TILES surfaces.
+    CHUNK_TILES = 16
+    # Least recently drawn chunks are dropped beyond this (a chunk is ~1MB at 32px tiles).
+    MAX_CACHED_CHUNKS = 48
+
     def __init__(self, width: int, height: int, tile_size: int, asset_manager: ProceduralAssetManager, seed: int = None, biome_type: str = None):
         self.width = width
         self.height = height
         self.tile_size = tile_size
         self.asset_manager = asset_manager
-        self.seed = seed if seed is not None else random.randint(0, 999999)
+        self.seed = seed if seed is not None else stream("world").randint(0, 999999)
         
         self.biome_manager = BiomeManager(self.seed)
         if biome_type:
@@ -36,13 +46,19 @@ class GameMap:
             
         self.terrain = []
         self.biome_grid = [] # Cache biome types
+        self.fields = None # Compact uint8 grids + sparse obstacles from the last generation
+        self._wall_mask = None # Lazily built from terrain, see get_wall_mask()
+        self._blocked_mask = None # Walls + obstacles, see get_blocked_mask()
+        self.nav_version = 0 # Bumped whenever walkability changes
+        self._chunks = OrderedDict() # (cx, cy) -> pre-rendered terrain + obstacles
         self.generate_map_data()
         
         self.tile_sprites = self._load_tile_sprites()
         self.obstacle_sprites = self._load_obstacle_sprites()
         
         self.obstacles = self.generate_obstacles()
-        self.color_cache = {}
+        self.invalidate_chunks()
+        self.flow_field = FlowField(self) # Shared enemy pathing toward the player
         logger.info(f"GameMap initialized with {len(self.obstacles)} obstacles.")
 
     def _load_tile_sprites(self) -> dict:
@@ -136,23 +152,40 @@ class GameMap:
             
         self.generate_map_data()
         self.obstacles = self.generate_obstacles()
-        self.color_cache = {}
+        self.invalidate_chunks()
+        self._invalidate_nav()
         logger.info(f"Map regenerated. Seed: {self.seed}, Biome: {biome_type}")
 
     def generate_map_data(self):
-        """Generates both terrain and biome grids."""
-        self.terrain = []
-        self.biome_grid = []
-        for y in range(self.height):
-            row_terrain = []
-            row_biome = []
-            for x in range(self.width):
-                biome = self.biome_manager.get_biome_type(x, y)
-                terrain = self.biome_manager.get_terrain_type(x, y, biome)
-                row_biome.append(biome)
-                row_terrain.append(terrain)
-            self.terrain.append(row_terrain)
-            self.biome_grid.append(row_biome)
+        """Generates both terrain and biome grids (one vectorized pass, see BiomeManager.generate_fields)."""
+        self._wall_mask = None
+        self._invalidate_nav()
+        self.invalidate_chunks()
+        self.fields = self.biome_manager.generate_fields(self.width, self.height)
+        # Nested lists keep terrain[y][x] lookups in the movement code cheap
+        self.terrain = self.fields.terrain.tolist()
+        self.biome_grid = self.fields.biome_grid()
+
+    def get_wall_mask(self) -> np.ndarray:
+        """(height, width) bool array, True where terrain is NON_WALKABLE. Rebuilt per map generation."""
+        if self._wall_mask is None:
+            blocked = np.array(sorted(constants.NON_WALKABLE_TERRAIN))
+            self._wall_mask = np.isin(self.fields.terrain, blocked)
+        return self._wall_mask
+
+    def get_blocked_mask(self) -> np.ndarray:
+        """(height, width) bool array, True where bots can't stand (walls and obstacles)."""
+        if self._blocked_mask is None:
+            mask = self.get_wall_mask().copy()
+            if self.obstacles:
+                xs, ys = zip(*self.obstacles)
+                mask[list(ys), list(xs)] = True
+            self._blocked_mask = mask
+        return self._blocked_mask
+
+    def _invalidate_nav(self):
+        self._blocked_mask = None
+        self.nav_version += 1
 
     def generate_obstacles(self) -> dict:
         obstacles = {}
@@ -167,16 +200,15 @@ class GameMap:
             "ObsidianSpire": {"hp": 500, "destructible_by": ["explosive"]},
         }
         
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.terrain[y][x] != WATER and self.biome_manager.should_spawn_obstacle(x, y):
-                    name = self.biome_manager.get_obstacle_type(x, y)
-                    if name in obstacle_definitions:
-                        props = obstacle_definitions[name]
-                        obs = Obstacle(name, props["hp"], props["destructible_by"])
-                        if name in self.obstacle_sprites:
-                            obs.sprite = self.obstacle_sprites[name]
-                        obstacles[(x, y)] = obs
+        names = self.fields.obstacle_names
+        for (x, y), code in zip(self.fields.obstacle_cells.tolist(), self.fields.obstacle_types.tolist()):
+            name = names[code]
+            if name in obstacle_definitions:
+                props = obstacle_definitions[name]
+                obs = Obstacle(name, props["hp"], props["destructible_by"])
+                if name in self.obstacle_sprites:
+                    obs.sprite = self.obstacle_sprites[name]
+                obstacles[(x, y)] = obs
         return obstacles
 
     def get_transition_sprite(self, primary_biome, neighbor_biome, direction):
@@ -196,46 +228,79 @@ class GameMap:
         # Or we just rely on the fact that we don't have them yet.
         return None
 
+    # --- Chunk cache ---
+    def invalidate_chunks(self):
+        """Drops every pre-rendered chunk (map regenerated or sprites changed)."""
+        self._chunks.clear()
+
+    def _get_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        chunk = self._chunks.get((cx, cy))
+        if chunk is None:
+            chunk = self._render_chunk(cx, cy)
+            self._chunks[(cx, cy)] = chunk
+            while len(self._chunks) > self.MAX_CACHED_CHUNKS:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end((cx, cy))
+        return chunk
+
+    def _render_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        x0, y0 = cx * self.CHUNK_TILES, cy * self.CHUNK_TILES
+        x1, y1 = min(self.width, x0 + self.CHUNK_TILES), min(self.height, y0 + self.CHUNK_TILES)
+        chunk = pygame.Surface(((x1 - x0) * self.tile_size, (y1 - y0) * self.tile_size))
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                self._draw_tile(chunk, x, y, (x - x0) * self.tile_size, (y - y0) * self.tile_size)
+        return chunk
+
+    def _draw_tile(self, surface: pygame.Surface, x: int, y: int, px: int, py: int):
+        tile_type = self.terrain[y][x]
+        biome_type = self.biome_grid[y][x]
+
+        sprite = self.tile_sprites.get((tile_type, biome_type))
+
+        # Transition Logic (Simplified)
+        # Check neighbors (N, S, E, W) for different biome
+        # Only check if we have a base sprite, otherwise we're already falling back
+        if sprite:
+            # Check East
+            if x + 1 < self.width:
+                neighbor_biome = self.biome_grid[y][x+1]
+                if neighbor_biome != biome_type:
+                    trans = self.get_transition_sprite(biome_type, neighbor_biome, "e")
+                    if trans: sprite = trans # Overlay or replace? Usually replace edge.
+
+            # Real implementation would need to handle corners and multiple sides.
+            # For now, this is the spec implementation.
+
+        if not sprite:
+            sprite = self.tile_sprites.get((tile_type, "grassland"))
+
+        if sprite:
+            surface.blit(sprite, (px, py))
+        else:
+            pygame.draw.rect(surface, self.biome_manager.get_biome_color(x, y, tile_type), (px, py, self.tile_size, self.tile_size))
+
+        obstacle = self.obstacles.get((x, y))
+        if obstacle and obstacle.sprite:
+            surface.blit(obstacle.sprite, (px, py))
+
+    def visible_chunks(self, screen_w: int, screen_h: int, offset_x: float, offset_y: float) -> Tuple[range, range]:
+        chunk_px = self.CHUNK_TILES * self.tile_size
+        cols = (self.width + self.CHUNK_TILES - 1) // self.CHUNK_TILES
+        rows = (self.height + self.CHUNK_TILES - 1) // self.CHUNK_TILES
+        start_cx = max(0, int((-offset_x) // chunk_px))
+        start_cy = max(0, int((-offset_y) // chunk_px))
+        end_cx = min(cols, int((screen_w - offset_x) // chunk_px) + 1)
+        end_cy = min(rows, int((screen_h - offset_y) // chunk_px) + 1)
+        return range(start_cx, end_cx), range(start_cy, end_cy)
+
     def render(self, screen: pygame.Surface, offset_x: int, offset_y: int):
-        start_col = max(0, int(-offset_x / self.tile_size))
-        start_row = max(0, int(-offset_y / self.tile_size))
-        end_col = min(self.width, start_col + int(screen.get_width() / self.tile_size) + 2)
-        end_row = min(self.height, start_row + int(screen.get_height() / self.tile_size) + 2)
-
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                screen_x = int(x * self.tile_size + offset_x)
-                screen_y = int(y * self.tile_size + offset_y)
-                tile_type = self.terrain[y][x]
-                biome_type = self.biome_grid[y][x]
-                
-                sprite = self.tile_sprites.get((tile_type, biome_type))
-                
-                # Transition Logic (Simplified)
-                # Check neighbors (N, S, E, W) for different biome
-                # Only check if we have a base sprite, otherwise we're already falling back
-                if sprite:
-                    # Check East
-                    if x + 1 < self.width:
-                        neighbor_biome = self.biome_grid[y][x+1]
-                        if neighbor_biome != biome_type:
-                            trans = self.get_transition_sprite(biome_type, neighbor_biome, "e")
-                            if trans: sprite = trans # Overlay or replace? Usually replace edge.
-                    
-                    # Real implementation would need to handle corners and multiple sides.
-                    # For now, this is the spec implementation.
-
-                if not sprite:
-                    sprite = self.tile_sprites.get((tile_type, "grassland"))
-
-                if sprite:
-                    screen.blit(sprite, (screen_x, screen_y))
-                else: 
-                    if (x, y, tile_type) not in self.color_cache:
-                        self.color_cache[(x, y, tile_type)] = self.biome_manager.get_biome_color(x, y, tile_type)
-                    pygame.draw.rect(screen, self.color_cache[(x, y, tile_type)], (screen_x, screen_y, self.tile_size, self.tile_size))
-
-                if (x, y) in self.obstacles:
-                    obstacle = self.obstacles[(x, y)]
-                    if obstacle.sprite:
-                        screen.blit(obstacle.sprite, (screen_x, screen_y))
+        chunk_px = self.CHUNK_TILES * self.tile_size
+        cols, rows = self.visible_chunks(screen.get_width(), screen.get_height(), offset_x, offset_y)
+        for cy in rows:
+            for cx in cols:
+                screen.blit(self._get_chunk(cx, cy), (int(cx * chunk_px + offset_x), int(cy * chunk_px + offset_y)))